@@ -1,3 +1,4 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -9,6 +10,12 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate the database of the applications, see .env.example
+if os.getenv("SQLALCHEMY_DATABASE_URI"):
+    config.set_main_option(
+        "sqlalchemy.url", os.environ["SQLALCHEMY_DATABASE_URI"]
+    )
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
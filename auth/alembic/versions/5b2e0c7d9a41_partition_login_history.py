@@ -0,0 +1,117 @@
+"""partition login history by month
+
+Revision ID: 5b2e0c7d9a41
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e0c7d9a41'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Partitions are created up to this many months ahead, the
+# applications keep creating them on start
+MONTHS_AHEAD = 3
+
+
+def month_start(day: date, months: int = 0) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def create_partitions(first_day: date) -> None:
+    start = month_start(first_day)
+    last = month_start(date.today(), MONTHS_AHEAD)
+
+    while start <= last:
+        end = month_start(start, 1)
+        op.execute(
+            f'CREATE TABLE user_auth_y{start.year}m{start.month:02d} '
+            f"PARTITION OF user_auth FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        start = end
+
+    op.execute('CREATE TABLE user_auth_default PARTITION OF user_auth DEFAULT')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('login', sa.String, nullable=False, unique=True),
+            sa.Column('password', sa.String, nullable=False),
+        )
+
+    migrate_rows = inspector.has_table('user_auth')
+    if migrate_rows:
+        op.rename_table('user_auth', 'user_auth_unpartitioned')
+
+    op.create_table(
+        'user_auth',
+        sa.Column('id', UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id')),
+        sa.Column('user_agent', sa.String, nullable=False),
+        sa.Column('auth_date', sa.DateTime, nullable=False),
+        postgresql_partition_by='RANGE (auth_date)',
+    )
+
+    first_day = date.today()
+    if migrate_rows:
+        oldest = bind.scalar(
+            sa.text('SELECT min(auth_date) FROM user_auth_unpartitioned')
+        )
+        if oldest is not None:
+            first_day = min(first_day, oldest.date())
+
+    create_partitions(first_day)
+
+    if migrate_rows:
+        op.execute(
+            'INSERT INTO user_auth (id, user_id, user_agent, auth_date) '
+            'SELECT id, user_id, user_agent, auth_date '
+            'FROM user_auth_unpartitioned'
+        )
+        op.drop_table('user_auth_unpartitioned')
+
+    # Built after the rows are copied, and once the names of the
+    # constraints of the old table are free
+    op.create_primary_key('user_auth_pkey', 'user_auth', ['id', 'auth_date'])
+    op.create_index(
+        'ix_user_auth_user_id_auth_date', 'user_auth', ['user_id', 'auth_date']
+    )
+
+
+def downgrade() -> None:
+    op.rename_table('user_auth', 'user_auth_partitioned')
+    op.execute(
+        'ALTER TABLE user_auth_partitioned '
+        'RENAME CONSTRAINT user_auth_pkey TO user_auth_partitioned_pkey'
+    )
+    op.drop_index('ix_user_auth_user_id_auth_date')
+
+    op.create_table(
+        'user_auth',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id')),
+        sa.Column('user_agent', sa.String, nullable=False),
+        sa.Column('auth_date', sa.DateTime, nullable=False),
+    )
+    op.execute(
+        'INSERT INTO user_auth (id, user_id, user_agent, auth_date) '
+        'SELECT id, user_id, user_agent, auth_date FROM user_auth_partitioned'
+    )
+    # Partitions are dropped with their table
+    op.drop_table('user_auth_partitioned')
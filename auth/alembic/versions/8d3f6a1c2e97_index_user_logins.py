@@ -0,0 +1,54 @@
+"""index user logins
+
+Revision ID: 8d3f6a1c2e97
+Revises: 5b2e0c7d9a41
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3f6a1c2e97'
+down_revision = '5b2e0c7d9a41'
+branch_labels = None
+depends_on = None
+
+LOGIN_INDEX = 'ix_users_login'
+ID_CONSTRAINT = 'users_id_key'
+
+
+def unique_columns(inspector) -> list[list[str]]:
+    return [
+        *(
+            constraint['column_names']
+            for constraint in inspector.get_unique_constraints('users')
+        ),
+        *(
+            index['column_names']
+            for index in inspector.get_indexes('users') if index['unique']
+        ),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    unique = unique_columns(inspector)
+
+    # Registration inserts ON CONFLICT (login) and login looks users up
+    # by login, both need a unique index on it. Tables created before
+    # the migrations may lack it.
+    if ['login'] not in unique:
+        op.create_index(LOGIN_INDEX, 'users', ['login'], unique=True)
+
+    # db.create_all() built a second unique index on the primary key,
+    # which every registration had to update as well
+    constraints = inspector.get_unique_constraints('users')
+    if any(c['name'] == ID_CONSTRAINT for c in constraints):
+        op.drop_constraint(ID_CONSTRAINT, 'users', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint(ID_CONSTRAINT, 'users', ['id'])
+    op.execute(f'DROP INDEX IF EXISTS {LOGIN_INDEX}')
@@ -1,7 +1,13 @@
+from datetime import timedelta
+
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_restful import Resource, Api
-from auth.db.db import db, init_db
+from auth.db.db import db, init_db, token_store
+from auth.db.login_history import login_history_buffer
+from auth.db.partitions import LOCK_PARTITIONS, upcoming_partitions_ddl
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from auth.user.routes import create_authentication_routes
 from auth.user.views import RegisterApi
@@ -13,15 +19,63 @@ load_dotenv()
 
 app = Flask(__name__)
 app.config['JWT_SECRET_KEY'] = os.getenv('SECRET_KEY')
+app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(
+    minutes=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES_MINUTES', 15))
+)
+app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(
+    days=int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES_DAYS', 30))
+)
 jwt = JWTManager(app)
 
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
+    """
+    Check access tokens against the Redis denylist, with no database
+    query. Refresh tokens are checked when their session is rotated.
+    """
+    if jwt_payload['type'] != 'access':
+        return False
+
+    return token_store.is_revoked(jwt_payload['jti'])
+
+
 api = Api(app)
 
 create_authentication_routes(api=api)
 
 
+def create_login_history_partitions():
+    """
+    Create partitions of the login history for the next months.
+    A partition that cannot be created is logged and skipped, logins
+    of its month are recorded in the default partition.
+    """
+    months_ahead = int(os.getenv('LOGIN_HISTORY_PARTITIONS_AHEAD', 3))
+
+    with app.app_context():
+        try:
+            db.session.execute(text(LOCK_PARTITIONS))
+
+            for statement in upcoming_partitions_ddl(months_ahead):
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(text(statement))
+                except SQLAlchemyError:
+                    app.logger.exception('Failed to create a partition')
+
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            app.logger.exception(
+                'Failed to create login history partitions'
+            )
+
+
 def main():
     init_db(app)
+    create_login_history_partitions()
+    login_history_buffer.start(app)
     app.run(debug=True)
 
     return app
@@ -0,0 +1,149 @@
+"""Endpoints of the Flask application auth API, same bodies and codes."""
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
+
+from auth.async_app.db import get_login_rate_limiter
+from auth.async_app.schemes import Credentials
+from auth.async_app.security import get_user_id
+from auth.async_app.service import AuthError, AuthService, get_auth_service
+from auth.utils.hashing import HashingOverloaded
+from auth.utils.pagination import InvalidCursor
+from auth.utils.rate_limit import (AsyncSlidingWindow, client_address,
+                                   login_limits)
+
+router = APIRouter()
+
+# Seconds a client should wait before retrying while hashing is overloaded
+RETRY_AFTER = 1
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+
+def generate_response(
+    data: dict | None = None,
+    message: str | list | None = None,
+    status_code: int = status.HTTP_400_BAD_REQUEST
+) -> ORJSONResponse:
+    """Return the response body of utils.common.generate_response."""
+
+    succeeded = status_code in (status.HTTP_200_OK, status.HTTP_201_CREATED)
+    if isinstance(message, str) and not succeeded:
+        message = [{'error': message}]
+
+    return ORJSONResponse(
+        status_code=status_code,
+        content={'data': data, 'message': message, 'status': succeeded},
+    )
+
+
+def overloaded_response() -> ORJSONResponse:
+    """Shed the request when all hashing threads are busy."""
+
+    response = generate_response(
+        message='Server is busy, retry later',
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response.headers['Retry-After'] = str(RETRY_AFTER)
+
+    return response
+
+
+@router.post('/register')
+async def register(
+    credentials: Credentials,
+    auth_service: AuthService = Depends(get_auth_service)
+) -> ORJSONResponse:
+    try:
+        await auth_service.register(credentials.login, credentials.password)
+    except AuthError as exc:
+        return generate_response(message=str(exc))
+    except HashingOverloaded:
+        return overloaded_response()
+
+    return generate_response(
+        data={'login': credentials.login},
+        message='User Created',
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+async def check_login_rate_limit(
+    request: Request,
+    credentials: Credentials,
+    rate_limiter: AsyncSlidingWindow = Depends(get_login_rate_limiter)
+) -> ORJSONResponse | None:
+    """Count the login attempt of the client address and of the login."""
+
+    address = client_address(
+        request.client.host if request.client else None,
+        request.headers.get('x-real-ip')
+    )
+    try:
+        retry_after = await rate_limiter.hit(
+            login_limits(address, credentials.login)
+        )
+    except RedisError:
+        return None
+
+    if not retry_after:
+        return None
+
+    response = generate_response(
+        message='Too many login attempts, retry later',
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response.headers['Retry-After'] = str(retry_after)
+
+    return response
+
+
+@router.post('/login')
+async def login(
+    request: Request,
+    credentials: Credentials,
+    rate_limited: ORJSONResponse | None = Depends(check_login_rate_limit),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> ORJSONResponse:
+    if rate_limited:
+        return rate_limited
+
+    try:
+        tokens = await auth_service.login(
+            credentials.login,
+            credentials.password,
+            request.headers.get('user-agent', ''),
+        )
+    except AuthError as exc:
+        return generate_response(message=str(exc))
+    except HashingOverloaded:
+        return overloaded_response()
+
+    return generate_response(
+        data=tokens.dict(),
+        message='User login successfully',
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.get('/history')
+async def login_history(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    user_id: str = Depends(get_user_id),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> ORJSONResponse:
+    """Logins of the user, pages follow each other with next_cursor."""
+
+    try:
+        page = await auth_service.history(user_id, limit, cursor)
+    except InvalidCursor as exc:
+        return generate_response(message=str(exc))
+
+    return generate_response(
+        data=page.dict(),
+        message='Login history',
+        status_code=status.HTTP_200_OK,
+    )
@@ -0,0 +1,64 @@
+"""Settings of the async auth application."""
+
+import os
+from pathlib import Path
+
+from pydantic import BaseSettings, Field, validator
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+class Settings(BaseSettings):
+    PROJECT_NAME: str = 'auth'
+
+    AUTH_HOST: str = '0.0.0.0'
+    AUTH_PORT: int = 5001
+    AUTH_WORKERS: int = 1
+
+    SECRET_KEY: str
+    SQLALCHEMY_DATABASE_URI: str
+    # Connections of one worker, a login waits up to
+    # AUTH_DB_POOL_TIMEOUT seconds for a free one
+    AUTH_DB_POOL_SIZE: int = 20
+    AUTH_DB_MAX_OVERFLOW: int = 10
+    AUTH_DB_POOL_TIMEOUT: int = 10
+    AUTH_DB_POOL_RECYCLE: int = 30 * 60
+
+    REDIS_HOST: str = 'localhost'
+    REDIS_PORT: int = 6379
+    AUTH_REDIS_DB: int = 2
+    # Seconds the credentials of a user are cached after a login
+    USER_CACHE_TTL: int = 60
+
+    # Logins are written in batches every LOGIN_HISTORY_FLUSH_MS,
+    # or once LOGIN_HISTORY_BATCH_SIZE of them are waiting
+    LOGIN_HISTORY_FLUSH_MS: int = 200
+    LOGIN_HISTORY_BATCH_SIZE: int = 500
+    LOGIN_HISTORY_MAX_SIZE: int = 10000
+    LOGIN_HISTORY_PARTITIONS_AHEAD: int = 3
+
+    JWT_ACCESS_TOKEN_EXPIRES_MINUTES: int = 15
+    JWT_REFRESH_TOKEN_EXPIRES_DAYS: int = 30
+    # Cost of the password hashes, as Flask-Bcrypt uses by default.
+    # Hashes of another cost are replaced when their users log in
+    BCRYPT_LOG_ROUNDS: int = 12
+    # Hashing threads of a worker and hashes queued for them,
+    # further logins are refused with 503
+    HASHING_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    HASHING_MAX_QUEUE: int = 32
+
+    @validator('SQLALCHEMY_DATABASE_URI')
+    def use_async_driver(cls, value: str) -> str:
+        """Connect with asyncpg to the database of the Flask application."""
+
+        scheme, _, rest = value.partition('://')
+        if scheme in ('postgres', 'postgresql', 'postgresql+psycopg2'):
+            return f'postgresql+asyncpg://{rest}'
+
+        return value
+
+    class Config:
+        env_file = BASE_DIR / '.env'
+
+
+settings = Settings()
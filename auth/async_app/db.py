@@ -0,0 +1,69 @@
+from fastapi import Request
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
+
+from auth.async_app.config import settings
+from auth.async_app.history import LoginHistoryWriter
+from auth.db.token_store import AsyncTokenStore
+from auth.db.user_cache import AsyncUserCache
+from auth.utils.hashing import PasswordHasher
+from auth.utils.rate_limit import AsyncSlidingWindow
+
+
+def create_engine() -> AsyncEngine:
+    """Create an engine with a bounded pool of asyncpg connections."""
+
+    return create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        pool_size=settings.AUTH_DB_POOL_SIZE,
+        max_overflow=settings.AUTH_DB_MAX_OVERFLOW,
+        pool_timeout=settings.AUTH_DB_POOL_TIMEOUT,
+        pool_recycle=settings.AUTH_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def create_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        rounds=settings.BCRYPT_LOG_ROUNDS,
+        workers=settings.HASHING_WORKERS,
+        max_queue=settings.HASHING_MAX_QUEUE,
+    )
+
+
+def create_redis() -> Redis:
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.AUTH_REDIS_DB,
+    )
+
+
+async def get_session(request: Request) -> AsyncSession:
+    async with request.state.sessionmaker() as session:
+        yield session
+
+
+async def get_token_store(request: Request) -> AsyncTokenStore:
+    return request.state.token_store
+
+
+async def get_user_cache(request: Request) -> AsyncUserCache:
+    return request.state.user_cache
+
+
+async def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.state.password_hasher
+
+
+async def get_login_history(request: Request) -> LoginHistoryWriter:
+    return request.state.login_history
+
+
+async def get_login_rate_limiter(request: Request) -> AsyncSlidingWindow:
+    return request.state.login_rate_limiter
@@ -0,0 +1,121 @@
+"""Login history written in batches, off the login requests."""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from auth.async_app.models import LoginHistory
+from auth.db.partitions import LOCK_PARTITIONS, upcoming_partitions_ddl
+
+logger = logging.getLogger(__name__)
+
+
+async def create_partitions(engine: AsyncEngine, months_ahead: int) -> None:
+    """
+    Create partitions of the login history for the next months.
+
+    A partition that cannot be created, e.g. of a month the default
+    partition already has rows of, is logged and skipped: logins are
+    then recorded in the default partition and the application starts.
+    """
+
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text(LOCK_PARTITIONS))
+
+            for statement in upcoming_partitions_ddl(months_ahead):
+                try:
+                    async with connection.begin_nested():
+                        await connection.execute(text(statement))
+                except SQLAlchemyError:
+                    logger.exception('Failed to create a partition')
+    except SQLAlchemyError:
+        logger.exception('Failed to create login history partitions')
+
+
+class LoginHistoryWriter:
+    """
+    LoginHistoryBuffer of the Flask application for asyncio: records
+    of logins are inserted with one multi-row INSERT every
+    flush_interval seconds, or as soon as batch_size of them are
+    waiting, so a login costs no database round trip.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        flush_interval: float,
+        batch_size: int,
+        max_size: int
+    ) -> None:
+        self.sessionmaker = sessionmaker
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self._rows = []
+        self._wake = asyncio.Event()
+        self._stopped = False
+        self._task = None
+
+    def add(self, user_id: uuid.UUID, user_agent: str) -> None:
+        """Record a login of the user at the current time."""
+
+        if len(self._rows) >= self.max_size:
+            logger.warning('Login history buffer is full, record dropped')
+            return
+
+        self._rows.append({
+            'id': uuid.uuid4(),
+            'user_id': user_id,
+            'user_agent': user_agent,
+            'auth_date': datetime.now(),
+        })
+        if len(self._rows) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Insert the waiting records."""
+
+        rows, self._rows = self._rows, []
+
+        if not rows:
+            return
+
+        async with self.sessionmaker() as session:
+            try:
+                await session.execute(insert(LoginHistory), rows)
+                await session.commit()
+            except SQLAlchemyError:
+                logger.exception(
+                    'Failed to write %s login history records', len(rows)
+                )
+
+    async def _run(self) -> None:
+        while not self._stopped:
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop flushing and write the remaining records."""
+
+        if self._task is not None:
+            self._stopped = True
+            self._wake.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
@@ -0,0 +1,90 @@
+"""Async auth application, serving the Flask application endpoints.
+
+Run from the repository root:
+    uvicorn auth.async_app.main:app --port 5001 --workers 4
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+
+from auth.async_app import api
+from auth.async_app.config import settings
+from auth.async_app.db import (create_engine, create_password_hasher,
+                               create_redis, create_sessionmaker)
+from auth.async_app.history import LoginHistoryWriter, create_partitions
+from auth.db.token_store import AsyncTokenStore
+from auth.db.user_cache import AsyncUserCache
+from auth.utils.rate_limit import AsyncSlidingWindow
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[dict]:
+    """
+    Create the database pool, the token store, the hashing threads
+    and the login history writer of the worker.
+    """
+
+    engine = create_engine()
+    sessionmaker = create_sessionmaker(engine)
+    redis = create_redis()
+    password_hasher = create_password_hasher()
+    login_history = LoginHistoryWriter(
+        sessionmaker,
+        flush_interval=settings.LOGIN_HISTORY_FLUSH_MS / 1000,
+        batch_size=settings.LOGIN_HISTORY_BATCH_SIZE,
+        max_size=settings.LOGIN_HISTORY_MAX_SIZE,
+    )
+
+    await create_partitions(engine, settings.LOGIN_HISTORY_PARTITIONS_AHEAD)
+    login_history.start()
+
+    yield {
+        'sessionmaker': sessionmaker,
+        'token_store': AsyncTokenStore(redis),
+        'user_cache': AsyncUserCache(redis, settings.USER_CACHE_TTL),
+        'password_hasher': password_hasher,
+        'login_history': login_history,
+        'login_rate_limiter': AsyncSlidingWindow(redis),
+    }
+
+    await login_history.stop()
+    password_hasher.shutdown()
+    await redis.close(close_connection_pool=True)
+    await engine.dispose()
+
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    docs_url='/api/openapi',
+    openapi_url='/api/openapi.json',
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+
+# Report invalid credentials as the Flask application does
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(
+    request: Request, exc: RequestValidationError
+) -> ORJSONResponse:
+    return api.generate_response(message=[
+        {'error': f'{error["loc"][-1]}: {error["msg"]}'}
+        for error in exc.errors()
+    ])
+
+
+app.include_router(api.router, prefix='/api/v1/auth', tags=['auth'])
+
+
+if __name__ == '__main__':
+    uvicorn.run(
+        'auth.async_app.main:app',
+        host=settings.AUTH_HOST,
+        port=settings.AUTH_PORT,
+        workers=settings.AUTH_WORKERS,
+    )
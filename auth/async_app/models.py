@@ -0,0 +1,36 @@
+"""Tables of the Flask application models, mapped for asyncio."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String, Uuid
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, primary_key=True, default=uuid.uuid4
+    )
+    login: Mapped[str] = mapped_column(String, unique=True)
+    password: Mapped[str] = mapped_column(String)
+
+
+class LoginHistory(Base):
+    __tablename__ = 'user_auth'
+    __table_args__ = (
+        Index('ix_user_auth_user_id_auth_date', 'user_id', 'auth_date'),
+        {'postgresql_partition_by': 'RANGE (auth_date)'},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey(User.id))
+    user_agent: Mapped[str] = mapped_column(String)
+    auth_date: Mapped[datetime] = mapped_column(primary_key=True)
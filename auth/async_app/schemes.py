@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class Credentials(BaseModel):
+    """Login must be at least 4 characters, password at least 6."""
+
+    login: str = Field(min_length=4)
+    password: str = Field(min_length=6)
+
+
+class Tokens(BaseModel):
+    access_token: str
+    refresh_token: str
+
+
+class Login(BaseModel):
+    user_agent: str
+    auth_date: datetime
+
+
+class LoginHistoryPage(BaseModel):
+    results: list[Login]
+    next_cursor: str | None
@@ -0,0 +1,47 @@
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from auth.async_app.config import settings
+from auth.async_app.db import get_token_store
+from auth.async_app.tokens import ALGORITHM
+from auth.db.token_store import AsyncTokenStore
+
+bearer = HTTPBearer(auto_error=False)
+
+
+async def get_user_id(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer),
+    token_store: AsyncTokenStore = Depends(get_token_store),
+) -> str:
+    """Return the user of the access token, as jwt_required() checks it."""
+
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Missing Authorization Header',
+        )
+
+    try:
+        claims = jwt.decode(
+            credentials.credentials, settings.SECRET_KEY,
+            algorithms=[ALGORITHM],
+        )
+    except jwt.PyJWTError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
+        )
+
+    if claims.get('type') != 'access':
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Only access tokens are allowed',
+        )
+
+    if await token_store.is_revoked(claims['jti']):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Token has been revoked',
+        )
+
+    return claims['sub']
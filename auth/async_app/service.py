@@ -0,0 +1,189 @@
+import uuid
+
+from fastapi import Depends
+from redis.exceptions import RedisError
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.async_app.db import (get_login_history, get_password_hasher,
+                               get_session, get_token_store, get_user_cache)
+from auth.async_app.history import LoginHistoryWriter
+from auth.async_app.models import LoginHistory, User
+from auth.async_app.schemes import Login, LoginHistoryPage, Tokens
+from auth.async_app.tokens import create_session_tokens, refresh_expires
+from auth.db.token_store import AsyncTokenStore
+from auth.db.user_cache import AsyncUserCache
+from auth.utils.hashing import PasswordHasher
+from auth.utils.pagination import decode_cursor, encode_cursor
+
+
+class AuthError(Exception):
+    """Credentials are rejected, the message is sent to the client."""
+
+
+class AuthService:
+    """
+    Registration and login of users.
+
+    bcrypt takes a few hundred milliseconds of CPU per password,
+    it runs on the hashing threads so the event loop keeps serving
+    other requests meanwhile. HashingOverloaded is raised when
+    they are all busy.
+
+    Credentials read on login are cached for a short while, the
+    cache is skipped while Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        token_store: AsyncTokenStore,
+        user_cache: AsyncUserCache,
+        password_hasher: PasswordHasher,
+        login_history: LoginHistoryWriter
+    ) -> None:
+        self.session = session
+        self.token_store = token_store
+        self.user_cache = user_cache
+        self.password_hasher = password_hasher
+        self.login_history = login_history
+
+    async def _cache_credentials(
+        self, login: str, user_id: uuid.UUID, password: str
+    ) -> None:
+        try:
+            await self.user_cache.set(login, user_id, password)
+        except RedisError:
+            pass
+
+    async def _get_credentials(
+        self, login: str
+    ) -> tuple[uuid.UUID, str] | None:
+        """Return the id and password hash of the user."""
+
+        try:
+            credentials = await self.user_cache.get(login)
+        except RedisError:
+            credentials = None
+        if credentials is not None:
+            return credentials
+
+        row = (await self.session.execute(
+            select(User.id, User.password).where(User.login == login)
+        )).first()
+        if row is None:
+            return None
+
+        await self._cache_credentials(login, row.id, row.password)
+
+        return row.id, row.password
+
+    async def register(self, login: str, password: str) -> None:
+        password_hash = await self.password_hasher.ahash(password)
+
+        # One round trip, and no race between a check and the insert:
+        # a taken login inserts nothing and returns no id
+        user_id = await self.session.scalar(
+            insert(User)
+            .values(login=login, password=password_hash)
+            .on_conflict_do_nothing(index_elements=[User.login])
+            .returning(User.id)
+        )
+        await self.session.commit()
+
+        if user_id is None:
+            raise AuthError('Username already exists')
+
+    async def login(
+        self, login: str, password: str, user_agent: str
+    ) -> Tokens:
+        credentials = await self._get_credentials(login)
+
+        if credentials is None:
+            raise AuthError('User not found')
+
+        user_uuid, password_hash = credentials
+        password_matches = await self.password_hasher.averify(
+            password_hash, password
+        )
+        if not password_matches:
+            raise AuthError('Password is wrong')
+
+        # The cost has changed since the password was hashed
+        if self.password_hasher.needs_rehash(password_hash):
+            password_hash = await self.password_hasher.ahash(password)
+            await self.session.execute(
+                update(User)
+                .where(User.id == user_uuid)
+                .values(password=password_hash)
+            )
+            await self.session.commit()
+            await self._cache_credentials(login, user_uuid, password_hash)
+
+        user_id = str(user_uuid)
+        sid = str(uuid.uuid4())
+        access_token, refresh_token, access, refresh = create_session_tokens(
+            user_id, sid, fresh=True
+        )
+        await self.token_store.add_session(
+            user_id=user_id,
+            sid=sid,
+            refresh_jti=refresh['jti'],
+            access_jti=access['jti'],
+            access_exp=access['exp'],
+            refresh_expires_in=int(refresh_expires().total_seconds()),
+        )
+
+        self.login_history.add(user_uuid, user_agent)
+
+        return Tokens(access_token=access_token, refresh_token=refresh_token)
+
+    async def history(
+        self, user_id: str, limit: int, cursor: str | None = None
+    ) -> LoginHistoryPage:
+        """
+        Return a page of logins of the user, the latest first.
+
+        :raise InvalidCursor: The cursor is not one of a previous page.
+        """
+
+        query = select(LoginHistory).where(
+            LoginHistory.user_id == uuid.UUID(user_id)
+        )
+        if cursor:
+            auth_date, row_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(LoginHistory.auth_date, LoginHistory.id)
+                < tuple_(auth_date, row_id)
+            )
+
+        rows = (await self.session.scalars(
+            query.order_by(
+                LoginHistory.auth_date.desc(), LoginHistory.id.desc()
+            ).limit(limit + 1)
+        )).all()
+        page = rows[:limit]
+
+        return LoginHistoryPage(
+            results=[
+                Login(user_agent=row.user_agent, auth_date=row.auth_date)
+                for row in page
+            ],
+            next_cursor=(
+                encode_cursor(page[-1].auth_date, page[-1].id)
+                if len(rows) > limit else None
+            ),
+        )
+
+
+def get_auth_service(
+    session: AsyncSession = Depends(get_session),
+    token_store: AsyncTokenStore = Depends(get_token_store),
+    user_cache: AsyncUserCache = Depends(get_user_cache),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    login_history: LoginHistoryWriter = Depends(get_login_history),
+) -> AuthService:
+    return AuthService(
+        session, token_store, user_cache, password_hasher, login_history
+    )
@@ -0,0 +1,73 @@
+"""JWTs with the claims Flask-JWT-Extended issues and verifies.
+
+Both applications share SECRET_KEY, so tokens of one are accepted by
+the other and sessions live in the same token store.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from auth.async_app.config import settings
+
+ALGORITHM = 'HS256'
+
+
+def access_expires() -> timedelta:
+    return timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRES_MINUTES)
+
+
+def refresh_expires() -> timedelta:
+    return timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRES_DAYS)
+
+
+def create_token(
+    user_id: str,
+    token_type: str,
+    expires: timedelta,
+    sid: str,
+    fresh: bool = False
+) -> tuple[str, dict]:
+    """
+    Create a token of the session.
+
+    :return: The token and its claims.
+    """
+
+    now = datetime.now(timezone.utc)
+    claims = {
+        'iat': now,
+        'nbf': now,
+        'jti': str(uuid.uuid4()),
+        'exp': now + expires,
+        'sub': user_id,
+        'type': token_type,
+        'sid': sid,
+    }
+    if token_type == 'access':
+        claims['fresh'] = fresh
+
+    token = jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+    claims['exp'] = int(claims['exp'].timestamp())
+
+    return token, claims
+
+
+def create_session_tokens(
+    user_id: str, sid: str, fresh: bool = False
+) -> tuple[str, str, dict, dict]:
+    """
+    Create an access and a refresh token of the session.
+
+    :return: The tokens and their claims.
+    """
+
+    access_token, access = create_token(
+        user_id, 'access', access_expires(), sid, fresh
+    )
+    refresh_token, refresh = create_token(
+        user_id, 'refresh', refresh_expires(), sid
+    )
+
+    return access_token, refresh_token, access, refresh
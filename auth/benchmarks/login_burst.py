@@ -0,0 +1,130 @@
+"""Burst of logins against the Flask and the async auth applications.
+
+Every run registers its own users, then logs them all in at once, as
+clients do after a deploy. Latency percentiles and throughput of both
+phases are printed per application. Run from the repository root:
+    python -m auth.benchmarks.login_burst \
+        --url http://localhost:5000 --url http://localhost:5001 \
+        --users 500 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import aiohttp
+
+PASSWORD = 'benchmark-password'
+
+
+async def call(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    login: str
+) -> tuple[float, bool]:
+    """Send the credentials, return the latency and whether it succeeded."""
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with session.post(
+                url,
+                json={'login': login, 'password': PASSWORD},
+                headers={'User-Agent': 'login-burst'},
+            ) as response:
+                await response.read()
+                succeeded = response.status == 201
+        except aiohttp.ClientError:
+            succeeded = False
+
+        return time.perf_counter() - start, succeeded
+
+
+def percentile(latencies: list[float], q: int) -> float:
+    """Return the q-th percentile in ms."""
+
+    if len(latencies) < 2:
+        return round(sum(latencies) * 1000, 2)
+
+    return round(statistics.quantiles(latencies, n=100)[q - 1] * 1000, 2)
+
+
+async def burst(
+    session: aiohttp.ClientSession,
+    url: str,
+    logins: list[str],
+    concurrency: int
+) -> dict:
+    """Send a request of every login at once, at most concurrency at a time."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(call(session, semaphore, url, login) for login in logins)
+    )
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, _ in results]
+
+    return {
+        'requests': len(results),
+        'failures': sum(not succeeded for _, succeeded in results),
+        'rps': round(len(results) / elapsed, 2),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+    }
+
+
+async def benchmark(base_url: str, users: int, concurrency: int) -> dict:
+    """Register users and log them in, return stats of both phases."""
+
+    run = uuid.uuid4().hex[:8]
+    logins = [f'bench-{run}-{number}' for number in range(users)]
+    timeout = aiohttp.ClientTimeout(total=None)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout
+    ) as session:
+        return {
+            phase: await burst(
+                session, f'{base_url}/api/v1/auth/{phase}', logins,
+                concurrency
+            )
+            for phase in ('register', 'login')
+        }
+
+
+async def main(args: argparse.Namespace) -> None:
+    report = {}
+
+    for url in args.url:
+        report[url] = await benchmark(url, args.users, args.concurrency)
+        for phase, stats in report[url].items():
+            print(
+                f'{url:30} {phase:9} {stats["requests"]:6} req '
+                f'{stats["failures"]:5} fail {stats["rps"]:8.2f} rps  '
+                f'p50 {stats["p50"]:8} ms  p95 {stats["p95"]:8} ms  '
+                f'p99 {stats["p99"]:8} ms'
+            )
+
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--url', action='append', required=True,
+        help='base URL of an auth application, may be repeated'
+    )
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--report', help='path of a JSON report')
+
+    asyncio.run(main(parser.parse_args()))
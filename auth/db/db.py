@@ -4,11 +4,22 @@ from dotenv import load_dotenv
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
+from auth.db.token_store import TokenStore
+from auth.db.user_cache import UserCache
+from auth.utils.rate_limit import SlidingWindow
+
 
 load_dotenv()
 
 db = SQLAlchemy()
-redis_db = redis.Redis(host='localhost', port=6379, db=0)
+redis_db = redis.Redis(
+    host=os.getenv('REDIS_HOST', 'localhost'),
+    port=int(os.getenv('REDIS_PORT', 6379)),
+    db=int(os.getenv('AUTH_REDIS_DB', 2))
+)
+token_store = TokenStore(redis_db)
+user_cache = UserCache(redis_db)
+login_rate_limiter = SlidingWindow(redis_db)
 
 
 dsl = os.getenv('SQLALCHEMY_DATABASE_URI')
@@ -1,10 +1,10 @@
 """Data models."""
 
 import uuid
-from flask_bcrypt import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.dialects.postgresql import UUID
 from auth.db.db import db
+from auth.utils.hashing import password_hasher
 from sqlalchemy import ForeignKey
 
 
@@ -17,7 +17,6 @@ class User(db.Model):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         nullable=False
     )
     login = db.Column(db.String, unique=True, nullable=False)
@@ -42,7 +41,7 @@ class User(db.Model):
         then store the hashed password in the DB.
 
         """
-        self.password = generate_password_hash(self.password).decode("utf8")
+        self.password = password_hasher.hash(self.password)
 
     def check_password(self, password: str) -> bool:
         """Take a plaintext password, hash it and compare
@@ -51,19 +50,27 @@ class User(db.Model):
         :param password: The password to be checked.
         :return: The password is being returned.
         """
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
 
 
 class LoginHistory(db.Model):
+    """
+    Logins of users, partitioned by month of auth_date.
+    The partition key has to be a part of the primary key.
+    """
+
     __tablename__: str = 'user_auth'
+    __table_args__ = (
+        db.Index('ix_user_auth_user_id_auth_date', 'user_id', 'auth_date'),
+        {'postgresql_partition_by': 'RANGE (auth_date)'},
+    )
 
     id = db.Column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         nullable=False
     )
     user_id = db.Column(UUID(as_uuid=True), ForeignKey(User.id))
     user_agent = db.Column(db.String, nullable=False)
-    auth_date = db.Column(db.DateTime, nullable=False)
+    auth_date = db.Column(db.DateTime, primary_key=True, nullable=False)
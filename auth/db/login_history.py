@@ -0,0 +1,115 @@
+"""Login history written in batches, off the login requests."""
+
+import atexit
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from dotenv import load_dotenv
+from flask import Flask
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from auth.db.db import db
+from auth.db.db_models import LoginHistory
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class LoginHistoryBuffer:
+    """
+    Records of logins kept in memory and inserted with one multi-row
+    INSERT every flush_interval seconds, or as soon as batch_size of
+    them are waiting. A login then costs no database round trip.
+
+    Records over max_size are dropped while the database is down,
+    as are those of a failed flush, rather than slowing logins.
+    """
+
+    def __init__(
+        self, flush_interval: float, batch_size: int, max_size: int
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._app = None
+
+    def add(self, user_id: uuid.UUID, user_agent: str) -> None:
+        """Record a login of the user at the current time."""
+
+        with self._lock:
+            if len(self._rows) >= self.max_size:
+                logger.warning('Login history buffer is full, record dropped')
+                return
+
+            self._rows.append({
+                'id': uuid.uuid4(),
+                'user_id': user_id,
+                'user_agent': user_agent,
+                'auth_date': datetime.now(),
+            })
+            if len(self._rows) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> None:
+        """Insert the waiting records."""
+
+        with self._lock:
+            rows, self._rows = self._rows, []
+
+        if not rows:
+            return
+
+        with self._app.app_context():
+            try:
+                db.session.execute(insert(LoginHistory), rows)
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception(
+                    'Failed to write %s login history records', len(rows)
+                )
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self, app: Flask) -> None:
+        """Start flushing in a background thread of the application."""
+
+        self._app = app
+        self._thread = threading.Thread(
+            target=self._run, name='login-history', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the background thread and write the remaining records."""
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+
+login_history_buffer = LoginHistoryBuffer(
+    flush_interval=int(os.getenv('LOGIN_HISTORY_FLUSH_MS', 200)) / 1000,
+    batch_size=int(os.getenv('LOGIN_HISTORY_BATCH_SIZE', 500)),
+    max_size=int(os.getenv('LOGIN_HISTORY_MAX_SIZE', 10000)),
+)
@@ -0,0 +1,63 @@
+"""Monthly partitions of the login history table.
+
+Rows of months without a partition go to the default one, partitions
+are created ahead so that it stays empty: a partition cannot be added
+for a range the default partition already has rows of.
+"""
+
+from datetime import date
+
+LOGIN_HISTORY_TABLE = 'user_auth'
+# Workers starting at once create the partitions one at a time, as
+# concurrent CREATE TABLE IF NOT EXISTS can fail on pg_type. The lock
+# is held until the end of the transaction.
+LOCK_PARTITIONS = (
+    f"SELECT pg_advisory_xact_lock(hashtext('{LOGIN_HISTORY_TABLE}'))"
+)
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """Return the first day of the month, months after the one of day."""
+
+    month = day.month - 1 + months
+
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f'{LOGIN_HISTORY_TABLE}_y{start.year}m{start.month:02d}'
+
+
+def login_history_partitions_ddl(
+    first_day: date, last_day: date
+) -> list[str]:
+    """Return statements creating the partitions of the months in range."""
+
+    statements = []
+    start = month_start(first_day)
+
+    while start <= last_day:
+        end = month_start(start, 1)
+        statements.append(
+            f'CREATE TABLE IF NOT EXISTS {partition_name(start)} '
+            f'PARTITION OF {LOGIN_HISTORY_TABLE} '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        start = end
+
+    statements.append(
+        f'CREATE TABLE IF NOT EXISTS {LOGIN_HISTORY_TABLE}_default '
+        f'PARTITION OF {LOGIN_HISTORY_TABLE} DEFAULT'
+    )
+
+    return statements
+
+
+def upcoming_partitions_ddl(months_ahead: int) -> list[str]:
+    """Return statements creating partitions up to months_ahead."""
+
+    today = date.today()
+
+    return login_history_partitions_ddl(
+        today, month_start(today, months_ahead)
+    )
@@ -0,0 +1,273 @@
+"""Redis storage of user sessions and revoked tokens."""
+
+import time
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+# Swap the refresh token of a session only if the one presented is
+# the current one, so a refresh token can be used once. The session
+# set of the user is kept as long as the session, so that logging
+# out everywhere finds it.
+# Returns the access token jti and exp replaced, or nothing if the
+# session is gone or the refresh token was already used.
+ROTATE_REFRESH_SCRIPT = """
+local session = KEYS[1]
+if redis.call('HGET', session, 'refresh_jti') ~= ARGV[1] then
+    return nil
+end
+local old = redis.call('HMGET', session, 'access_jti', 'access_exp')
+redis.call('HSET', session,
+    'refresh_jti', ARGV[2], 'access_jti', ARGV[3], 'access_exp', ARGV[4])
+redis.call('EXPIRE', session, ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return old
+"""
+
+
+class BaseTokenStore:
+    """
+    Keys and commands of the token store, shared by the sync and async
+    clients, which only send them.
+
+    - session:{sid} is a hash with user_id, refresh_jti, access_jti and
+      access_exp of a login, kept as long as its refresh token is valid
+    - user_sessions:{user_id} is the set of session ids of the user
+    - denylist:{jti} marks a revoked access token until it expires
+    """
+
+    @staticmethod
+    def _session_key(sid: str) -> str:
+        return f'session:{sid}'
+
+    @staticmethod
+    def _user_sessions_key(user_id: str) -> str:
+        return f'user_sessions:{user_id}'
+
+    @staticmethod
+    def _denylist_key(jti: str) -> str:
+        return f'denylist:{jti}'
+
+    @staticmethod
+    def _denylist_ttl(exp: int) -> int:
+        """Return seconds left until the token expires."""
+
+        return exp - int(time.time())
+
+    def _add_session(
+        self,
+        pipe,
+        user_id: str,
+        sid: str,
+        refresh_jti: str,
+        access_jti: str,
+        access_exp: int,
+        refresh_expires_in: int
+    ) -> None:
+        """Queue the commands saving a new session of the user."""
+
+        session_key = self._session_key(sid)
+        user_sessions_key = self._user_sessions_key(user_id)
+
+        pipe.hset(session_key, mapping={
+            'user_id': user_id,
+            'refresh_jti': refresh_jti,
+            'access_jti': access_jti,
+            'access_exp': access_exp,
+        })
+        pipe.expire(session_key, refresh_expires_in)
+        pipe.sadd(user_sessions_key, sid)
+        pipe.expire(user_sessions_key, refresh_expires_in)
+
+    def _rotate_refresh_call(
+        self,
+        user_id: str,
+        sid: str,
+        refresh_jti: str,
+        new_refresh_jti: str,
+        new_access_jti: str,
+        new_access_exp: int,
+        refresh_expires_in: int
+    ) -> dict:
+        """Return the keys and args of ROTATE_REFRESH_SCRIPT."""
+
+        return {
+            'keys': [
+                self._session_key(sid), self._user_sessions_key(user_id)
+            ],
+            'args': [
+                refresh_jti, new_refresh_jti, new_access_jti,
+                new_access_exp, refresh_expires_in,
+            ],
+        }
+
+    @staticmethod
+    def _access_token(access_jti: bytes | None, access_exp) -> tuple | None:
+        """Return the jti and exp of an access token stored, if any."""
+
+        if not access_jti:
+            return None
+
+        return access_jti.decode(), int(access_exp)
+
+    def _deny(self, pipe, jti: str, exp: int) -> None:
+        """Queue the command revoking an access token until it expires."""
+
+        expires_in = self._denylist_ttl(exp)
+
+        if expires_in > 0:
+            pipe.set(self._denylist_key(jti), 1, ex=expires_in)
+
+    def _revoke_session(self, pipe, sid: str, session: dict) -> None:
+        """Queue the commands removing the session and its access token."""
+
+        self._deny(
+            pipe, session[b'access_jti'].decode(), int(session[b'access_exp'])
+        )
+        pipe.delete(self._session_key(sid))
+        pipe.srem(self._user_sessions_key(session[b'user_id'].decode()), sid)
+
+
+class TokenStore(BaseTokenStore):
+    """
+    Sessions and revoked tokens of users, so that protected requests
+    check a token with one Redis lookup instead of a database query.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._rotate_refresh = redis.register_script(ROTATE_REFRESH_SCRIPT)
+
+    def add_session(self, **session) -> None:
+        """
+        Save a new session of the user.
+
+        :param session: user_id, sid, refresh_jti, access_jti, access_exp
+            and refresh_expires_in, the refresh token lifetime in seconds.
+        """
+
+        with self.redis.pipeline() as pipe:
+            self._add_session(pipe, **session)
+            pipe.execute()
+
+    def rotate_refresh(self, sid: str, **tokens) -> bool:
+        """
+        Replace the tokens of a session when its refresh token is used.
+        The access token replaced is revoked.
+
+        A refresh token used twice means it has leaked, the session is
+        then revoked and False is returned.
+
+        :param tokens: user_id, refresh_jti presented, new_refresh_jti,
+            new_access_jti, new_access_exp and refresh_expires_in.
+        """
+
+        replaced = self._rotate_refresh(
+            **self._rotate_refresh_call(sid=sid, **tokens)
+        )
+
+        if not replaced:
+            self.revoke_session(sid)
+            return False
+
+        access_token = self._access_token(*replaced)
+        if access_token:
+            self.deny(*access_token)
+
+        return True
+
+    def is_refresh_active(self, sid: str, refresh_jti: str) -> bool:
+        """Check that the refresh token is the current one of its session."""
+
+        current = self.redis.hget(self._session_key(sid), 'refresh_jti')
+
+        return current is not None and current.decode() == refresh_jti
+
+    def deny(self, jti: str, exp: int) -> None:
+        """Revoke an access token until it expires."""
+
+        self._deny(self.redis, jti, exp)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether an access token has been revoked."""
+
+        return bool(self.redis.exists(self._denylist_key(jti)))
+
+    def revoke_session(self, sid: str) -> None:
+        """Log out of one session, revoking its access token."""
+
+        session = self.redis.hgetall(self._session_key(sid))
+
+        if session:
+            with self.redis.pipeline() as pipe:
+                self._revoke_session(pipe, sid, session)
+                pipe.execute()
+
+    def revoke_user_sessions(self, user_id: str) -> None:
+        """Log the user out of all sessions."""
+
+        user_sessions_key = self._user_sessions_key(user_id)
+
+        for sid in self.redis.smembers(user_sessions_key):
+            self.revoke_session(sid.decode())
+
+        self.redis.delete(user_sessions_key)
+
+
+class AsyncTokenStore(BaseTokenStore):
+    """TokenStore for asyncio applications."""
+
+    def __init__(self, redis: AsyncRedis) -> None:
+        self.redis = redis
+        self._rotate_refresh = redis.register_script(ROTATE_REFRESH_SCRIPT)
+
+    async def add_session(self, **session) -> None:
+        async with self.redis.pipeline() as pipe:
+            self._add_session(pipe, **session)
+            await pipe.execute()
+
+    async def rotate_refresh(self, sid: str, **tokens) -> bool:
+        replaced = await self._rotate_refresh(
+            **self._rotate_refresh_call(sid=sid, **tokens)
+        )
+
+        if not replaced:
+            await self.revoke_session(sid)
+            return False
+
+        access_token = self._access_token(*replaced)
+        if access_token:
+            await self.deny(*access_token)
+
+        return True
+
+    async def is_refresh_active(self, sid: str, refresh_jti: str) -> bool:
+        current = await self.redis.hget(
+            self._session_key(sid), 'refresh_jti'
+        )
+
+        return current is not None and current.decode() == refresh_jti
+
+    async def deny(self, jti: str, exp: int) -> None:
+        async with self.redis.pipeline() as pipe:
+            self._deny(pipe, jti, exp)
+            await pipe.execute()
+
+    async def is_revoked(self, jti: str) -> bool:
+        return bool(await self.redis.exists(self._denylist_key(jti)))
+
+    async def revoke_session(self, sid: str) -> None:
+        session = await self.redis.hgetall(self._session_key(sid))
+
+        if session:
+            async with self.redis.pipeline() as pipe:
+                self._revoke_session(pipe, sid, session)
+                await pipe.execute()
+
+    async def revoke_user_sessions(self, user_id: str) -> None:
+        user_sessions_key = self._user_sessions_key(user_id)
+
+        for sid in await self.redis.smembers(user_sessions_key):
+            await self.revoke_session(sid.decode())
+
+        await self.redis.delete(user_sessions_key)
@@ -0,0 +1,94 @@
+"""Redis cache of the credentials of users, read on login."""
+
+import os
+import uuid
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+load_dotenv()
+
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+
+
+class BaseUserCache:
+    """
+    Keys and commands of the user cache, shared by the sync and async
+    clients, which only send them.
+
+    - user_credentials:{login} is a hash with id and password of the
+      user, kept for ttl seconds after a login reads them
+
+    Logins that are not found are not cached, so a user can log in
+    right after registering.
+    """
+
+    def __init__(self, ttl: int = USER_CACHE_TTL) -> None:
+        self.ttl = ttl
+
+    @staticmethod
+    def _credentials_key(login: str) -> str:
+        return f'user_credentials:{login}'
+
+    @staticmethod
+    def _decode(credentials: dict) -> tuple[uuid.UUID, str] | None:
+        if not credentials:
+            return None
+
+        return (
+            uuid.UUID(credentials[b'id'].decode()),
+            credentials[b'password'].decode(),
+        )
+
+    def _set(
+        self, pipe, login: str, user_id: uuid.UUID, password: str
+    ) -> None:
+        """Queue the commands caching the credentials of the user."""
+
+        key = self._credentials_key(login)
+
+        pipe.hset(key, mapping={'id': str(user_id), 'password': password})
+        pipe.expire(key, self.ttl)
+
+
+class UserCache(BaseUserCache):
+    """
+    Credentials of users, so that repeated logins of a user, e.g. of
+    all the workers of a client after a restart, cost one Redis lookup
+    instead of a database query.
+    """
+
+    def __init__(self, redis: Redis, ttl: int = USER_CACHE_TTL) -> None:
+        super().__init__(ttl)
+        self.redis = redis
+
+    def get(self, login: str) -> tuple[uuid.UUID, str] | None:
+        """Return the id and password hash of the user, if cached."""
+
+        return self._decode(self.redis.hgetall(self._credentials_key(login)))
+
+    def set(self, login: str, user_id: uuid.UUID, password: str) -> None:
+        with self.redis.pipeline() as pipe:
+            self._set(pipe, login, user_id, password)
+            pipe.execute()
+
+
+class AsyncUserCache(BaseUserCache):
+    """UserCache for asyncio applications."""
+
+    def __init__(self, redis: AsyncRedis, ttl: int = USER_CACHE_TTL) -> None:
+        super().__init__(ttl)
+        self.redis = redis
+
+    async def get(self, login: str) -> tuple[uuid.UUID, str] | None:
+        return self._decode(
+            await self.redis.hgetall(self._credentials_key(login))
+        )
+
+    async def set(
+        self, login: str, user_id: uuid.UUID, password: str
+    ) -> None:
+        async with self.redis.pipeline() as pipe:
+            self._set(pipe, login, user_id, password)
+            await pipe.execute()
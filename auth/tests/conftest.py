@@ -0,0 +1,14 @@
+"""Unit tests of the auth service, run from the repository root:
+
+    pytest auth/tests
+"""
+
+import os
+
+# Settings the auth modules need on import, the environment
+# and .env take precedence
+for name, value in {
+    'SECRET_KEY': 'unit-test-secret',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite+aiosqlite://',
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+from starlette.requests import Request
+
+from auth.async_app import api
+from auth.async_app.models import User
+from auth.async_app.schemes import Credentials
+from auth.tests.utils import ROUNDS, USER_AGENT, add_user, auth_service
+from auth.tests.utils import make_hash
+from auth.utils.hashing import HashingOverloaded, PasswordHasher
+
+LOGIN = 'tester'
+PASSWORD = 'password'
+# Hash of PASSWORD as Flask-Bcrypt stores it, with its default cost
+FLASK_BCRYPT_HASH = (
+    '$2b$12$iz/CVP0Zqrp16qAKnGqLL.hyTKBIzFLHe2evqsFY9TS6sF/cHtqAq'
+)
+
+
+async def stored_hash(service) -> str:
+    return await service.session.scalar(
+        select(User.password).where(User.login == LOGIN)
+    )
+
+
+def test_hasher_sheds_when_saturated() -> None:
+    """
+    Keeps the only hashing thread and queue slot busy and validates that
+    one more hash is refused, and admitted again once a thread is free.
+    """
+
+    hasher = PasswordHasher(rounds=ROUNDS, workers=1, max_queue=1)
+    busy = threading.Event()
+
+    try:
+        futures = [hasher._submit(busy.wait) for _ in range(2)]
+
+        with pytest.raises(HashingOverloaded):
+            hasher.hash(PASSWORD)
+
+        busy.set()
+        for future in futures:
+            future.result()
+
+        assert hasher.verify(hasher.hash(PASSWORD), PASSWORD)
+    finally:
+        busy.set()
+        hasher.shutdown()
+
+
+def test_login_shed_with_retry_after(tmp_path) -> None:
+    """
+    Logs in while every hashing thread is busy and validates the 503
+    with its Retry-After.
+    """
+
+    hasher = PasswordHasher(rounds=ROUNDS, workers=1, max_queue=0)
+    busy = threading.Event()
+    request = Request({'type': 'http', 'client': None, 'headers': []})
+
+    async def run():
+        async with auth_service(tmp_path / 'auth.db', hasher) as service:
+            await add_user(service, LOGIN, make_hash(PASSWORD))
+            hasher._submit(busy.wait)
+
+            return await api.login(
+                request, Credentials(login=LOGIN, password=PASSWORD), None,
+                service
+            )
+
+    try:
+        response = asyncio.run(run())
+    finally:
+        busy.set()
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == str(api.RETRY_AFTER)
+
+
+def test_old_cost_rehashed_on_login(tmp_path) -> None:
+    """
+    Logs in a user whose password was hashed with another cost and
+    validates that the stored hash is replaced with one of the current
+    cost, and that the user logs in with it.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            old_hash = make_hash(PASSWORD, ROUNDS + 1)
+            await add_user(service, LOGIN, old_hash)
+
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+            new_hash = await stored_hash(service)
+            assert new_hash != old_hash
+            assert not service.password_hasher.needs_rehash(new_hash)
+
+            await service.user_cache.redis.flushdb()
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+            assert await stored_hash(service) == new_hash
+
+    asyncio.run(run())
+
+
+def test_flask_bcrypt_hashes() -> None:
+    """
+    Validates that hashes stored by Flask-Bcrypt are verified, and kept
+    as they are while the cost is the one they were made with.
+    """
+
+    hasher = PasswordHasher(rounds=12, workers=1, max_queue=0)
+
+    try:
+        assert hasher.verify(FLASK_BCRYPT_HASH, PASSWORD)
+        assert not hasher.verify(FLASK_BCRYPT_HASH, 'wrong password')
+        assert not hasher.needs_rehash(FLASK_BCRYPT_HASH)
+    finally:
+        hasher.shutdown()
+
+
+def test_flask_bcrypt_hash_login(tmp_path) -> None:
+    """
+    Logs in a user registered by the Flask application with a lower
+    cost configured and validates the login and the rehash.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            await add_user(service, LOGIN, FLASK_BCRYPT_HASH)
+
+            tokens = await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+            assert tokens.access_token
+            assert (await stored_hash(service)).startswith(f'$2b$0{ROUNDS}$')
+
+    asyncio.run(run())
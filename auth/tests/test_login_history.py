@@ -0,0 +1,213 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from auth.async_app.history import LoginHistoryWriter, create_partitions
+from auth.async_app.models import Base, LoginHistory
+from auth.db import partitions
+from auth.db.partitions import LOCK_PARTITIONS, upcoming_partitions_ddl
+from auth.tests.utils import USER_AGENT
+
+
+class Today(date):
+    """date of the partitions module, on the last month of the year."""
+
+    @classmethod
+    def today(cls) -> date:
+        return date(2026, 12, 15)
+
+
+class Connection:
+    """Connection running the statements, failing those given."""
+
+    def __init__(self, failing: list[str]) -> None:
+        self.failing = failing
+        self.statements = []
+
+    async def execute(self, statement) -> None:
+        self.statements.append(str(statement))
+        if str(statement) in self.failing:
+            raise SQLAlchemyError('relation already has rows')
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+class Engine:
+    def __init__(self, failing: list[str] | None = None) -> None:
+        self.connection = Connection(failing or [])
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self.connection
+
+
+def test_next_month_partitions(monkeypatch) -> None:
+    """
+    Makes the partitions ahead of the last month of a year and validates
+    the ranges of this month and of the next one, in the next year, and
+    the default partition.
+    """
+
+    monkeypatch.setattr(partitions, 'date', Today)
+
+    assert upcoming_partitions_ddl(1) == [
+        "CREATE TABLE IF NOT EXISTS user_auth_y2026m12 "
+        "PARTITION OF user_auth "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        "CREATE TABLE IF NOT EXISTS user_auth_y2027m01 "
+        "PARTITION OF user_auth "
+        "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')",
+        "CREATE TABLE IF NOT EXISTS user_auth_default "
+        "PARTITION OF user_auth DEFAULT",
+    ]
+
+
+def test_partition_ddl_serialized(monkeypatch) -> None:
+    """
+    Creates the partitions with one of them failing and validates that
+    the advisory lock is taken first, and the others still created.
+    """
+
+    monkeypatch.setattr(partitions, 'date', Today)
+    statements = upcoming_partitions_ddl(2)
+    engine = Engine(failing=[statements[0]])
+
+    asyncio.run(create_partitions(engine, 2))
+
+    assert engine.connection.statements == [LOCK_PARTITIONS, *statements]
+
+
+def test_startup_proceeds_when_ddl_fails(tmp_path, caplog) -> None:
+    """
+    Creates the partitions on a database without advisory locks nor
+    partitions and validates that the error is logged, not raised.
+    """
+
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/auth.db')
+
+    async def run() -> None:
+        await create_partitions(engine, 1)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+    assert 'Failed to create login history partitions' in caplog.text
+
+
+async def count_logins(sessionmaker: async_sessionmaker) -> int:
+    async with sessionmaker() as session:
+        return await session.scalar(
+            select(func.count()).select_from(LoginHistory)
+        )
+
+
+def run_writer(database, test, **options) -> None:
+    """Run the test with a LoginHistoryWriter on an SQLite database."""
+
+    async def run() -> None:
+        engine = create_async_engine(f'sqlite+aiosqlite:///{database}')
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        sessionmaker = async_sessionmaker(engine)
+        writer = LoginHistoryWriter(sessionmaker, **options)
+        writer.start()
+        try:
+            await test(writer, sessionmaker)
+        finally:
+            await writer.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_flush_on_batch_size(tmp_path) -> None:
+    """
+    Records a batch of logins and validates that they are written
+    at once, long before the flush interval.
+    """
+
+    async def test(writer, sessionmaker) -> None:
+        writer.add(None, USER_AGENT)
+        await asyncio.sleep(0.05)
+        assert await count_logins(sessionmaker) == 0
+
+        writer.add(None, USER_AGENT)
+        await asyncio.sleep(0.05)
+        assert await count_logins(sessionmaker) == 2
+
+    run_writer(
+        tmp_path / 'auth.db', test,
+        flush_interval=60, batch_size=2, max_size=10
+    )
+
+
+def test_flush_on_interval(tmp_path) -> None:
+    """
+    Records a login and validates that it is written once the flush
+    interval has passed.
+    """
+
+    async def test(writer, sessionmaker) -> None:
+        writer.add(None, USER_AGENT)
+        await asyncio.sleep(0.3)
+
+        assert await count_logins(sessionmaker) == 1
+
+    run_writer(
+        tmp_path / 'auth.db', test,
+        flush_interval=0.05, batch_size=100, max_size=10
+    )
+
+
+def test_flush_on_shutdown(tmp_path) -> None:
+    """
+    Records logins, stops the writer before any flush is due and
+    validates that they are written, and those over max_size dropped.
+    """
+
+    async def test(writer, sessionmaker) -> None:
+        for _ in range(4):
+            writer.add(uuid.uuid4(), USER_AGENT)
+        await writer.stop()
+
+        assert await count_logins(sessionmaker) == 3
+
+    run_writer(
+        tmp_path / 'auth.db', test,
+        flush_interval=60, batch_size=100, max_size=3
+    )
+
+
+def test_failed_flush_logged(tmp_path, caplog) -> None:
+    """
+    Flushes while the table is gone and validates that the error is
+    logged and the writer goes on with the next records.
+    """
+
+    async def test(writer, sessionmaker) -> None:
+        async with sessionmaker() as session:
+            await session.run_sync(
+                lambda session: LoginHistory.__table__.drop(
+                    session.connection()
+                )
+            )
+            await session.commit()
+
+        writer.add(None, USER_AGENT)
+        await writer.flush()
+
+        assert 'Failed to write 1 login history records' in caplog.text
+        assert writer._rows == []
+
+    run_writer(
+        tmp_path / 'auth.db', test,
+        flush_interval=60, batch_size=100, max_size=10
+    )
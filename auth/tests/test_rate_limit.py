@@ -0,0 +1,71 @@
+import asyncio
+from ipaddress import ip_network
+
+import pytest
+from starlette.requests import Request
+
+from auth.async_app import api
+from auth.async_app.schemes import Credentials
+from auth.utils import rate_limit
+
+
+class RateLimiter:
+    """AsyncSlidingWindow keeping the limits of the attempts."""
+
+    def __init__(self) -> None:
+        self.limits = []
+
+    async def hit(self, limits: list[tuple[str, int, int]]) -> int:
+        self.limits.extend(limits)
+
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def trusted_proxies(monkeypatch) -> None:
+    monkeypatch.setattr(
+        rate_limit, 'TRUSTED_PROXIES', [ip_network('10.0.0.0/8')]
+    )
+
+
+@pytest.mark.parametrize('peer, real_ip, expected', [
+    ('203.0.113.7', '198.51.100.1', '203.0.113.7'),
+    ('10.0.0.5', '198.51.100.1', '198.51.100.1'),
+    ('10.0.0.5', None, '10.0.0.5'),
+])
+def test_login_attempts_counted_per_address(peer, real_ip, expected) -> None:
+    """
+    Logs in with X-Real-IP from a client and from a trusted proxy and
+    validates that the attempt is counted for the client address.
+    """
+
+    headers = [(b'x-real-ip', real_ip.encode())] if real_ip else []
+    request = Request(
+        {'type': 'http', 'client': (peer, 5000), 'headers': headers}
+    )
+    rate_limiter = RateLimiter()
+
+    asyncio.run(api.check_login_rate_limit(
+        request,
+        Credentials(login='tester', password='password'),
+        rate_limiter
+    ))
+
+    assert (
+        f'ratelimit:login:address:{expected}',
+        rate_limit.LOGIN_RATE_LIMIT_ADDRESS,
+        rate_limit.LOGIN_RATE_LIMIT_WINDOW,
+    ) in rate_limiter.limits
+
+
+def test_client_address_of_flask_peer() -> None:
+    """
+    Validates that the Flask application, which passes the peer and the
+    header as they are, ignores a header of a client or of no peer.
+    """
+
+    assert rate_limit.client_address('203.0.113.7', '1.2.3.4') == (
+        '203.0.113.7'
+    )
+    assert rate_limit.client_address(None, '1.2.3.4') == ''
+    assert rate_limit.client_address('10.0.0.5', '1.2.3.4') == '1.2.3.4'
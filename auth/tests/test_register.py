@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from auth.async_app.service import AuthError
+from auth.tests.utils import USER_AGENT, auth_service
+
+LOGIN = 'tester'
+PASSWORD = 'password'
+
+
+def test_register_taken_login(tmp_path) -> None:
+    """
+    Registers a login twice and validates that the insert of the second
+    registration does nothing and reports the login as taken.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            await service.register(LOGIN, PASSWORD)
+
+            with pytest.raises(AuthError, match='Username already exists'):
+                await service.register(LOGIN, 'another password')
+
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+    asyncio.run(run())
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from auth.db.token_store import AsyncTokenStore, TokenStore
+
+USER_ID = 'e3b5c9a2-6a43-4f0e-9d7a-5a3f7d0c2b11'
+SID = 'session-1'
+REFRESH_EXPIRES_IN = 3600
+
+
+class SyncStore:
+    """TokenStore with the calls of AsyncTokenStore, for one test of both."""
+
+    def __init__(self) -> None:
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.store = TokenStore(self.redis)
+
+    def __call__(self, method: str, **kwargs):
+        return getattr(self.store, method)(**kwargs)
+
+
+class AsyncStore:
+    def __init__(self) -> None:
+        server = fakeredis.FakeServer()
+        # Keys are checked with the sync client, outside the loop
+        self.redis = fakeredis.FakeRedis(server=server)
+        self.loop = asyncio.new_event_loop()
+        self.store = AsyncTokenStore(
+            fakeredis.aioredis.FakeRedis(server=server)
+        )
+
+    def __call__(self, method: str, **kwargs):
+        return self.loop.run_until_complete(
+            getattr(self.store, method)(**kwargs)
+        )
+
+
+@pytest.fixture(params=[SyncStore, AsyncStore])
+def store(request):
+    store = request.param()
+    yield store
+
+    if isinstance(store, AsyncStore):
+        store.loop.close()
+
+
+def login(store, access_exp: int | None = None) -> None:
+    store(
+        'add_session',
+        user_id=USER_ID,
+        sid=SID,
+        refresh_jti='refresh-1',
+        access_jti='access-1',
+        access_exp=access_exp or int(time.time()) + 300,
+        refresh_expires_in=REFRESH_EXPIRES_IN,
+    )
+
+
+def rotate(store, refresh_jti: str, number: int) -> bool:
+    return store(
+        'rotate_refresh',
+        user_id=USER_ID,
+        sid=SID,
+        refresh_jti=refresh_jti,
+        new_refresh_jti=f'refresh-{number}',
+        new_access_jti=f'access-{number}',
+        new_access_exp=int(time.time()) + 300,
+        refresh_expires_in=REFRESH_EXPIRES_IN,
+    )
+
+
+def test_rotation(store) -> None:
+    """
+    Refreshes a session and validates that the new refresh token is the
+    active one and that the access token replaced is revoked.
+    """
+
+    login(store)
+
+    assert rotate(store, 'refresh-1', 2)
+
+    assert store('is_refresh_active', sid=SID, refresh_jti='refresh-2')
+    assert not store('is_refresh_active', sid=SID, refresh_jti='refresh-1')
+    assert store('is_revoked', jti='access-1')
+    assert not store('is_revoked', jti='access-2')
+
+
+def test_reuse_revokes_the_session(store) -> None:
+    """
+    Refreshes a session, then uses the replaced refresh token again and
+    validates that the whole session is revoked: the refresh token of
+    the rotation no longer works and its access token is denied.
+    """
+
+    login(store)
+    assert rotate(store, 'refresh-1', 2)
+
+    assert not rotate(store, 'refresh-1', 3)
+
+    assert not store('is_refresh_active', sid=SID, refresh_jti='refresh-2')
+    assert not rotate(store, 'refresh-2', 4)
+    assert store('is_revoked', jti='access-2')
+    assert not store.redis.exists(f'session:{SID}')
+    assert not store.redis.sismember(f'user_sessions:{USER_ID}', SID)
+
+
+def test_logout_everywhere(store) -> None:
+    """
+    Logs the user out of all sessions and validates that the session
+    set is gone with every session and their access tokens.
+    """
+
+    login(store)
+
+    store('revoke_user_sessions', user_id=USER_ID)
+
+    assert store('is_revoked', jti='access-1')
+    assert not store.redis.exists(
+        f'session:{SID}', f'user_sessions:{USER_ID}'
+    )
+
+
+def test_expiry(store) -> None:
+    """
+    Validates that sessions and their set expire with the refresh token,
+    that revoked access tokens are kept only until they expire, and that
+    an expired access token is not kept at all.
+    """
+
+    login(store)
+
+    for key in (f'session:{SID}', f'user_sessions:{USER_ID}'):
+        assert 0 < store.redis.ttl(key) <= REFRESH_EXPIRES_IN
+
+    store('deny', jti='access-1', exp=int(time.time()) + 60)
+    assert 0 < store.redis.ttl('denylist:access-1') <= 60
+
+    store('deny', jti='access-0', exp=int(time.time()) - 1)
+    assert not store('is_revoked', jti='access-0')
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+
+from auth.async_app.service import AuthError
+from auth.db.user_cache import UserCache
+from auth.tests.utils import ROUNDS, USER_AGENT, add_user, auth_service
+from auth.tests.utils import make_hash
+
+LOGIN = 'tester'
+PASSWORD = 'password'
+
+
+def test_sync_cache() -> None:
+    """
+    Caches credentials with the client of the Flask application and
+    validates that they are read back, and kept for the cache TTL.
+    """
+
+    redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    cache = UserCache(redis, ttl=60)
+    user_id = uuid.uuid4()
+
+    assert cache.get(LOGIN) is None
+
+    cache.set(LOGIN, user_id, 'hash')
+
+    assert cache.get(LOGIN) == (user_id, 'hash')
+    assert 0 < redis.ttl(f'user_credentials:{LOGIN}') <= 60
+
+
+def test_login_caches_credentials(tmp_path) -> None:
+    """
+    Logs in and validates that the credentials are cached, then changes
+    them in the database and validates that the cache is used until it
+    is refreshed.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            user_id = await add_user(service, LOGIN, make_hash(PASSWORD))
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+            cached = await service.user_cache.get(LOGIN)
+            assert cached[0] == user_id
+
+            await service.user_cache.set(LOGIN, user_id, make_hash('other'))
+            with pytest.raises(AuthError):
+                await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+    asyncio.run(run())
+
+
+def test_rehash_refreshes_cached_credentials(tmp_path) -> None:
+    """
+    Logs in a user whose password was hashed with another cost and
+    validates that the cached hash is replaced with the new one, so the
+    next logins neither rehash nor read the old hash.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            await add_user(service, LOGIN, make_hash(PASSWORD, ROUNDS + 1))
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+            _, password_hash = await service.user_cache.get(LOGIN)
+            assert not service.password_hasher.needs_rehash(password_hash)
+
+    asyncio.run(run())
+
+
+def test_unknown_login_not_cached(tmp_path) -> None:
+    """
+    Logs in with a login that does not exist yet, then creates it and
+    validates that the user can log in at once.
+    """
+
+    async def run() -> None:
+        async with auth_service(tmp_path / 'auth.db') as service:
+            with pytest.raises(AuthError):
+                await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+            assert await service.user_cache.get(LOGIN) is None
+
+            await add_user(service, LOGIN, make_hash(PASSWORD))
+            await service.login(LOGIN, PASSWORD, USER_AGENT)
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import bcrypt
+import fakeredis
+import fakeredis.aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from auth.async_app.models import Base, User
+from auth.async_app.service import AuthService
+from auth.db.token_store import AsyncTokenStore
+from auth.db.user_cache import AsyncUserCache
+from auth.utils.hashing import PasswordHasher
+
+# Cheapest bcrypt cost, so that tests hash fast
+ROUNDS = 4
+USER_AGENT = 'unit-test'
+
+
+class LoginHistory:
+    """LoginHistoryWriter keeping the logins in memory."""
+
+    def __init__(self) -> None:
+        self.logins = []
+
+    def add(self, user_id: uuid.UUID, user_agent: str) -> None:
+        self.logins.append((user_id, user_agent))
+
+
+def make_hash(password: str, rounds: int = ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+@asynccontextmanager
+async def auth_service(
+    database: str, hasher: PasswordHasher | None = None
+) -> AsyncIterator[AuthService]:
+    """AuthService on an SQLite database file and a fake Redis."""
+
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database}')
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    hasher = hasher or PasswordHasher(rounds=ROUNDS, workers=1, max_queue=4)
+
+    try:
+        async with async_sessionmaker(engine)() as session:
+            yield AuthService(
+                session,
+                AsyncTokenStore(redis),
+                AsyncUserCache(redis),
+                hasher,
+                LoginHistory(),
+            )
+    finally:
+        hasher.shutdown()
+        await engine.dispose()
+
+
+async def add_user(service: AuthService, login: str, password_hash: str):
+    """Insert a user as the Flask application or a migration left it."""
+
+    user_id = uuid.uuid4()
+    service.session.add(User(id=user_id, login=login, password=password_hash))
+    await service.session.commit()
+
+    return user_id
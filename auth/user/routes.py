@@ -1,5 +1,8 @@
 from flask_restful import Api
-from auth.user.views import LoginApi, RegisterApi, ResetPassword
+from auth.user.views import (
+    LoginApi, LoginHistoryApi, LogoutAllApi, LogoutApi, RefreshApi,
+    RegisterApi, ResetPassword
+)
 
 
 def create_authentication_routes(api: Api):
@@ -8,3 +11,7 @@ def create_authentication_routes(api: Api):
     """
     api.add_resource(RegisterApi, "/api/v1/auth/register")
     api.add_resource(LoginApi, "/api/v1/auth/login")
+    api.add_resource(LoginHistoryApi, "/api/v1/auth/history")
+    api.add_resource(RefreshApi, "/api/v1/auth/refresh")
+    api.add_resource(LogoutApi, "/api/v1/auth/logout")
+    api.add_resource(LogoutAllApi, "/api/v1/auth/logout/all")
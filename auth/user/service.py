@@ -1,16 +1,29 @@
-import datetime
-from auth.db.db import db
+import uuid
+from auth.db.db import db, token_store, user_cache
 from os import environ
 from auth.db.db_models import LoginHistory, User
-from flask import request
+from auth.db.login_history import login_history_buffer
+from auth.utils.hashing import password_hasher
+from auth.utils.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor
+)
+from flask import current_app
 from flask_jwt_extended import create_access_token
 from flask_jwt_extended import create_refresh_token
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask_jwt_extended import decode_token, get_jwt, get_jwt_identity
+from redis.exceptions import RedisError
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from utils.common import generate_response
 from utils.validation import (
     CreateLoginInputSchema, CreateRegisterInputSchema
 )
-from utils.http_code import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from utils.http_code import (
+    HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
+)
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
 
 
 def create_user(request, input_data):
@@ -24,18 +37,23 @@ def create_user(request, input_data):
     errors = create_validation_schema.validate(input_data)
     if errors:
         return generate_response(message=errors)
-    check_username_exists = User.query.filter_by(
-        login=input_data.get("login")
-    ).first()
-    if check_username_exists:
+    # One round trip, and no race between a check and the insert: a
+    # taken login inserts nothing and returns no id
+    user_id = db.session.execute(
+        insert(User)
+        .values(
+            login=input_data.get("login"),
+            password=password_hasher.hash(input_data.get("password"))
+        )
+        .on_conflict_do_nothing(index_elements=[User.login])
+        .returning(User.id)
+    ).scalar()
+    db.session.commit()
+    if user_id is None:
         return generate_response(
             message="Username already exists", status=HTTP_400_BAD_REQUEST
         )
 
-    new_user = User(**input_data)  # Create an instance of the User class
-    new_user.hash_password()
-    db.session.add(new_user)  # Adds new User record to database
-    db.session.commit()
     del input_data["password"]
     return generate_response(
         data=input_data, message="User Created", status=HTTP_201_CREATED
@@ -57,18 +75,30 @@ def login_user(request, input_data):
     if errors:
         return generate_response(message=errors)
 
-    user = User.query.filter_by(login=input_data.get("login")).first()
-    
-    if user is None:
+    login = input_data.get("login")
+    password = input_data.get("password")
+    credentials = get_user_credentials(login)
+
+    if credentials is None:
         return generate_response(message="User not found", status=HTTP_400_BAD_REQUEST)
-    
-    hash = generate_password_hash(user.password)
-    if check_password_hash(hash, user.password):
-        access_token = create_access_token(identity=user.id, fresh=True)
-        refresh_token = create_refresh_token(identity=user.id)
+
+    user_id, password_hash = credentials
+    if password_hasher.verify(password_hash, password):
+        # The cost has changed since the password was hashed
+        if password_hasher.needs_rehash(password_hash):
+            password_hash = password_hasher.hash(password)
+            db.session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(password=password_hash)
+            )
+            db.session.commit()
+            cache_user_credentials(login, user_id, password_hash)
+
+        access_token, refresh_token = start_session(str(user_id))
 
         user_agent = request.headers['user_agent']
-        add_record_to_login_history(user, user_agent) # add a record to the login history
+        add_record_to_login_history(user_id, user_agent) # add a record to the login history
 
         data = dict(access_token=access_token,refresh_token=refresh_token)
 
@@ -81,10 +111,217 @@ def login_user(request, input_data):
         )
 
 
-def add_record_to_login_history(user: User, user_agent: str):
-    
-    new_session = LoginHistory(user_id=user.id,
-                               user_agent=user_agent,
-                               auth_date=datetime.now())
-    db.session.add(new_session)
-    db.session.commit()
+def get_user_credentials(login: str) -> tuple[uuid.UUID, str] | None:
+    """
+    Return the id and password hash of the user, from the user cache
+    or else from the database
+    :param login: The login of the user
+    :return: None if there is no such user
+    """
+    try:
+        credentials = user_cache.get(login)
+    except RedisError:
+        credentials = None
+    if credentials is not None:
+        return credentials
+
+    row = db.session.execute(
+        select(User.id, User.password).where(User.login == login)
+    ).first()
+    if row is None:
+        return None
+
+    cache_user_credentials(login, row.id, row.password)
+
+    return row.id, row.password
+
+
+def cache_user_credentials(login: str, user_id: uuid.UUID, password: str):
+    """
+    Keep the credentials of the user for the next logins, logins go on
+    without the cache while Redis is unavailable
+    """
+    try:
+        user_cache.set(login, user_id, password)
+    except RedisError:
+        pass
+
+
+def add_record_to_login_history(user_id: uuid.UUID, user_agent: str):
+    """
+    Record the login, the record is written with the next batch
+    :param user_id: The id of the user logged in
+    :param user_agent: The User-Agent of the login request
+    """
+    login_history_buffer.add(user_id, user_agent)
+
+
+def get_login_history(request):
+    """
+    Return a page of logins of the user, the latest first. Pages are
+    fetched with the cursor of the previous one, which is as fast for
+    the last page as for the first
+    :param request: The request object
+    :return: A response object
+    """
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= HISTORY_MAX_PAGE_SIZE:
+        return generate_response(
+            message=f"limit must be between 1 and {HISTORY_MAX_PAGE_SIZE}",
+            status=HTTP_400_BAD_REQUEST
+        )
+
+    query = LoginHistory.query.filter_by(
+        user_id=uuid.UUID(get_jwt_identity())
+    )
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            auth_date, row_id = decode_cursor(cursor)
+        except InvalidCursor as exc:
+            return generate_response(
+                message=str(exc), status=HTTP_400_BAD_REQUEST
+            )
+        query = query.filter(
+            tuple_(LoginHistory.auth_date, LoginHistory.id)
+            < tuple_(auth_date, row_id)
+        )
+
+    rows = query.order_by(
+        LoginHistory.auth_date.desc(), LoginHistory.id.desc()
+    ).limit(limit + 1).all()
+    page = rows[:limit]
+
+    data = dict(
+        results=[
+            dict(
+                user_agent=row.user_agent,
+                auth_date=row.auth_date.isoformat()
+            )
+            for row in page
+        ],
+        next_cursor=(
+            encode_cursor(page[-1].auth_date, page[-1].id)
+            if len(rows) > limit else None
+        ),
+    )
+
+    return generate_response(
+        data=data, message="Login history", status=HTTP_200_OK
+    )
+
+
+def refresh_expires_in() -> int:
+    """Return the refresh token lifetime in seconds."""
+
+    return int(
+        current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+    )
+
+
+def create_session_tokens(
+    user_id: str, sid: str, fresh: bool = False
+) -> tuple[str, str, dict, dict]:
+    """
+    Create an access and a refresh token of the session
+    :return: The tokens and their decoded claims
+    """
+    access_token = create_access_token(
+        identity=user_id, fresh=fresh, additional_claims={'sid': sid}
+    )
+    refresh_token = create_refresh_token(
+        identity=user_id, additional_claims={'sid': sid}
+    )
+
+    return (
+        access_token,
+        refresh_token,
+        decode_token(access_token),
+        decode_token(refresh_token),
+    )
+
+
+def start_session(user_id: str) -> tuple[str, str]:
+    """
+    Open a new session of the user in the token store
+    :return: The access and refresh tokens of the session
+    """
+    sid = str(uuid.uuid4())
+    access_token, refresh_token, access, refresh = create_session_tokens(
+        user_id, sid, fresh=True
+    )
+    token_store.add_session(
+        user_id=user_id,
+        sid=sid,
+        refresh_jti=refresh['jti'],
+        access_jti=access['jti'],
+        access_exp=access['exp'],
+        refresh_expires_in=refresh_expires_in(),
+    )
+
+    return access_token, refresh_token
+
+
+def refresh_session(request):
+    """
+    Exchange a refresh token for a new pair of tokens. The refresh
+    token can be used once, using it again revokes the session.
+    :param request: The request object
+    :return: A response object
+    """
+    claims = get_jwt()
+
+    # Refresh tokens issued before sessions were tracked have no sid
+    if 'sid' not in claims:
+        return generate_response(
+            message="Refresh token has been revoked",
+            status=HTTP_401_UNAUTHORIZED
+        )
+
+    user_id = get_jwt_identity()
+    access_token, refresh_token, access, refresh = create_session_tokens(
+        user_id, claims['sid']
+    )
+    rotated = token_store.rotate_refresh(
+        user_id=user_id,
+        sid=claims['sid'],
+        refresh_jti=claims['jti'],
+        new_refresh_jti=refresh['jti'],
+        new_access_jti=access['jti'],
+        new_access_exp=access['exp'],
+        refresh_expires_in=refresh_expires_in(),
+    )
+
+    if not rotated:
+        return generate_response(
+            message="Refresh token has been revoked",
+            status=HTTP_401_UNAUTHORIZED
+        )
+
+    data = dict(access_token=access_token, refresh_token=refresh_token)
+
+    return generate_response(
+        data=data, message="Tokens refreshed", status=HTTP_200_OK
+    )
+
+
+def logout_user(request, everywhere: bool = False):
+    """
+    Revoke the session of the access token, or all sessions of the user
+    :param request: The request object
+    :param everywhere: Log out of all sessions of the user
+    :return: A response object
+    """
+    claims = get_jwt()
+    token_store.deny(claims['jti'], claims['exp'])
+
+    if everywhere:
+        token_store.revoke_user_sessions(get_jwt_identity())
+    elif 'sid' in claims:
+        token_store.revoke_session(claims['sid'])
+
+    return generate_response(message="User logged out", status=HTTP_200_OK)
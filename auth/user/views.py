@@ -1,7 +1,58 @@
 from flask import Response
 from flask_restful import Resource
 from flask import request, make_response
-from user.service import create_user, login_user
+from flask_jwt_extended import jwt_required
+from redis.exceptions import RedisError
+from auth.db.db import login_rate_limiter
+from auth.utils.hashing import HashingOverloaded
+from auth.utils.rate_limit import client_address, login_limits
+from user.service import (
+    create_user, get_login_history, login_user, logout_user, refresh_session
+)
+from utils.common import generate_response
+from utils.http_code import (
+    HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+)
+
+# Seconds a client should wait before retrying while hashing is overloaded
+RETRY_AFTER = 1
+
+
+def overloaded_response() -> Response:
+    """
+    Shed the request when all hashing threads are busy.
+    :return: JSON object
+    """
+    response, status = generate_response(
+        message="Server is busy, retry later",
+        status=HTTP_503_SERVICE_UNAVAILABLE
+    )
+    return make_response(response, status, {"Retry-After": str(RETRY_AFTER)})
+
+
+def check_login_rate_limit(input_data: dict) -> Response | None:
+    """
+    Count the login attempt of the client address and of the login
+    :return: A JSON object if the attempt is over a limit
+    """
+    address = client_address(
+        request.remote_addr, request.headers.get("X-Real-IP")
+    )
+    try:
+        retry_after = login_rate_limiter.hit(
+            login_limits(address, str((input_data or {}).get("login")))
+        )
+    except RedisError:
+        return None
+
+    if not retry_after:
+        return None
+
+    response, status = generate_response(
+        message="Too many login attempts, retry later",
+        status=HTTP_429_TOO_MANY_REQUESTS
+    )
+    return make_response(response, status, {"Retry-After": str(retry_after)})
 
 
 class RegisterApi(Resource):
@@ -12,7 +63,10 @@ class RegisterApi(Resource):
         :return: JSON object
         """
         input_data = request.get_json()
-        response, status = create_user(request, input_data)
+        try:
+            response, status = create_user(request, input_data)
+        except HashingOverloaded:
+            return overloaded_response()
         return make_response(response, status)
 
 
@@ -24,5 +78,59 @@ class LoginApi(Resource):
         :return: JSON object
         """
         input_data = request.get_json()
-        response, status = login_user(request, input_data)
+        rate_limited = check_login_rate_limit(input_data)
+        if rate_limited:
+            return rate_limited
+        try:
+            response, status = login_user(request, input_data)
+        except HashingOverloaded:
+            return overloaded_response()
+        return make_response(response, status)
+
+
+class LoginHistoryApi(Resource):
+    @staticmethod
+    @jwt_required()
+    def get() -> Response:
+        """
+        GET response method for a page of the user login history.
+        :return: JSON object
+        """
+        response, status = get_login_history(request)
+        return make_response(response, status)
+
+
+class RefreshApi(Resource):
+    @staticmethod
+    @jwt_required(refresh=True)
+    def post() -> Response:
+        """
+        POST response method for exchanging a refresh token.
+        :return: JSON object
+        """
+        response, status = refresh_session(request)
+        return make_response(response, status)
+
+
+class LogoutApi(Resource):
+    @staticmethod
+    @jwt_required()
+    def post() -> Response:
+        """
+        POST response method for logging out of the session.
+        :return: JSON object
+        """
+        response, status = logout_user(request)
+        return make_response(response, status)
+
+
+class LogoutAllApi(Resource):
+    @staticmethod
+    @jwt_required()
+    def post() -> Response:
+        """
+        POST response method for logging out of all sessions.
+        :return: JSON object
+        """
+        response, status = logout_user(request, everywhere=True)
         return make_response(response, status)
@@ -1,9 +1,11 @@
 
 import os
+import uuid
 import jwt
 from datetime import datetime, timedelta, timezone
 from utils.http_code import HTTP_200_OK, HTTP_201_CREATED
 from auth.db.db_models import User
+from auth.db.db import token_store
 
 
 def generate_response(
@@ -11,7 +13,7 @@ def generate_response(
         ) -> tuple[dict, int]:
     """
     It takes in a data, message, and status, and returns a dictionary with the data, message, and status
-    
+
     :param data: The data that you want to send back to the client
     :param message: This is the message that you want to display to the user
     :param status: The HTTP status code, defaults to 400 (optional)
@@ -32,7 +34,7 @@ def generate_response(
 def modify_slz_error(message: str | list, status: int) -> list:
     """
     It takes a message and a status, and returns a list of errors
-    
+
     :param message: The error message that you want to display
     :param status: The HTTP status code you want to return
     :return: A list of dictionaries.
@@ -59,7 +61,7 @@ class TokenGenerator:
     def encode_token(user: User) -> str:
         """
         The encode_token function takes in a user object and returns a token
-        
+
         :param user: The user object that we want to encode
         :return: A token
         """
@@ -67,6 +69,7 @@ class TokenGenerator:
         payload = {
             "exp": datetime.now(timezone.utc) + timedelta(days=1),
             "id": str(user.id),
+            "jti": uuid.uuid4().hex,
         }
         token = jwt.encode(payload, os.environ.get("SECRET_KEY"), algorithm="HS256")
         return token
@@ -75,7 +78,7 @@ class TokenGenerator:
     def decode_token(token: str):
         """
         It takes a token, decodes it, and returns the decoded token
-        
+
         :param token: The token to decode
         :return: A dictionary with the user's id and username.
         """
@@ -89,27 +92,44 @@ class TokenGenerator:
     @staticmethod
     def check_token(token: str) -> bool:
         """
-        It takes a token, and returns True if the token is valid, and False if it's not
-        
+        It takes a token, and returns True if the token is valid and
+        has not been revoked, and False if it's not
+
         :param token: The token to be decoded
         :return: A boolean value.
         """
         try:
-            jwt.decode(
+            data = jwt.decode(
                 token,
                 os.environ.get("SECRET_KEY"),
                 algorithms="HS256",
                 options={"require_exp": True},
             )
-            return True
         except:
             return False
 
+        return not token_store.is_revoked(data.get("jti", ""))
+
+    @staticmethod
+    def revoke_token(token: str) -> None:
+        """
+        It adds the token to the denylist until it expires
+
+        :param token: The token to be revoked
+        """
+        data = jwt.decode(
+            token,
+            os.environ.get("SECRET_KEY"),
+            algorithms="HS256",
+            options={"require_exp": True},
+        )
+        token_store.deny(data["jti"], data["exp"])
+
     @staticmethod
     def get_user_id(token: str) -> str:
         """
         It decodes the token, and returns the user's id
-        
+
         :param token: The token that was sent to the server
         :return: The user id is being returned.
         """
@@ -0,0 +1,96 @@
+"""bcrypt hashing of passwords on a bounded pool of threads.
+
+bcrypt releases the GIL while it hashes, so threads run hashes on all
+cores without blocking the request workers or the event loop. Once
+every thread is busy and max_queue more hashes wait for one, further
+requests are refused with HashingOverloaded rather than queued: a burst
+of logins, e.g. credential stuffing, then costs the others a fast 503
+instead of a timeout behind thousands of queued hashes.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class HashingOverloaded(Exception):
+    """All hashing threads are busy and the queue is full."""
+
+
+class PasswordHasher:
+
+    def __init__(self, rounds: int, workers: int, max_queue: int) -> None:
+        """
+        :param rounds: The bcrypt cost of new hashes.
+        :param workers: The number of hashing threads.
+        :param max_queue: The number of hashes waiting for a thread.
+        """
+        self.rounds = rounds
+        self.limit = workers + max_queue
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hashing'
+        )
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(
+            password.encode(), bcrypt.gensalt(self.rounds)
+        ).decode()
+
+    @staticmethod
+    def _verify(password_hash: str, password: str) -> bool:
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.limit:
+                raise HashingOverloaded('Too many passwords to hash')
+            self._pending += 1
+
+    def _release(self, *args) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, function, *args):
+        self._admit()
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(self._release)
+
+        return future
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._hash, password).result()
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._submit(self._verify, password_hash, password).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self._hash, password))
+
+    async def averify(self, password_hash: str, password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(self._verify, password_hash, password)
+        )
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Check whether the hash was made with another cost."""
+
+        # $2b$<cost>$<salt and hash>
+        return int(password_hash.split('$')[2]) != self.rounds
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_LOG_ROUNDS', 12)),
+    workers=int(os.getenv('HASHING_WORKERS', os.cpu_count() or 1)),
+    max_queue=int(os.getenv('HASHING_MAX_QUEUE', 32)),
+)
@@ -0,0 +1,41 @@
+"""Keyset pagination cursors.
+
+A cursor holds the sort key of the last row of a page, the next page
+starts right after it with an index range scan however deep it is.
+"""
+
+import base64
+import binascii
+import uuid
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(auth_date: datetime, row_id: uuid.UUID) -> str:
+    """
+    Encode the sort key of the last row of a page
+    :param auth_date: The date of the row
+    :param row_id: The id of the row, ordering rows of the same date
+    :return: An opaque cursor
+    """
+    key = f'{auth_date.isoformat()}|{row_id}'
+
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor given by encode_cursor
+    :param cursor: The cursor sent by the client
+    :return: The date and id of the last row of the previous page
+    """
+    try:
+        auth_date, row_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        )
+        return datetime.fromisoformat(auth_date), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
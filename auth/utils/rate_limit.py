@@ -0,0 +1,95 @@
+"""Sliding window rate limits of login attempts, counted in Redis."""
+
+import json
+import os
+from ipaddress import ip_network
+
+from dotenv import load_dotenv
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from src.utils import limits
+from src.utils.limits import SLIDING_WINDOW_SCRIPT, window_keys
+
+load_dotenv()
+
+# Attempts allowed in LOGIN_RATE_LIMIT_WINDOW seconds from one address,
+# and for one login whatever the address
+LOGIN_RATE_LIMIT_WINDOW = int(os.getenv('LOGIN_RATE_LIMIT_WINDOW', 60))
+LOGIN_RATE_LIMIT_ADDRESS = int(os.getenv('LOGIN_RATE_LIMIT_ADDRESS', 20))
+LOGIN_RATE_LIMIT_LOGIN = int(os.getenv('LOGIN_RATE_LIMIT_LOGIN', 10))
+# Addresses or networks of proxies whose X-Real-IP is taken as the
+# client address, as a JSON list. The applications are not proxied by
+# default, so the header is ignored
+TRUSTED_PROXIES = [
+    ip_network(proxy)
+    for proxy in json.loads(os.getenv('TRUSTED_PROXIES') or '[]')
+]
+
+
+def client_address(peer: str | None, real_ip: str | None) -> str:
+    """Return the address of the client connected from peer."""
+
+    return limits.client_address(peer, real_ip, TRUSTED_PROXIES)
+
+
+def login_limits(address: str, login: str) -> list[tuple[str, int, int]]:
+    """
+    Return the counters a login attempt is checked against
+    :param address: The client address
+    :param login: The login the client tries
+    :return: Keys of the counters with their limits and windows
+    """
+    return [
+        (
+            f'ratelimit:login:address:{address}',
+            LOGIN_RATE_LIMIT_ADDRESS,
+            LOGIN_RATE_LIMIT_WINDOW,
+        ),
+        (
+            f'ratelimit:login:login:{login}',
+            LOGIN_RATE_LIMIT_LOGIN,
+            LOGIN_RATE_LIMIT_WINDOW,
+        ),
+    ]
+
+
+class SlidingWindow:
+    """Counters of requests of clients, shared by the workers."""
+
+    def __init__(self, redis: Redis) -> None:
+        self._hit = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, limits: list[tuple[str, int, int]]) -> int:
+        """
+        Count a request against each limit
+        :param limits: Keys of the counters with their limits and windows
+        :return: 0 if the request is allowed, or the seconds to wait
+        """
+        for key, limit, window in limits:
+            keys, elapsed = window_keys(key, window)
+            allowed, value = self._hit(
+                keys=keys, args=[limit, window, elapsed]
+            )
+            if not allowed:
+                return int(value)
+
+        return 0
+
+
+class AsyncSlidingWindow:
+    """SlidingWindow for asyncio applications."""
+
+    def __init__(self, redis: AsyncRedis) -> None:
+        self._hit = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, limits: list[tuple[str, int, int]]) -> int:
+        for key, limit, window in limits:
+            keys, elapsed = window_keys(key, window)
+            allowed, value = await self._hit(
+                keys=keys, args=[limit, window, elapsed]
+            )
+            if not allowed:
+                return int(value)
+
+        return 0
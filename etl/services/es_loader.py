@@ -27,6 +27,8 @@ class ElasticsearchLoader:
         self.person_index_name = settings.ES_PERSON_INDEX
         self.status = True if self.get_conn_status() else False
         self.indices = self.create_es_indices()
+        self.film_fields = self.get_mapped_fields(self.film_index_name)
+        self.person_fields = self.get_mapped_fields(self.person_index_name)
 
     @backoff(exception=ConnectionError)
     def get_conn_status(self):
@@ -73,16 +75,36 @@ class ElasticsearchLoader:
                 else:
                     logger.warning('No schema for index "%s".', index_name)
 
+    @backoff(exception=ConnectionError)
+    def get_mapped_fields(self, index_name: str) -> set:
+        """Return top-level fields of the index mapping."""
+
+        response = self.client.indices.get_mapping(index=index_name)
+
+        return {
+            field
+            for index in response.values()
+            for field in index['mappings'].get('properties', {})
+        }
+
     @backoff(exception=ConnectionError)
     def transfer_films(self, actions) -> None:
-        """Add data packets to Elasticsearch."""
+        """
+        Add data packets to Elasticsearch.
+        Fields missing from the index mapping are left out, so indices
+        created before a field was added to the schema (e.g. genre_ids)
+        keep accepting documents until they are recreated.
+        """
 
         success, failed = helpers.bulk(
             client=self.client,
             actions=[{
                 '_index': self.film_index_name,
                 '_id': action.get('id'),
-                **action,
+                **{
+                    field: value for field, value in action.items()
+                    if field in self.film_fields
+                },
             } for action in actions],
             stats_only=True
         )
@@ -93,14 +115,21 @@ class ElasticsearchLoader:
 
     @backoff(exception=ConnectionError)
     def transfer_persons(self, actions) -> None:
-        """Add data packets to Elasticsearch."""
+        """
+        Add data packets to Elasticsearch.
+        Fields missing from the index mapping are left out,
+        as for films.
+        """
 
         success, failed = helpers.bulk(
             client=self.client,
             actions=[{
                 '_index': self.person_index_name,
                 '_id': action.get('id'),
-                **action,
+                **{
+                    field: value for field, value in action.items()
+                    if field in self.person_fields
+                },
             } for action in actions],
             stats_only=True
         )
@@ -2,12 +2,22 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+from redis import Redis
+from redis.exceptions import RedisError
+
 from etl.services.es_loader import ElasticsearchLoader
 from etl.services.postgres_extractor import PostgresExtractor
 from etl.utils import models_validation
 from etl.utils.etl_logging import logger
 from etl.utils.etl_state import JsonFileStorage, State
-from etl.utils.settings import etl_settings
+from etl.utils.settings import conf, etl_settings
+from etl.utils.suggest import suggest_field
+
+
+def genre_ids_of(genres: list[dict[str, str]]) -> list[str]:
+    """Project the film genres to the flat genre_ids keyword."""
+
+    return [genre['id'] for genre in genres if genre['id']]
 
 
 class ETL:
@@ -18,6 +28,7 @@ class ETL:
         self.state = state
         self.pg_client = None
         self.es_client = None
+        self.redis = None
         self.states = None
 
     def __enter__(self):
@@ -29,6 +40,7 @@ class ETL:
         try:
             self.pg_client = PostgresExtractor()
             self.es_client = ElasticsearchLoader()
+            self.redis = Redis(host=conf.REDIS_HOST, port=conf.REDIS_PORT)
         except Exception as exc:
             self.state.set_state('etl_process', 'stopped')
             raise exc
@@ -47,6 +59,9 @@ class ETL:
         if self.pg_client is not None:
             self.pg_client.close()
 
+        if self.redis is not None:
+            self.redis.close()
+
         logger.info('ETL process stopped.')
         self.state.set_state('etl_process', 'stopped')
         logger.info('Load paused for %s seconds', etl_settings.LOAD_PAUSE)
@@ -195,8 +210,12 @@ class ETL:
                             'id': filmwork_id,
                             'imdb_rating': imdb_rating,
                             'title': title,
+                            'title_suggest': suggest_field(
+                                title, imdb_rating
+                            ),
                             'description': description,
                             'genres': genres,
+                            'genre_ids': genre_ids_of(genres),
                             'directors': directors,
                             'actors_names': actors_names,
                             'writers_names': writers_names,
@@ -221,7 +240,10 @@ class ETL:
             for person in modified_data:
                 new_person = {
                     'id': person.get('id'),
-                    'full_name': person.get('full_name')
+                    'full_name': person.get('full_name'),
+                    'full_name_suggest': suggest_field(
+                        person.get('full_name')
+                    )
                 }
                 transformed_data.append(new_person)
 
@@ -293,6 +315,18 @@ class ETL:
                 self.es_client.transfer_genres(actions=actions)
                 pass
 
+    def notify_loaded(self):
+        """
+        Announce the loaded data to the API, with the time of the load,
+        and the API warms its cache up with it. A failure is only
+        logged, the API cache then expires on its own.
+        """
+
+        try:
+            self.redis.publish(conf.WARMUP_CHANNEL, time.time())
+        except RedisError as exc:
+            logger.warning('Failed to announce the loaded data: %s', exc)
+
     def save_state(self):
         """Save the last ETL state."""
 
@@ -310,11 +344,13 @@ storage = JsonFileStorage(
 def load_to_es():
     while True:
         with ETL(state=State(storage=storage)) as etl:
+            loaded = 0
 
             # films ETL process
             logger.info('Starting extraction of films from PostgreSQL.')
             number_data, modified_data = etl.extract_films()
             logger.info('Extracted %d modified films.', number_data)
+            loaded += number_data
 
             if modified_data is not None:
                 transformed_data = etl.transform_films(
@@ -333,6 +369,7 @@ def load_to_es():
             logger.info('Starting extraction of persons from PostgreSQL.')
             number_data, modified_data = etl.extract_persons()
             logger.info('Extracted %d modified persons.', number_data)
+            loaded += number_data
 
             if modified_data is not None:
                 transformed_data = etl.transform_persons(
@@ -351,6 +388,7 @@ def load_to_es():
             logger.info('Starting extraction of genres from PostgreSQL.')
             number_data, modified_data = etl.extract_genres()
             logger.info('Extracted %d modified genres.', number_data)
+            loaded += number_data
 
             if modified_data is not None:
                 transformed_data = etl.transform_genres(
@@ -365,6 +403,9 @@ def load_to_es():
             else:
                 logger.info('No genres to load into Elasticsearch.')
 
+            if loaded:
+                etl.notify_loaded()
+
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,58 @@
+"""
+Benchmarks of the ETL stages, run from the repository root:
+
+    pytest etl/tests/benchmarks --benchmark-autosave
+    pytest etl/tests/benchmarks --benchmark-compare \
+        --benchmark-compare-fail=median:15%
+
+The first command stores a baseline in etl/tests/benchmarks/.benchmarks,
+the second fails if a stage got more than 15% slower than the last one.
+End-to-end benchmarks run only when PostgreSQL and Elasticsearch
+of the ETL settings are reachable.
+"""
+
+import os
+
+import pytest
+
+# Settings the ETL modules need on import, the environment
+# and .env of the containers take precedence
+for name, value in {
+    'PROJECT_NAME': 'movies',
+    'REDIS_HOST': 'localhost',
+    'REDIS_PORT': '6379',
+    'ELASTIC_SCHEME': 'http',
+    'ELASTIC_HOST': 'localhost',
+    'ELASTIC_PORT': '9200',
+    'POSTGRES_DB': 'movies_database',
+    'POSTGRES_USER': 'app',
+    'POSTGRES_PASSWORD': '123qwe',
+    'DB_HOST': 'localhost',
+    'DB_PORT': '5432',
+    'DB_OPTIONS': '-c search_path=content',
+    'ES_MOVIE_INDEX': 'movies',
+    'ES_GENRE_INDEX': 'genres',
+    'ES_PERSON_INDEX': 'persons',
+    'ES_MOVIE_SCHEMA': 'etl/utils/es_film_index_schema.json',
+    'ES_GENRE_SCHEMA': 'etl/utils/es_genre_index_schema.json',
+    'ES_PERSON_SCHEMA': 'etl/utils/es_person_index_schema.json',
+}.items():
+    os.environ.setdefault(name, value)
+
+BENCHMARK_STORAGE = os.path.join(os.path.dirname(__file__), '.benchmarks')
+
+
+def pytest_configure(config):
+    """Keep baselines next to the benchmarks."""
+
+    if config.getoption('benchmark_storage', None) == 'file://./.benchmarks':
+        config.option.benchmark_storage = f'file://{BENCHMARK_STORAGE}'
+
+
+@pytest.fixture
+def etl():
+    """An ETL instance without connections, for the transform stages."""
+
+    from etl.services.main import ETL
+
+    return ETL(state=None)
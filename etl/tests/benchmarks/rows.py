@@ -0,0 +1,76 @@
+"""Generated rows shaped as the PostgreSQL extractor returns them."""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+GENRES = [
+    (str(uuid.UUID(int=number)), name) for number, name in enumerate((
+        'Action', 'Adventure', 'Comedy', 'Documentary', 'Drama', 'Fantasy',
+        'Horror', 'Musical', 'Romance', 'Sci-Fi', 'Thriller', 'Western',
+    ), start=1)
+]
+WORDS = [
+    'star', 'night', 'river', 'shadow', 'empire', 'garden', 'winter',
+    'storm', 'city', 'dream', 'road', 'stone', 'island', 'fire', 'silent',
+    'last', 'golden', 'secret', 'lost', 'wild', 'north', 'ocean', 'moon',
+]
+ROLES = ('actor', 'actor', 'actor', 'writer', 'director')
+
+
+def filmwork_rows(films: int, seed: int = 42) -> list[dict]:
+    """
+    Return rows of get_filmwork_by_id for the number of films:
+    one row per film, person and genre, as the joins produce them.
+    """
+
+    rng = random.Random(seed)
+    modified = datetime(2023, 1, 1)
+    rows = []
+
+    for number in range(films):
+        film = {
+            'fw_id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'title': ' '.join(rng.sample(WORDS, 3)).title(),
+            'description': ' '.join(rng.choices(WORDS, k=20)),
+            'rating': round(rng.uniform(1, 10), 1),
+            'type': 'movie',
+            'created': modified,
+            'modified': modified + timedelta(minutes=number),
+        }
+        persons = [
+            (
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                f'Person {rng.randrange(films * 5)}',
+                rng.choice(ROLES),
+            )
+            for _ in range(rng.randint(3, 8))
+        ]
+
+        for genre_id, genre in rng.sample(GENRES, rng.randint(1, 3)):
+            for person_id, full_name, role in persons:
+                rows.append({
+                    **film,
+                    'role': role,
+                    'person_id': person_id,
+                    'full_name': full_name,
+                    'genre_id': genre_id,
+                    'genre': genre,
+                })
+
+    return rows
+
+
+def person_rows(persons: int, seed: int = 42) -> list[dict]:
+    """Return rows of get_persons for the number of persons."""
+
+    rng = random.Random(seed)
+
+    return [
+        {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'full_name': f'{rng.choice(WORDS).title()} Person {number}',
+            'modified': datetime(2023, 1, 1) + timedelta(minutes=number),
+        }
+        for number in range(persons)
+    ]
@@ -0,0 +1,76 @@
+import psycopg2
+import pytest
+from elasticsearch import Elasticsearch
+
+from etl.tests.benchmarks.rows import filmwork_rows
+from etl.utils.etl_state import JsonFileStorage, State
+from etl.utils.settings import es_settings, etl_settings, pg_settings
+
+
+def containers_available() -> bool:
+    """Check that PostgreSQL and Elasticsearch answer right away."""
+
+    try:
+        psycopg2.connect(
+            dbname=pg_settings.POSTGRES_DB,
+            user=pg_settings.POSTGRES_USER,
+            password=pg_settings.POSTGRES_PASSWORD,
+            host=pg_settings.DB_HOST,
+            port=pg_settings.DB_PORT,
+            connect_timeout=2,
+        ).close()
+    except psycopg2.OperationalError:
+        return False
+
+    client = Elasticsearch(
+        f'http://{es_settings.ES_HOST}:{es_settings.ES_PORT}',
+        request_timeout=2,
+    )
+    try:
+        return client.ping()
+    finally:
+        client.close()
+
+
+pytestmark = pytest.mark.skipif(
+    not containers_available(),
+    reason='PostgreSQL or Elasticsearch is not available'
+)
+
+
+@pytest.fixture
+def etl_process(tmp_path):
+    """An ETL process connected to the containers, without pauses."""
+
+    from etl.services.main import ETL
+
+    state = State(storage=JsonFileStorage(file_path=f'{tmp_path}/'))
+    settings = etl_settings.copy(update={'LOAD_PAUSE': 0})
+
+    with ETL(settings=settings, state=state) as etl:
+        yield etl
+
+
+@pytest.mark.parametrize('films', [100, 1000])
+def test_transfer_films(benchmark, etl_process, films: int) -> None:
+    """Bulk-load packets of film documents into Elasticsearch."""
+
+    documents = list(etl_process.transform_films(filmwork_rows(films)))
+
+    benchmark.pedantic(
+        etl_process.load_films, args=(iter(documents),),
+        setup=None, rounds=3
+    )
+
+
+def test_films_cycle(benchmark, etl_process) -> None:
+    """Extract, transform and load the whole film catalogue."""
+
+    def cycle():
+        etl_process.states = {}
+        count, rows = etl_process.extract_films()
+        if rows is not None:
+            etl_process.load_films(etl_process.transform_films(rows))
+        return count
+
+    benchmark.pedantic(cycle, rounds=1, iterations=1)
@@ -0,0 +1,90 @@
+import pytest
+
+from etl.tests.benchmarks.rows import filmwork_rows, person_rows
+from etl.utils import models_validation
+from etl.utils.etl_state import JsonFileStorage, State
+
+SIZES = [10, 100, 500]
+
+
+@pytest.mark.parametrize('films', SIZES)
+def test_transform_films(benchmark, etl, films: int) -> None:
+    """Group joined rows into film documents and validate them."""
+
+    rows = filmwork_rows(films)
+
+    documents = benchmark(lambda: list(etl.transform_films(rows)))
+
+    assert len(documents) == films
+
+
+@pytest.mark.parametrize('persons', [100, 1000, 10000])
+def test_transform_persons(benchmark, etl, persons: int) -> None:
+    rows = person_rows(persons)
+
+    documents = benchmark(lambda: list(etl.transform_persons(rows)))
+
+    assert len(documents) == persons
+
+
+@pytest.mark.parametrize('films', [100, 1000, 5000])
+def test_validate_film_models(benchmark, etl, films: int) -> None:
+    """Validate and dump film documents, as the loader gets them."""
+
+    documents = list(etl.transform_films(filmwork_rows(10)))
+    documents = (documents * (films // len(documents) + 1))[:films]
+
+    def validate():
+        return [
+            models_validation.ESFilmworkModel(**document).dict()
+            for document in documents
+        ]
+
+    assert len(benchmark(validate)) == films
+
+
+@pytest.mark.parametrize('persons', [100, 1000, 10000])
+def test_validate_pg_person_models(benchmark, persons: int) -> None:
+    rows = person_rows(persons)
+
+    def validate():
+        return [
+            models_validation.PGPFullersonModel(**row).dict() for row in rows
+        ]
+
+    assert len(benchmark(validate)) == persons
+
+
+@pytest.mark.parametrize('keys', [1, 100, 1000])
+def test_state_storage(benchmark, tmp_path, keys: int) -> None:
+    """Save the ETL state, which reads the state file back each time."""
+
+    storage = JsonFileStorage(file_path=f'{tmp_path}/')
+    state = State(storage=storage)
+    modified = {f'key{number}': '2023-01-01' for number in range(keys)}
+
+    benchmark(state.set_state, 'modified', modified)
+
+    assert storage.retrieve_state()['modified'] == modified
+
+
+@pytest.mark.parametrize('limit', [10, 100, 1000])
+def test_load_batching(benchmark, etl, limit: int) -> None:
+    """Split documents into packets of LIMIT for the loader."""
+
+    class Loader:
+        def __init__(self):
+            self.packets = 0
+
+        def transfer_films(self, actions):
+            self.packets += 1
+
+    documents = list(etl.transform_films(filmwork_rows(100))) * 50
+    etl.conf = etl.conf.copy(update={'LIMIT': limit})
+
+    def load():
+        etl.es_client = Loader()
+        etl.load_films(iter(documents))
+        return etl.es_client.packets
+
+    assert benchmark(load) == -(-len(documents) // limit)
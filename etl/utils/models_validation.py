@@ -36,6 +36,13 @@ class PGPersonFilmworkModel(UUIDMixin, ModifiedMixin):
     """A model for movies with specific persons."""
 
 
+class ESSuggestModel(BaseModel):
+    """A model for Elasticsearch completion suggester fields."""
+
+    input: list[str]
+    weight: int
+
+
 class ESPersonModel(UUIDMixin):
     """A model for Elasticsearch person instances."""
 
@@ -50,6 +57,7 @@ class ESFullPersonModel(UUIDMixin):
     """A model for Elasticsearch full person instances."""
 
     full_name: str
+    full_name_suggest: ESSuggestModel | None
 
 
 class ESFilmworkModel(UUIDMixin):
@@ -57,7 +65,9 @@ class ESFilmworkModel(UUIDMixin):
 
     imdb_rating: float | None
     genres: list[ESGenreAndFilmModel] | None
+    genre_ids: list[uuid.UUID] | None
     title: str
+    title_suggest: ESSuggestModel | None
     description: str | None
     directors: list[ESPersonModel] | None
     actors_names: list[str] | None
@@ -0,0 +1,15 @@
+def suggest_field(text: str | None, rating: float | None = None) -> dict:
+    """
+    Return a completion suggester field for the text.
+
+    Every word suffix of the text is an input, so that 'Star Wars'
+    is suggested for 'wa' as well as for 'st'. Higher rated films
+    are suggested first.
+    """
+
+    words = (text or '').split()
+
+    return {
+        'input': [' '.join(words[i:]) for i in range(len(words))],
+        'weight': round((rating or 0) * 10),
+    }
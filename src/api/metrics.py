@@ -0,0 +1,23 @@
+from elasticsearch import AsyncElasticsearch
+from fastapi import APIRouter, Depends, Response
+from redis.asyncio import Redis
+
+from core import metrics
+from db import elastic, redis
+
+router = APIRouter()
+
+
+@router.get('/metrics', include_in_schema=False)
+async def prometheus_metrics(
+    redis_client: Redis = Depends(redis.get_redis),
+    elastic_client: AsyncElasticsearch = Depends(elastic.get_elastic)
+) -> Response:
+    """Return the metrics of the API in the Prometheus text format."""
+
+    metrics.set_pool_stats('redis', redis.get_pool_stats(redis_client))
+    metrics.set_pool_stats('elastic', elastic.get_pool_stats(elastic_client))
+    metrics.set_limiter_stats('elastic', elastic_client.limiter.stats())
+    data, content_type = metrics.render_metrics()
+
+    return Response(content=data, headers={'Content-Type': content_type})
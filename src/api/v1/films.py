@@ -3,11 +3,19 @@ from typing import Annotated
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
-from api.v1.schemes import FilmFull, FilmList
-from services.film import FilmService, get_film_service
+from api.v1.schemes import FilmBatch, FilmFull, FilmList, IdsBatch
+from core.config import settings
+from services.film import (FILMS_SEARCH_SORT, FILMS_SORT, FilmService,
+                           get_film_service)
+from services.warmup import count_film_request
 from utils.constants import FILM_NOT_FOUND
+from utils.cursor import check_page_window, get_search_after, in_page_window
+from utils.http_cache import cache_control
 from utils.paginator_page_size_calc import get_page_size
+from utils.rate_limit import limit_exports
 
 router = APIRouter()
 
@@ -15,7 +23,10 @@ router = APIRouter()
 @router.get(
     '/',
     response_model=FilmList,
-    summary='List of films'
+    summary='List of films',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_LIST_MAX_AGE))
+    ],
 )
 async def filmlist(
     page_number: Annotated[
@@ -25,40 +36,60 @@ async def filmlist(
         int, Query(description='Pagination page size', ge=1)
     ] = 20,
     genre: Annotated[UUID, Query(description='Search by genre id')] = None,
+    search_after: list | None = Depends(get_search_after(FILMS_SORT)),
     film_service: FilmService = Depends(get_film_service)
 ) -> FilmList:
     """
     Return list of films with parameters:
 
     - **total**: total number of all films in database
+    - **total_is_estimate**: total is a lower bound of the number of films
     - **page**: current page number
     - **size**: size of page
     - **prev**: link to previous page
     - **next**: link to next page
     - **results**: list of film information
+
+    The next link carries a cursor, follow it to page deeper than
+    the page_number window allows.
     """
 
-    total, filmlist = await film_service.get_films(
-        page=page_number, size=page_size, genre=genre
+    check_page_window(page_number, page_size, search_after)
+    films_page = await film_service.get_films(
+        page=page_number, size=page_size, genre=genre,
+        search_after=search_after
     )
+    total, filmlist, cursor, total_is_estimate = films_page
 
     if total == 0:
         prev = None
         next = None
         size = None
     else:
+        # Without a genre the link lists all films, 'None' is no genre id
+        genre_param = f'genre={genre}&' if genre else ''
         prev = (
-            f'/films?genre={genre}&page_number={page_number-1}'
-            if page_number > 1 else None
+            f'/films?{genre_param}page_number={page_number-1}'
+            f'&page_size={page_size}'
+            if page_number > 1 and in_page_window(page_number - 1, page_size)
+            else None
         )
         next = (
-            f'/films?genre={genre}&page_number={page_number+1}'
-            if (page_number - 1) * page_size + len(filmlist) < total else None
+            f'/films?{genre_param}page_number={page_number+1}'
+            f'&page_size={page_size}&cursor={cursor}'
+            if cursor and (
+                total_is_estimate
+                or (page_number - 1) * page_size + len(filmlist) < total
+            ) else None
+        )
+        size = (
+            len(filmlist) if total_is_estimate
+            else get_page_size(page_number, total, page_size, next)
         )
-        size = get_page_size(page_number, total, page_size, next)
 
     return FilmList(
         total=total,
+        total_is_estimate=total_is_estimate,
         page=page_number,
         size=size,
         prev=prev,
@@ -71,7 +102,14 @@ async def filmlist(
     )
 
 
-@router.get('/search', response_model=FilmList, summary='Film search')
+@router.get(
+    '/search',
+    response_model=FilmList,
+    summary='Film search',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_LIST_MAX_AGE))
+    ],
+)
 async def film_search(
         query: Annotated[str, Query(description='Film search query')],
         page_number: Annotated[
@@ -80,12 +118,16 @@ async def film_search(
         page_size: Annotated[
             int, Query(description='Pagination page size', ge=1)
         ] = 20,
+        search_after: list | None = Depends(
+            get_search_after(FILMS_SEARCH_SORT)
+        ),
         film_service: FilmService = Depends(get_film_service)
 ) -> FilmList:
     """
     Return list of films by query:
 
     - **total**: total number of all films in database
+    - **total_is_estimate**: total is a lower bound of the number of films
     - **page**: current page number
     - **size**: size of page
     - **prev**: link to previous page
@@ -93,9 +135,12 @@ async def film_search(
     - **results**: list of film information
     """
 
-    total, filmlist = await film_service.search_films(
-        query=query, page=page_number, size=page_size
+    check_page_window(page_number, page_size, search_after)
+    films_page = await film_service.search_films(
+        query=query, page=page_number, size=page_size,
+        search_after=search_after
     )
+    total, filmlist, cursor, total_is_estimate = films_page
 
     if total == 0:
         prev = None
@@ -104,17 +149,27 @@ async def film_search(
     else:
         prev = (
             f'/films/search?query={query}&page_number={page_number-1}'
-            if page_number > 1 else None
+            f'&page_size={page_size}'
+            if page_number > 1 and in_page_window(page_number - 1, page_size)
+            else None
         )
         next = (
             f'/films/search?query={query}&page_number={page_number+1}'
-            if (page_number - 1) * page_size + len(filmlist) < total else None
+            f'&page_size={page_size}&cursor={cursor}'
+            if cursor and (
+                total_is_estimate
+                or (page_number - 1) * page_size + len(filmlist) < total
+            ) else None
         )
 
-        size = get_page_size(page_number, total, page_size, next)
+        size = (
+            len(filmlist) if total_is_estimate
+            else get_page_size(page_number, total, page_size, next)
+        )
 
     return FilmList(
         total=total,
+        total_is_estimate=total_is_estimate,
         page=page_number,
         size=size,
         prev=prev,
@@ -127,7 +182,67 @@ async def film_search(
     )
 
 
-@router.get('/{film_id}', response_model=FilmFull, summary='Film detail')
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    summary='Export of all films',
+    dependencies=[Depends(limit_exports)],
+    responses={
+        200: {'content': {'application/x-ndjson': {}}},
+        429: {'description': 'Export limit exceeded'},
+    },
+)
+async def film_export(
+    film_service: FilmService = Depends(get_film_service)
+) -> StreamingResponse:
+    """
+    Stream all films as NDJSON, one film information object per line.
+
+    Exports are limited per client, a 429 response carries
+    Retry-After with the number of seconds to wait.
+    """
+
+    films = film_service.export_films()
+
+    return StreamingResponse(
+        films,
+        media_type='application/x-ndjson',
+        background=BackgroundTask(films.aclose)
+    )
+
+
+@router.post('/batch', response_model=FilmBatch, summary='Films by ids')
+async def film_batch(
+    batch: IdsBatch,
+    film_service: FilmService = Depends(get_film_service)
+) -> FilmBatch:
+    """
+    Return information on several films, in the order of the ids given:
+
+    - **results**: list of film information
+    - **not_found**: ids of films that do not exist
+    """
+
+    film_ids = list(dict.fromkeys(batch.ids))
+    films = await film_service.get_by_ids(film_ids)
+
+    return FilmBatch(
+        results=[FilmFull(**film.dict()) for film in films if film],
+        not_found=[
+            film_id for film_id, film in zip(film_ids, films) if not film
+        ]
+    )
+
+
+@router.get(
+    '/{film_id}',
+    response_model=FilmFull,
+    summary='Film detail',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_DETAIL_MAX_AGE)),
+        Depends(count_film_request),
+    ],
+)
 async def film_details(
     film_id: str,
     film_service: FilmService = Depends(get_film_service)
@@ -4,14 +4,23 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query
 from utils.paginator_page_size_calc import get_page_size
 
-from api.v1.schemes import Genre, GenreList
+from api.v1.schemes import Genre, GenreBatch, GenreList, IdsBatch
+from core.config import settings
 from services.genre import GenreService, get_genre_service
 from utils.constants import GENRE_NOT_FOUND
+from utils.http_cache import cache_control
 
 router = APIRouter()
 
 
-@router.get('/', response_model=GenreList, summary='Genre list')
+@router.get(
+    '/',
+    response_model=GenreList,
+    summary='Genre list',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_LIST_MAX_AGE))
+    ],
+)
 async def genre_list(
     genre_service: GenreService = Depends(get_genre_service),
     page_number: Annotated[
@@ -63,7 +72,40 @@ async def genre_list(
     )
 
 
-@router.get('/{genre_id}', response_model=Genre, summary='Genre detail')
+@router.post('/batch', response_model=GenreBatch, summary='Genres by ids')
+async def genre_batch(
+    batch: IdsBatch,
+    genre_service: GenreService = Depends(get_genre_service)
+) -> GenreBatch:
+    """
+    Return information on several genres, in the order of the ids given:
+
+    - **results**: list of genres
+    - **not_found**: ids of genres that do not exist
+    """
+
+    genre_ids = list(dict.fromkeys(batch.ids))
+    genres = await genre_service.get_by_ids(genre_ids)
+
+    return GenreBatch(
+        results=[
+            Genre(id=genre.id, name=genre.name) for genre in genres if genre
+        ],
+        not_found=[
+            genre_id for genre_id, genre in zip(genre_ids, genres)
+            if not genre
+        ]
+    )
+
+
+@router.get(
+    '/{genre_id}',
+    response_model=Genre,
+    summary='Genre detail',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_DETAIL_MAX_AGE))
+    ],
+)
 async def genre_detail(
     genre_id: str,
     genre_service: GenreService = Depends(get_genre_service)
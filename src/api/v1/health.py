@@ -0,0 +1,31 @@
+import os
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+
+from api.v1.schemes import ElasticPoolStats, PoolStats, RedisPoolStats
+from db import elastic, redis
+
+router = APIRouter()
+
+
+@router.get('/pools', response_model=PoolStats, summary='Pool usage')
+async def pool_stats(
+    redis_client: Redis = Depends(redis.get_redis),
+    elastic_client: AsyncElasticsearch = Depends(elastic.get_elastic)
+) -> PoolStats:
+    """
+    Return connection pool usage of the worker process
+    that handled the request:
+
+    - **pid**: worker process id
+    - **redis**: Redis connection pool usage
+    - **elastic**: Elasticsearch connection pool usage
+    """
+
+    return PoolStats(
+        pid=os.getpid(),
+        redis=RedisPoolStats(**redis.get_pool_stats(redis_client)),
+        elastic=ElasticPoolStats(**elastic.get_pool_stats(elastic_client)),
+    )
@@ -4,15 +4,26 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query
 from utils.paginator_page_size_calc import get_page_size
 
-from api.v1.schemes import (Person, PersonList, PersonShortFilmInfo,
-                            PersonShortFilmInfoList)
-from services.person import PersonService, get_person_service
+from api.v1.schemes import (IdsBatch, Person, PersonBatch, PersonList,
+                            PersonShortFilmInfo, PersonShortFilmInfoList)
+from core.config import settings
+from services.person import (PERSONS_SORT, PersonService,
+                             get_person_service)
 from utils.constants import PERSON_NOT_FOUND
+from utils.cursor import check_page_window, get_search_after, in_page_window
+from utils.http_cache import cache_control
 
 router = APIRouter()
 
 
-@router.get('/search', response_model=PersonList, summary='Person list')
+@router.get(
+    '/search',
+    response_model=PersonList,
+    summary='Person list',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_LIST_MAX_AGE))
+    ],
+)
 async def person_list_search(
     person_service: PersonService = Depends(get_person_service),
     page_number: Annotated[
@@ -21,24 +32,32 @@ async def person_list_search(
     page_size: Annotated[
         int, Query(description='Pagination page size', ge=1)
     ] = 10,
-    query: str | None = None
+    query: str | None = None,
+    search_after: list | None = Depends(get_search_after(PERSONS_SORT))
 ) -> PersonList:
     """
     Return person list by query:
 
     - **total**: total number of all persons found
+    - **total_is_estimate**: total is a lower bound of the number of persons
     - **page**: current page number
     - **size**: size of page
     - **prev**: link to previous page
     - **next**: link to next page
     - **results**: list of persons
+
+    The next link carries a cursor, follow it to page deeper than
+    the page_number window allows.
     """
 
-    total, objects = await person_service.get_person_list(
+    check_page_window(page_number, page_size, search_after)
+    persons_page = await person_service.get_person_list(
         page_number,
         page_size,
-        query
+        query,
+        search_after
     )
+    total, objects, cursor, total_is_estimate = persons_page
 
     if total == 0:
         prev = None
@@ -47,16 +66,26 @@ async def person_list_search(
     else:
         prev = (
             f'/persons/search?query={query}&page_number={page_number-1}'
-            if page_number > 1 else None
+            f'&page_size={page_size}'
+            if page_number > 1 and in_page_window(page_number - 1, page_size)
+            else None
         )
         next = (
             f'/persons/search?query={query}&page_number={page_number+1}'
-            if (page_number - 1) * page_size + len(objects) < total else None
+            f'&page_size={page_size}&cursor={cursor}'
+            if cursor and (
+                total_is_estimate
+                or (page_number - 1) * page_size + len(objects) < total
+            ) else None
+        )
+        size = (
+            len(objects) if total_is_estimate
+            else get_page_size(page_number, total, page_size, next)
         )
-        size = get_page_size(page_number, total, page_size, next)
 
     return PersonList(
         total=total,
+        total_is_estimate=total_is_estimate,
         page=page_number,
         size=size,
         prev=prev,
@@ -71,7 +100,48 @@ async def person_list_search(
     )
 
 
-@router.get('/{person_id}', response_model=Person, summary='Person detail')
+@router.post(
+    '/batch',
+    response_model=PersonBatch,
+    summary='Persons by ids'
+)
+async def person_batch(
+    batch: IdsBatch,
+    person_service: PersonService = Depends(get_person_service)
+) -> PersonBatch:
+    """
+    Return information on several persons, in the order of the ids given:
+
+    - **results**: list of persons with their films and roles
+    - **not_found**: ids of persons that do not exist
+    """
+
+    person_ids = list(dict.fromkeys(batch.ids))
+    persons = await person_service.get_by_ids(person_ids)
+
+    return PersonBatch(
+        results=[
+            Person(
+                id=person.id,
+                full_name=person.full_name,
+                films=person.films,
+            ) for person in persons if person
+        ],
+        not_found=[
+            person_id for person_id, person in zip(person_ids, persons)
+            if not person
+        ]
+    )
+
+
+@router.get(
+    '/{person_id}',
+    response_model=Person,
+    summary='Person detail',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_DETAIL_MAX_AGE))
+    ],
+)
 async def person_detail(
     person_id: str,
     person_service: PersonService = Depends(get_person_service)
@@ -101,7 +171,10 @@ async def person_detail(
 @router.get(
     '/{person_id}/film',
     response_model=PersonShortFilmInfoList,
-    summary='List of person\'s films'
+    summary='List of person\'s films',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_DETAIL_MAX_AGE))
+    ],
 )
 async def person_films_detail(
     person_id: str,
@@ -4,6 +4,8 @@
 from uuid import UUID
 from pydantic import BaseModel, Field
 
+from core.config import settings
+
 
 class FilmShort(BaseModel):
     """An API model to represent brief film information.
@@ -17,8 +19,10 @@ class FilmShort(BaseModel):
 class FilmList(BaseModel):
     """An API model to represent a list of films with a paginator.
 
+    The total is a lower bound when total_is_estimate is set.
     """
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int | None
     prev: str | None
@@ -92,8 +96,74 @@ class Person(BaseModel):
 
 class PersonList(BaseModel):
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int | None
     prev: str | None
     next: str | None
     results: list[Person]
+
+
+class IdsBatch(BaseModel):
+    """An API model to request several objects by their ids.
+
+    """
+    ids: list[str] = Field(min_items=1, max_items=settings.BATCH_MAX_IDS)
+
+
+class FilmBatch(BaseModel):
+    """An API model to represent films requested by ids.
+
+    Results follow the order of the ids requested.
+    """
+    results: list[FilmFull]
+    not_found: list[str]
+
+
+class GenreBatch(BaseModel):
+    results: list[Genre]
+    not_found: list[str]
+
+
+class PersonBatch(BaseModel):
+    results: list[Person]
+    not_found: list[str]
+
+
+class Suggestion(BaseModel):
+    """An API model to represent a suggested film or person.
+
+    """
+    id: str
+    label: str
+
+
+class Suggestions(BaseModel):
+    """An API model to represent films and persons suggested for a prefix.
+
+    """
+    films: list[Suggestion]
+    persons: list[Suggestion]
+
+
+class RedisPoolStats(BaseModel):
+    max_connections: int
+    created_connections: int
+    in_use_connections: int
+    idle_connections: int
+
+
+class ElasticPoolStats(BaseModel):
+    nodes: int
+    max_connections: int
+    in_use_connections: int
+    idle_connections: int
+
+
+class PoolStats(BaseModel):
+    """An API model to represent connection pool usage of the worker.
+
+    """
+    pid: int
+    redis: RedisPoolStats
+    elastic: ElasticPoolStats
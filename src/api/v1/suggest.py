@@ -0,0 +1,57 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from api.v1.schemes import Suggestion, Suggestions
+from core.config import settings
+from services.suggest import SuggestService, get_suggest_service
+from utils.http_cache import cache_control
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    response_model=Suggestions,
+    summary='Type-ahead suggestions',
+    dependencies=[
+        Depends(cache_control(settings.HTTP_CACHE_SUGGEST_MAX_AGE))
+    ],
+)
+async def suggest(
+    suggest_service: SuggestService = Depends(get_suggest_service),
+    query: Annotated[
+        str, Query(
+            description='Beginning of a film title or a person name',
+            min_length=1,
+            max_length=settings.SUGGEST_QUERY_MAX_LENGTH
+        )
+    ] = ...,
+    size: Annotated[
+        int, Query(
+            description='Max number of suggestions of each kind',
+            ge=1,
+            le=settings.SUGGEST_MAX_SIZE
+        )
+    ] = 5
+) -> Suggestions:
+    """
+    Return films and persons whose title or name words start
+    with the query:
+
+    - **films**: list of suggested films, id and title
+    - **persons**: list of suggested persons, id and full name
+    """
+
+    suggestions = await suggest_service.get_suggestions(query, size)
+
+    return Suggestions(
+        films=[
+            Suggestion(id=film.id, label=film.label)
+            for film in suggestions.films
+        ],
+        persons=[
+            Suggestion(id=person.id, label=person.label)
+            for person in suggestions.persons
+        ]
+    )
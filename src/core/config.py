@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from logging import config as logging_config
 
@@ -14,6 +15,16 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 class Settings(BaseSettings):
     PROJECT_NAME: str = Field(env='PROJECT_NAME')
 
+    # ASGI server, see gunicorn.conf.py
+    API_HOST: str = '0.0.0.0'
+    API_PORT: int = 8000
+    API_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    API_BACKLOG: int = 2048
+    API_KEEPALIVE: int = 5
+    API_GRACEFUL_TIMEOUT: int = 30
+    API_WORKER_TIMEOUT: int = 60
+    API_LOG_LEVEL: str = 'info'
+
     REDIS_HOST: str = Field(env='REDIS_HOST')
     REDIS_PORT: int = Field(env='REDIS_PORT')
 
@@ -24,9 +35,138 @@ class Settings(BaseSettings):
     ES_MOVIE_INDEX: str
     ES_GENRE_INDEX: str
     ES_PERSON_INDEX: str
+    # index.max_result_window, deeper pages must be paged with a cursor
+    ELASTIC_MAX_RESULT_WINDOW: int = 10000
+    # Hits are counted exactly up to this number, the total is
+    # reported as an estimate beyond it
+    ELASTIC_TRACK_TOTAL_HITS: int = 1000
 
     REDIS_CACHE_EXPIRES_IN_SECONDS = 60 * 5
 
+    # Max number of ids of one batch request
+    BATCH_MAX_IDS: int = 100
+
+    # Type-ahead suggestions, cached longer than search results
+    # as the suggested labels change only with the ETL
+    SUGGEST_MAX_SIZE: int = 10
+    SUGGEST_QUERY_MAX_LENGTH: int = 50
+    SUGGEST_CACHE_EXPIRES_IN_SECONDS: int = 60 * 60
+
+    # Catalogue export, one export per client in EXPORT_RATE_LIMIT_SECONDS
+    # and up to EXPORT_MAX_STREAMS streams per worker
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_PIT_KEEP_ALIVE: str = '1m'
+    EXPORT_RATE_LIMIT_SECONDS: int = 60
+    EXPORT_MAX_STREAMS: int = 2
+
+    # Cache-Control max-age of read endpoints
+    HTTP_CACHE_DETAIL_MAX_AGE: int = 300
+    HTTP_CACHE_LIST_MAX_AGE: int = 60
+    HTTP_CACHE_SUGGEST_MAX_AGE: int = 600
+    # ETags remembered per worker to answer conditional requests
+    HTTP_ETAG_CACHE_SIZE: int = 10000
+    # Seconds an ETag answers conditional requests without the route,
+    # short so that a changed page is not answered with 304 for long
+    HTTP_ETAG_CACHE_TTL: int = 10
+
+    # Send the time spent in Redis, Elasticsearch and serialization
+    # in the Server-Timing header of responses
+    SERVER_TIMING_ENABLED: bool = True
+
+    # Redis database of the HTTP layer caches, kept apart from the
+    # services cache
+    REDIS_RESPONSE_CACHE_DB: int = 1
+
+    # Last good copies of cacheable responses, sent when a route fails.
+    # Kept in a Redis of their own, with a memory limit and LRU
+    # eviction, at STALE_REDIS_HOST or else REDIS_HOST
+    STALE_CACHE_ENABLED: bool = True
+    STALE_CACHE_EXPIRES_IN_SECONDS: int = 60 * 60 * 24 * 7
+    STALE_REDIS_HOST: str | None = None
+    STALE_REDIS_PORT: int | None = None
+    STALE_REDIS_DB: int = 3
+
+    # Warm-up of the services cache on start and whenever the ETL
+    # publishes on WARMUP_CHANNEL, once per WARMUP_INTERVAL seconds for
+    # all the workers, WARMUP_CONCURRENCY searches at a time. Page sizes
+    # are the defaults of the routes. A HOT_KEYS_SAMPLE_RATE share of
+    # film detail requests is counted to find the WARMUP_HOT_FILMS films
+    # requested most
+    WARMUP_ENABLED: bool = True
+    WARMUP_CHANNEL: str = 'etl:loaded'
+    WARMUP_INTERVAL: int = 60
+    WARMUP_CONCURRENCY: int = 4
+    WARMUP_FILM_PAGES: int = 3
+    WARMUP_GENRE_PAGES: int = 1
+    WARMUP_FILMS_PAGE_SIZE: int = 20
+    WARMUP_GENRES_PAGE_SIZE: int = 10
+    WARMUP_HOT_FILMS: int = 500
+    WARMUP_FILMS_BATCH_SIZE: int = 100
+    HOT_KEYS_SAMPLE_RATE: float = 0.1
+
+    # Response compression, encodings in order of preference
+    COMPRESSION_ENCODINGS: list[str] = ['br', 'gzip']
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    # Keep compressed bodies in the response cache
+    COMPRESSION_CACHE_ENABLED: bool = True
+
+    # Requests of a client allowed in a sliding window of seconds, by
+    # path prefix, the longest prefix matching the path applies:
+    # (requests, window, requests of users with an access token).
+    # Search hits Elasticsearch on every query and is limited hardest
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_POLICIES: dict[str, tuple[int, int, int]] = {
+        '/api/v1/films/search': (50, 10, 100),
+        '/api/v1/persons/search': (50, 10, 100),
+        '/api/v1/suggest': (100, 10, 200),
+        '/api/v1/': (1000, 10, 2000),
+    }
+    # Clients tracked by the token buckets of a worker
+    RATE_LIMIT_LOCAL_CACHE_SIZE: int = 10000
+    # Addresses or networks of the proxies, nginx, whose X-Real-IP is
+    # taken as the client address of rate limits. Other clients are
+    # limited by the address they connect from
+    TRUSTED_PROXIES: list[str] = []
+
+    # Access tokens of the auth service, verified in the worker with
+    # the key the auth service signs them with. Decoded tokens are
+    # kept until they expire, their revocation in the auth Redis
+    # database is checked again after AUTH_REVOCATION_CHECK_INTERVAL
+    AUTH_SECRET_KEY: str = Field('', env='SECRET_KEY')
+    AUTH_JWT_ALGORITHMS: list[str] = ['HS256']
+    AUTH_REDIS_DB: int = 2
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_REVOCATION_CHECK_INTERVAL: float = 5.0
+
+    # Connection pools, one per worker process
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    # Connections opened by each worker on startup
+    REDIS_PREWARM_CONNECTIONS: int = 5
+
+    ELASTIC_CONNECTIONS_PER_NODE: int = 25
+    ELASTIC_REQUEST_TIMEOUT: float = 5.0
+    ELASTIC_MAX_RETRIES: int = 2
+    ELASTIC_RETRY_ON_TIMEOUT: bool = True
+    ELASTIC_HTTP_COMPRESS: bool = True
+    ELASTIC_PREWARM_CONNECTIONS: int = 5
+    # Elasticsearch requests in flight per worker. The limit starts at
+    # ELASTIC_CONCURRENCY_INITIAL, is scaled by ELASTIC_CONCURRENCY_BACKOFF
+    # when a request takes over ELASTIC_LATENCY_TARGET seconds or times
+    # out and grows back by one per limit fast requests. Requests over
+    # the limit are answered with 503 at once
+    ELASTIC_CONCURRENCY_INITIAL: int = 20
+    ELASTIC_CONCURRENCY_MIN: int = 2
+    ELASTIC_CONCURRENCY_MAX: int = 50
+    ELASTIC_CONCURRENCY_BACKOFF: float = 0.9
+    ELASTIC_LATENCY_TARGET: float = 0.5
+
     class Config:
         env_file = BASE_DIR / '.env'
 
@@ -0,0 +1,218 @@
+"""Prometheus metrics and per-request timings of the API.
+
+Spans of a request (time spent in Redis, Elasticsearch and response
+serialization) are summed in a context variable set by
+MetricsMiddleware and sent back in the Server-Timing header.
+"""
+
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+from models.page import Page
+
+# Gunicorn workers share metrics through files in this directory
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+LATENCY_BUCKETS = (
+    .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10
+)
+
+REQUEST_LATENCY = Histogram(
+    'api_request_duration_seconds',
+    'Time to respond to a request.',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_LATENCY = Histogram(
+    'api_dependency_duration_seconds',
+    'Round-trip time of Redis and Elasticsearch operations.',
+    ['dependency', 'operation'],
+    buckets=LATENCY_BUCKETS,
+)
+ELASTIC_TOOK = Histogram(
+    'api_elastic_took_seconds',
+    'Time Elasticsearch reports it spent on a search.',
+    ['operation'],
+    buckets=LATENCY_BUCKETS,
+)
+SERIALIZATION_LATENCY = Histogram(
+    'api_serialization_duration_seconds',
+    'Time to render response bodies.',
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'api_cache_lookups_total',
+    'Lookups of the services cache.',
+    ['operation', 'result'],
+)
+RATE_LIMIT_DECISIONS = Counter(
+    'api_rate_limit_decisions_total',
+    'Requests checked against rate limits, by policy and decision.',
+    ['policy', 'result'],
+)
+TOKEN_VERIFICATIONS = Counter(
+    'api_token_verifications_total',
+    'Access tokens verified, by where the verification came from.',
+    ['result'],
+)
+WARMUP_PAGES = Counter(
+    'api_cache_warmup_pages_total',
+    'Pages searched by cache warm-ups, by whether they were cached.',
+    ['result'],
+)
+STALE_RESPONSES = Counter(
+    'api_stale_responses_total',
+    'Failed requests answered with a stale copy, or missing one.',
+    ['result'],
+)
+ADMISSION_REJECTIONS = Counter(
+    'api_admission_rejections_total',
+    'Dependency calls refused at the concurrency limit.',
+    ['dependency'],
+)
+CONCURRENCY_LIMIT = Gauge(
+    'api_concurrency_limit',
+    'Concurrency limit of dependency calls of the worker, and calls in '
+    'flight.',
+    ['dependency', 'state'],
+    multiprocess_mode='liveall',
+)
+POOL_CONNECTIONS = Gauge(
+    'api_pool_connections',
+    'Connections of the Redis and Elasticsearch pools of the worker.',
+    ['pool', 'state'],
+    multiprocess_mode='liveall',
+)
+
+_spans: ContextVar[dict[str, float] | None] = ContextVar(
+    '_spans', default=None
+)
+
+
+def start_spans() -> dict[str, float]:
+    """Start collecting spans of the current request."""
+
+    spans = {}
+    _spans.set(spans)
+
+    return spans
+
+
+def add_span(name: str, seconds: float) -> None:
+    """Add time spent on a span to the current request, if any."""
+
+    spans = _spans.get()
+
+    if spans is not None:
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+def server_timing(spans: dict[str, float], total: float) -> str:
+    """Return the value of the Server-Timing header."""
+
+    metrics = [
+        f'{name};dur={seconds * 1000:.2f}' for name, seconds in spans.items()
+    ]
+    metrics.append(f'total;dur={total * 1000:.2f}')
+
+    return ', '.join(metrics)
+
+
+def observe_elastic_took(operation: str, response) -> None:
+    """Record the time Elasticsearch spent on a search, in ms in took."""
+
+    took = response.get('took')
+
+    if took is None:
+        return
+
+    ELASTIC_TOOK.labels(operation).observe(took / 1000)
+    add_span('es-took', took / 1000)
+
+
+def _is_hit(result) -> bool:
+    """Check whether a cache read found anything."""
+
+    if isinstance(result, Page):
+        return bool(result.results)
+
+    # Genre pages are cached as (total, genres), with no genres on a
+    # miss, and totals as (total, is_estimate), None on a miss
+    if isinstance(result, tuple):
+        return result[-1] is not None
+
+    return bool(result)
+
+
+def instrument(dependency: str):
+    """
+    Class decorator timing the coroutine methods of a cache or search
+    service. Cache reads are also counted as hits or misses.
+    """
+
+    def wrap(method):
+        operation = method.__name__.strip('_')
+
+        @functools.wraps(method)
+        async def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                DEPENDENCY_LATENCY.labels(dependency, operation).observe(
+                    elapsed
+                )
+                add_span(dependency, elapsed)
+
+            if dependency == 'redis' and operation.startswith('get'):
+                CACHE_LOOKUPS.labels(
+                    operation, 'hit' if _is_hit(result) else 'miss'
+                ).inc()
+
+            return result
+
+        return inner
+
+    def decorator(cls):
+        for name, attr in list(vars(cls).items()):
+            if inspect.iscoroutinefunction(attr) and not name.startswith('__'):
+                setattr(cls, name, wrap(attr))
+
+        return cls
+
+    return decorator
+
+
+def set_pool_stats(pool: str, stats: dict) -> None:
+    """Expose connection pool usage given by get_pool_stats."""
+
+    for state in ('in_use', 'idle'):
+        POOL_CONNECTIONS.labels(pool, state).set(
+            stats[f'{state}_connections']
+        )
+
+
+def set_limiter_stats(dependency: str, stats: dict) -> None:
+    """Expose the state of a concurrency limiter."""
+
+    for state in ('limit', 'in_flight'):
+        CONCURRENCY_LIMIT.labels(dependency, state).set(stats[state])
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the metrics in the Prometheus text format."""
+
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
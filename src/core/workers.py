@@ -0,0 +1,15 @@
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopUvicornWorker(UvicornWorker):
+    """Gunicorn worker running the app with uvloop and httptools.
+
+    The default worker falls back to asyncio and h11 silently if they
+    are missing, this one fails to boot instead.
+    """
+
+    CONFIG_KWARGS = {
+        'loop': 'uvloop',
+        'http': 'httptools',
+        'lifespan': 'on',
+    }
@@ -1,8 +1,21 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
 
-from elasticsearch import AsyncElasticsearch
+from elasticsearch import AsyncElasticsearch, ConnectionError
+from elasticsearch import ConnectionTimeout
+from fastapi import Request
 
+from core import metrics
 from core.config import settings
+from utils.admission import AIMDLimiter
+
+# hits.total stand-in for searches run with track_total_hits disabled
+NOT_COUNTED = {'value': None, 'relation': 'eq'}
+
+# Failures of a request meaning Elasticsearch is overloaded
+CONGESTION_ERRORS = (ConnectionError, ConnectionTimeout)
 
 
 class AsyncSearchAbstract(ABC):
@@ -18,15 +31,125 @@ class AsyncSearchAbstract(ABC):
     async def _get_list_of_objects(self):
         pass
 
+    @abstractmethod
+    async def _get_many_objects(self):
+        pass
+
+
+class InstrumentedElasticsearch(AsyncElasticsearch):
+    """
+    Elasticsearch client recording the round-trip time of every request
+    and, for searches, the time Elasticsearch reports in took.
+
+    Requests in flight are capped by the limiter, requests over the
+    limit raise Overloaded without reaching Elasticsearch.
+    """
+
+    def __init__(self, *args, limiter: AIMDLimiter = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def options(self, **kwargs) -> 'InstrumentedElasticsearch':
+        client = super().options(**kwargs)
+        client.limiter = self.limiter
+
+        return client
+
+    async def perform_request(self, method: str, path: str, **kwargs):
+        operation = next(
+            (part[1:] for part in path.split('/') if part.startswith('_')),
+            'index'
+        )
+
+        with self.limiter.admit(CONGESTION_ERRORS):
+            start = time.perf_counter()
+
+            try:
+                response = await super().perform_request(
+                    method, path, **kwargs
+                )
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.DEPENDENCY_LATENCY.labels(
+                    'elastic', operation
+                ).observe(elapsed)
+                metrics.add_span('es', elapsed)
+
+        if isinstance(response.body, dict):
+            metrics.observe_elastic_took(operation, response.body)
+
+        return response
+
+
+def create_elastic() -> AsyncElasticsearch:
+    """Create an Elasticsearch client with a bounded connection pool.
+
+    One client is created per worker process on application startup
+    and shared by all requests through the lifespan state.
+    """
+
+    return InstrumentedElasticsearch(
+        [{
+            'scheme': settings.ELASTIC_SCHEME,
+            'host': settings.ELASTIC_HOST,
+            'port': settings.ELASTIC_PORT
+        }],
+        connections_per_node=settings.ELASTIC_CONNECTIONS_PER_NODE,
+        request_timeout=settings.ELASTIC_REQUEST_TIMEOUT,
+        max_retries=settings.ELASTIC_MAX_RETRIES,
+        retry_on_timeout=settings.ELASTIC_RETRY_ON_TIMEOUT,
+        http_compress=settings.ELASTIC_HTTP_COMPRESS,
+        limiter=AIMDLimiter(
+            'elastic',
+            initial=settings.ELASTIC_CONCURRENCY_INITIAL,
+            minimum=settings.ELASTIC_CONCURRENCY_MIN,
+            maximum=settings.ELASTIC_CONCURRENCY_MAX,
+            latency_target=settings.ELASTIC_LATENCY_TARGET,
+            backoff=settings.ELASTIC_CONCURRENCY_BACKOFF,
+        ),
+    )
+
+
+async def prewarm_elastic(
+    elastic: AsyncElasticsearch,
+    connections: int
+) -> None:
+    """Open connections of the pool ahead of the first requests."""
+
+    # ping does not raise, it reports a failed request with False
+    pings = await asyncio.gather(
+        *(elastic.ping() for _ in range(connections))
+    )
+    if not all(pings):
+        logging.warning('Elasticsearch pool is not prewarmed.')
+
+
+def get_pool_stats(elastic: AsyncElasticsearch) -> dict:
+    """Return connection pool usage of the Elasticsearch client."""
+
+    in_use = 0
+    idle = 0
+    nodes = elastic.transport.node_pool.all()
+
+    for node in nodes:
+        session = getattr(node, 'session', None)
+        if session is None:
+            continue
+        connector = session.connector
+        in_use += len(getattr(connector, '_acquired', ()))
+        idle += sum(
+            len(conns) for conns in getattr(connector, '_conns', {}).values()
+        )
 
-elastic: AsyncElasticsearch = AsyncElasticsearch(
-    [{
-        'scheme': settings.ELASTIC_SCHEME,
-        'host': settings.ELASTIC_HOST,
-        'port': settings.ELASTIC_PORT
-    }]
-)
+    return {
+        'nodes': len(nodes),
+        'max_connections': (
+            len(nodes) * settings.ELASTIC_CONNECTIONS_PER_NODE
+        ),
+        'in_use_connections': in_use,
+        'idle_connections': idle,
+    }
 
 
-async def get_elastic() -> AsyncElasticsearch:
-    return elastic
+async def get_elastic(request: Request) -> AsyncElasticsearch:
+    return request.state.elastic
@@ -1,6 +1,10 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
 
-from redis.asyncio import Redis
+from fastapi import Request
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.exceptions import RedisError
 
 from core.config import settings
 
@@ -26,9 +30,68 @@ class AsyncCacheAbstract(ABC):
     async def _put_list_of_objects(self):
         pass
 
+    @abstractmethod
+    async def _get_many_objects(self):
+        pass
+
+    @abstractmethod
+    async def _put_many_objects(self):
+        pass
+
+
+def create_redis(
+    db: int = 0, host: str | None = None, port: int | None = None
+) -> Redis:
+    """Create a Redis client with a bounded connection pool.
+
+    When all connections are busy, callers wait up to
+    REDIS_POOL_TIMEOUT seconds for a free one instead of
+    opening new sockets. The client connects to REDIS_HOST and
+    REDIS_PORT unless another host is given.
+    """
+
+    pool = BlockingConnectionPool(
+        host=host or settings.REDIS_HOST,
+        port=port or settings.REDIS_PORT,
+        db=db,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+
+    return Redis(connection_pool=pool)
+
+
+async def prewarm_redis(redis: Redis, connections: int) -> None:
+    """Open connections of the pool ahead of the first requests."""
+
+    try:
+        await asyncio.gather(*(redis.ping() for _ in range(connections)))
+    except RedisError as exc:
+        logging.warning('Redis pool is not prewarmed: %s', exc)
+
+
+def get_pool_stats(redis: Redis) -> dict:
+    """Return connection pool usage of the Redis client."""
+
+    pool = redis.connection_pool
+    created = len(pool._connections)
+    in_use = pool.max_connections - pool.pool.qsize()
+
+    return {
+        'max_connections': pool.max_connections,
+        'created_connections': created,
+        'in_use_connections': in_use,
+        'idle_connections': created - in_use,
+    }
+
 
-redis: Redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+async def get_redis(request: Request) -> Redis:
+    return request.state.redis
 
 
-async def get_redis() -> Redis:
-    return redis
+async def get_auth_redis(request: Request) -> Redis:
+    return request.state.auth_redis
@@ -0,0 +1,39 @@
+"""Gunicorn settings of the API, run with gunicorn -c gunicorn.conf.py."""
+
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+from core.config import settings
+
+bind = f'{settings.API_HOST}:{settings.API_PORT}'
+backlog = settings.API_BACKLOG
+workers = settings.API_WORKERS
+worker_class = 'core.workers.UvloopUvicornWorker'
+
+# Workers get SIGTERM on shutdown and reload, stop accepting connections
+# and finish the requests in flight within graceful_timeout
+graceful_timeout = settings.API_GRACEFUL_TIMEOUT
+timeout = settings.API_WORKER_TIMEOUT
+keepalive = settings.API_KEEPALIVE
+
+loglevel = settings.API_LOG_LEVEL
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Empty the Prometheus directory of a previous run."""
+
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that has exited."""
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
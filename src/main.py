@@ -1,23 +1,97 @@
-import logging
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 import uvicorn
-from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import ORJSONResponse
-from redis.asyncio import Redis
 
-from api.v1 import films, genres, persons
+from api import metrics
+from api.v1 import films, genres, health, persons, suggest
+from core import metrics as core_metrics
 from core.config import settings
 from core.logger import LOGGING
-from db import elastic, redis
+from db.elastic import create_elastic, prewarm_elastic
+from db.redis import create_redis, prewarm_redis
+from middlewares.compression import CompressionMiddleware
+from middlewares.http_cache import HTTPCacheMiddleware
+from middlewares.metrics import MetricsMiddleware
+from middlewares.rate_limit import RateLimitMiddleware
+from middlewares.stale import StaleResponseMiddleware
+from services.warmup import run_warmups
+from utils.admission import Overloaded
+from utils.constants import SERVICE_OVERLOADED
+from utils.responses import TimedORJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[dict]:
+    """Create Redis and Elasticsearch clients for the worker process.
+
+    The clients are shared by all requests through the lifespan state
+    and are available as request.state.redis and request.state.elastic.
+    The HTTP layer caches use request.state.response_cache, the last
+    good responses are kept in request.state.stale_cache and access
+    tokens are checked against the denylist in request.state.auth_redis.
+    Connections are opened before the worker starts taking requests,
+    the services cache is warmed up in the background.
+    """
+
+    redis = create_redis()
+    response_cache = create_redis(db=settings.REDIS_RESPONSE_CACHE_DB)
+    auth_redis = create_redis(db=settings.AUTH_REDIS_DB)
+    stale_cache = create_redis(
+        db=settings.STALE_REDIS_DB,
+        host=settings.STALE_REDIS_HOST,
+        port=settings.STALE_REDIS_PORT,
+    )
+    elastic = create_elastic()
+
+    await asyncio.gather(
+        prewarm_redis(redis, settings.REDIS_PREWARM_CONNECTIONS),
+        prewarm_redis(response_cache, settings.REDIS_PREWARM_CONNECTIONS),
+        prewarm_elastic(elastic, settings.ELASTIC_PREWARM_CONNECTIONS),
+    )
+    if settings.WARMUP_ENABLED:
+        warmups = asyncio.create_task(
+            run_warmups(redis, response_cache, elastic)
+        )
+
+    yield {
+        'redis': redis,
+        'response_cache': response_cache,
+        'auth_redis': auth_redis,
+        'stale_cache': stale_cache,
+        'elastic': elastic
+    }
+
+    if settings.WARMUP_ENABLED:
+        warmups.cancel()
+        await asyncio.gather(warmups, return_exceptions=True)
+    await redis.close(close_connection_pool=True)
+    await response_cache.close(close_connection_pool=True)
+    await auth_redis.close(close_connection_pool=True)
+    await stale_cache.close(close_connection_pool=True)
+    await elastic.close()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     docs_url='/api/openapi',
     openapi_url='/api/openapi.json',
-    default_response_class=ORJSONResponse,
+    default_response_class=TimedORJSONResponse,
+    lifespan=lifespan,
 )
+# The last middleware added runs first, stale copies are kept
+# uncompressed, ETags are computed over the compressed bodies, clients
+# over their rate limit are refused before any of it and the timings
+# cover everything
+app.add_middleware(StaleResponseMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(HTTPCacheMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 # Return 400 BAD_REQUEST instead of 422 HTTP_UNPROCESSABLE_ENTITY
@@ -31,22 +105,19 @@ async def validation_exception_handler(
     )
 
 
-@app.on_event('startup')
-async def startup():
-    redis.redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
-    elastic.es = AsyncElasticsearch(
-        hosts=[
-            f'{settings.ELASTIC_SCHEME}://'
-            f'{settings.ELASTIC_HOST}'
-            f':{settings.ELASTIC_PORT}'
-        ]
-    )
-
+# Shed requests Elasticsearch has no capacity for at once,
+# rather than letting them wait behind it
+@app.exception_handler(Overloaded)
+async def overloaded_exception_handler(
+    request: Request, exc: Overloaded
+) -> ORJSONResponse:
+    core_metrics.ADMISSION_REJECTIONS.labels(exc.dependency).inc()
 
-@app.on_event('shutdown')
-async def shutdown():
-    await redis.redis.close()
-    await elastic.es.close()
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": SERVICE_OVERLOADED},
+        headers={'Retry-After': '1'},
+    )
 
 
 # Подключаем роутер к серверу, указав префикс /v1/films
@@ -54,12 +125,21 @@ async def shutdown():
 app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
+app.include_router(suggest.router, prefix='/api/v1/suggest', tags=['suggest'])
+app.include_router(health.router, prefix='/api/v1/health', tags=['health'])
+app.include_router(metrics.router)
 
+# Local run, the container runs gunicorn with gunicorn.conf.py
 if __name__ == '__main__':
     uvicorn.run(
         'main:app',
-        host='0.0.0.0',
-        port=8000,
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        backlog=settings.API_BACKLOG,
+        timeout_keep_alive=settings.API_KEEPALIVE,
+        loop='uvloop',
+        http='httptools',
         log_config=LOGGING,
-        log_level=logging.DEBUG,
+        log_level=settings.API_LOG_LEVEL,
     )
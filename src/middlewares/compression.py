@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import logging
+
+import brotli
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+COMPRESSED_CACHE_EXPIRE_IN_SECONDS = settings.REDIS_CACHE_EXPIRES_IN_SECONDS
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+COMPRESSORS = {
+    'br': lambda body: brotli.compress(
+        body,
+        mode=brotli.MODE_TEXT,
+        quality=settings.COMPRESSION_BROTLI_QUALITY
+    ),
+    # mtime is fixed so the same body always gives the same bytes
+    'gzip': lambda body: gzip.compress(
+        body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    ),
+}
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Return the first of COMPRESSION_ENCODINGS the client accepts,
+    or None if the response should not be compressed.
+    """
+
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON and text responses of at least
+    COMPRESSION_MINIMUM_SIZE bytes with brotli or gzip.
+
+    Compressed bodies are kept in the response cache, keyed by the
+    hash of the body and the encoding, so a page served again from
+    the services cache is not compressed again. Streamed responses
+    are passed through as is.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get('accept-encoding')
+        )
+        if encoding is None:
+            await self.app(scope, receive, self._vary(send))
+            return
+
+        response_cache = scope.get('state', {}).get('response_cache')
+        response_start: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal response_start, passthrough
+
+            if message['type'] == 'http.response.start':
+                if self._is_compressible(message):
+                    response_start = message
+                    return
+                passthrough = True
+                await send(message)
+                return
+
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            headers = MutableHeaders(raw=response_start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+
+            if message.get('more_body', False):
+                passthrough = True
+                await send(response_start)
+                await send(message)
+                return
+
+            if len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+                body = await self._compress(response_cache, body, encoding)
+                headers['Content-Encoding'] = encoding
+                headers['Content-Length'] = str(len(body))
+
+            await send(response_start)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _vary(self, send: Send) -> Send:
+        """
+        Return send marking compressible responses sent uncompressed
+        as varying by Accept-Encoding, so shared caches keep them apart
+        from the compressed ones.
+        """
+
+        async def send_with_vary(message: Message) -> None:
+            if (
+                message['type'] == 'http.response.start'
+                and self._is_compressible(message)
+            ):
+                headers = MutableHeaders(raw=message['headers'])
+                headers.add_vary_header('Accept-Encoding')
+
+            await send(message)
+
+        return send_with_vary
+
+    @staticmethod
+    def _is_compressible(response_start: Message) -> bool:
+        """Check whether the response body may be compressed."""
+
+        headers = Headers(raw=response_start['headers'])
+
+        return (
+            'content-encoding' not in headers
+            and headers.get('content-type', '').startswith(COMPRESSIBLE_TYPES)
+        )
+
+    @staticmethod
+    async def _compress(
+        response_cache: Redis | None,
+        body: bytes,
+        encoding: str
+    ) -> bytes:
+        """Compress the body or take its compressed bytes from cache."""
+
+        if response_cache is None or not settings.COMPRESSION_CACHE_ENABLED:
+            return COMPRESSORS[encoding](body)
+
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        cache_key = f'compressed:{encoding}:{digest}'
+
+        try:
+            data = await response_cache.get(cache_key)
+        except RedisError as exc:
+            logging.warning('Response cache is unavailable: %s', exc)
+            return COMPRESSORS[encoding](body)
+
+        if data:
+            return data
+
+        data = COMPRESSORS[encoding](body)
+
+        try:
+            await response_cache.set(
+                cache_key, data, COMPRESSED_CACHE_EXPIRE_IN_SECONDS
+            )
+        except RedisError as exc:
+            logging.warning('Response cache is unavailable: %s', exc)
+
+        return data
@@ -0,0 +1,158 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from middlewares.compression import negotiate_encoding
+from utils.ttl_cache import TTLCache
+
+
+def url_cache_key(scope: Scope) -> str:
+    """Return a cache key for the requested URL.
+
+    Query parameters are sorted, so the same page requested with
+    parameters in another order shares the key.
+    """
+
+    query = urlencode(sorted(
+        parse_qsl(scope['query_string'].decode(), keep_blank_values=True)
+    ))
+
+    return f'{scope["path"]}?{query}'
+
+
+def etag_cache_key(scope: Scope, headers: Headers) -> str:
+    """Return a cache key for the ETag of the requested URL.
+
+    Each content encoding of the page has its own ETag.
+    """
+
+    encoding = negotiate_encoding(headers.get('accept-encoding'))
+
+    return f'{url_cache_key(scope)}|{encoding or "identity"}'
+
+
+def make_etag(body: bytes) -> str:
+    """Return a strong ETag of the response body."""
+
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check the ETag against an If-None-Match header value."""
+
+    if if_none_match.strip() == '*':
+        return True
+
+    return etag in {
+        tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+    }
+
+
+class HTTPCacheMiddleware:
+    """
+    Add a strong ETag to cacheable responses and answer conditional
+    GET requests with 304 Not Modified.
+
+    A response is cacheable if it is a 200 with a public Cache-Control,
+    set on the route with utils.http_cache.cache_control. The ETag is
+    computed over the bytes sent, after compression. The ETag and
+    caching headers of each URL are remembered by the worker for
+    HTTP_ETAG_CACHE_TTL seconds, so a matching If-None-Match is answered
+    before the route runs and nothing is fetched or serialized. Later
+    requests run the route, which tells whether the page has changed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.etags = TTLCache(
+            maxsize=settings.HTTP_ETAG_CACHE_SIZE,
+            ttl=settings.HTTP_ETAG_CACHE_TTL
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        cache_key = etag_cache_key(scope, request_headers)
+        if_none_match = request_headers.get('if-none-match')
+
+        cached = self.etags.get(cache_key) if if_none_match else None
+        if cached and etag_matches(if_none_match, cached[0]):
+            await self._send_not_modified(send, *cached)
+            return
+
+        response_start: Message | None = None
+        body_chunks: list[bytes] = []
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal response_start
+
+            if message['type'] == 'http.response.start':
+                if self._is_cacheable(message):
+                    response_start = message
+                    return
+                await send(message)
+                return
+
+            if response_start is None:
+                await send(message)
+                return
+
+            body_chunks.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+
+            body = b''.join(body_chunks)
+            etag = make_etag(body)
+            headers = MutableHeaders(raw=response_start['headers'])
+            headers['ETag'] = etag
+            cached = (etag, headers['Cache-Control'], headers.get('Vary'))
+            self.etags.set(cache_key, cached)
+
+            if if_none_match and etag_matches(if_none_match, etag):
+                await self._send_not_modified(send, *cached)
+                return
+
+            await send(response_start)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_with_etag)
+
+    @staticmethod
+    def _is_cacheable(response_start: Message) -> bool:
+        """Check whether the response may be stored by shared caches."""
+
+        headers = Headers(raw=response_start['headers'])
+
+        return (
+            response_start['status'] == 200
+            and 'public' in headers.get('cache-control', '')
+        )
+
+    @staticmethod
+    async def _send_not_modified(
+        send: Send,
+        etag: str,
+        cache_control: str,
+        vary: str | None = None
+    ) -> None:
+        """Send a 304 response without a body."""
+
+        headers = [
+            (b'etag', etag.encode()),
+            (b'cache-control', cache_control.encode()),
+        ]
+        if vary:
+            headers.append((b'vary', vary.encode()))
+
+        await send({
+            'type': 'http.response.start',
+            'status': 304,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': b''})
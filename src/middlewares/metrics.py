@@ -0,0 +1,53 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import metrics
+from core.config import settings
+
+
+class MetricsMiddleware:
+    """
+    Record the latency of every request by method, route and status,
+    and send the time spent in Redis, Elasticsearch and serialization
+    back in the Server-Timing header.
+
+    Routes are labelled with their path template, so /films/{film_id}
+    is one series whatever the film.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        spans = metrics.start_spans()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_timed(message: Message) -> None:
+            nonlocal status
+
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', metrics.server_timing(
+                        spans, time.perf_counter() - start
+                    ))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            route = scope.get('route')
+            metrics.REQUEST_LATENCY.labels(
+                scope['method'],
+                route.path if route else 'unmatched',
+                status
+            ).observe(time.perf_counter() - start)
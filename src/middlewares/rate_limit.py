@@ -0,0 +1,139 @@
+import logging
+import time
+
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core import metrics
+from core.config import settings
+from services.auth import InvalidToken, get_token_verifier
+from utils.constants import RATE_LIMITED
+from utils.rate_limit import (SlidingWindow, TokenBucket, get_client_address,
+                              retry_after)
+from utils.ttl_cache import TTLCache
+
+
+class RateLimitMiddleware:
+    """
+    Limit requests of every client with the policy of the longest
+    RATE_LIMIT_POLICIES path prefix matching the request, in a sliding
+    window shared by the workers through Redis. Clients over the limit
+    get 429 Too Many Requests with Retry-After.
+
+    Clients are told apart by the user of a valid access token, with
+    the higher limit of the policy, or by their address otherwise.
+    A client over the limit in a single worker is refused by the
+    worker's token bucket without a Redis round trip.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.policies = sorted(
+            settings.RATE_LIMIT_POLICIES.items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        # Buckets are kept for the window of their policy, a bucket
+        # idle that long is full again
+        self.buckets = TTLCache(
+            maxsize=settings.RATE_LIMIT_LOCAL_CACHE_SIZE, ttl=1
+        )
+        self.windows: dict[int, SlidingWindow] = {}
+
+    def _match_policy(self, path: str) -> tuple[str, tuple] | None:
+        for prefix, policy in self.policies:
+            if path.startswith(prefix):
+                return prefix, policy
+
+        return None
+
+    @staticmethod
+    async def _identify(scope: Scope) -> tuple[str, bool]:
+        """Return the client of the request and whether it is a user."""
+
+        request = Request(scope)
+        scheme, _, token = Headers(scope=scope).get(
+            'authorization', ''
+        ).partition(' ')
+
+        if scheme.lower() == 'bearer' and token and settings.AUTH_SECRET_KEY:
+            verifier = get_token_verifier(scope['state']['auth_redis'])
+            try:
+                claims = await verifier.verify(token)
+            except InvalidToken:
+                pass
+            else:
+                return f'user:{claims["sub"]}', True
+
+        return f'ip:{get_client_address(request)}', False
+
+    def _sliding_window(self, scope: Scope) -> SlidingWindow:
+        redis = scope['state']['response_cache']
+        window = self.windows.get(id(redis))
+
+        if window is None:
+            window = self.windows[id(redis)] = SlidingWindow(redis)
+
+        return window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        matched = None
+        if scope['type'] == 'http' and settings.RATE_LIMIT_ENABLED:
+            matched = self._match_policy(scope['path'])
+
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        prefix, (limit, window, user_limit) = matched
+        client, is_user = await self._identify(scope)
+        if is_user:
+            limit = user_limit
+        key = f'ratelimit:{prefix}:{client}'
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(limit, window)
+            self.buckets.set(key, bucket, ttl=window)
+
+        wait = bucket.take()
+        if wait:
+            metrics.RATE_LIMIT_DECISIONS.labels(prefix, 'rejected_local').inc()
+            await self._reject(scope, receive, send, wait)
+            return
+
+        start = time.perf_counter()
+        try:
+            allowed, value = await self._sliding_window(scope).hit(
+                key, limit, window
+            )
+        except RedisError as exc:
+            # The local bucket still holds each worker to the limit
+            logging.warning('Rate limit is not checked: %s', exc)
+            metrics.RATE_LIMIT_DECISIONS.labels(prefix, 'error').inc()
+            allowed = True
+        finally:
+            metrics.add_span('ratelimit', time.perf_counter() - start)
+
+        if not allowed:
+            bucket.block(value)
+            metrics.RATE_LIMIT_DECISIONS.labels(prefix, 'rejected').inc()
+            await self._reject(scope, receive, send, value)
+            return
+
+        metrics.RATE_LIMIT_DECISIONS.labels(prefix, 'allowed').inc()
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(
+        scope: Scope, receive: Receive, send: Send, wait: float
+    ) -> None:
+        response = ORJSONResponse(
+            status_code=429,
+            content={'detail': RATE_LIMITED},
+            headers={'Retry-After': retry_after(wait)},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,182 @@
+import logging
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import metrics
+from core.config import settings
+from middlewares.http_cache import url_cache_key
+from utils.ttl_cache import TTLCache
+
+STALE_WARNING = b'110 - "Response is Stale"'
+
+
+def is_cacheable(response_start: Message) -> bool:
+    """Check whether the response may be kept as a last good copy."""
+
+    headers = Headers(raw=response_start['headers'])
+
+    return (
+        response_start['status'] == 200
+        and 'public' in headers.get('cache-control', '')
+        and 'content-encoding' not in headers
+    )
+
+
+class HeldResponse:
+    """
+    Send of a route passing good responses through, copying the body
+    of cacheable ones if asked to, and holding server errors back.
+    """
+
+    def __init__(self, send: Send, copy: bool) -> None:
+        self.send = send
+        self.copy = copy
+        self.start: Message | None = None
+        self.failed = False
+        self._chunks: list[bytes] = []
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            self.failed = message['status'] >= 500
+            self.copy = self.copy and is_cacheable(message)
+        elif self.copy or self.failed:
+            self._chunks.append(message.get('body', b''))
+
+        if not self.failed:
+            await self.send(message)
+
+    @property
+    def body(self) -> bytes:
+        return b''.join(self._chunks)
+
+    async def release(self) -> None:
+        """Send the server error held back."""
+
+        await self.send(self.start)
+        await self.send({'type': 'http.response.body', 'body': self.body})
+
+
+class StaleResponseMiddleware:
+    """
+    Keep the last good copy of every cacheable response and send it
+    when the route fails, so the catalogue stays readable while
+    Elasticsearch restarts or is overloaded.
+
+    A response is kept if it is a 200 with a public Cache-Control, for
+    STALE_CACHE_EXPIRES_IN_SECONDS in the stale cache, a Redis of its
+    own with a memory limit and LRU eviction. A worker refreshes the
+    copy of a URL at most once per REDIS_CACHE_EXPIRES_IN_SECONDS.
+
+    When the route raises or responds with a server error, the copy is
+    sent with a Warning header and the Age of the copy, and is not
+    stored by shared caches. Without a copy the failure goes on as is.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.refreshed = TTLCache(
+            maxsize=settings.HTTP_ETAG_CACHE_SIZE,
+            ttl=settings.REDIS_CACHE_EXPIRES_IN_SECONDS
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope['type'] != 'http'
+            or scope['method'] != 'GET'
+            or not settings.STALE_CACHE_ENABLED
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        stale_cache = scope['state']['stale_cache']
+        cache_key = f'lkg:{url_cache_key(scope)}'
+        response = HeldResponse(
+            send, copy=self.refreshed.get(cache_key) is None
+        )
+
+        try:
+            await self.app(scope, receive, response)
+        except Exception:
+            # Too late once a good response has started
+            if response.start is not None and not response.failed:
+                raise
+            if not await self._send_stale(stale_cache, cache_key, send):
+                raise
+            logging.warning(
+                'Sent a stale response of %s', cache_key, exc_info=True
+            )
+            return
+
+        if response.failed:
+            if not await self._send_stale(stale_cache, cache_key, send):
+                await response.release()
+        elif response.copy:
+            await self._store(
+                stale_cache, cache_key, response.start, response.body
+            )
+
+    async def _store(
+        self,
+        stale_cache: Redis,
+        cache_key: str,
+        response_start: Message,
+        body: bytes
+    ) -> None:
+        """Replace the copy of the response."""
+
+        headers = Headers(raw=response_start['headers'])
+
+        try:
+            async with stale_cache.pipeline(transaction=False) as pipe:
+                pipe.hset(cache_key, mapping={
+                    'content-type': headers.get('content-type', ''),
+                    'stored_at': int(time.time()),
+                    'body': body,
+                })
+                pipe.expire(cache_key, settings.STALE_CACHE_EXPIRES_IN_SECONDS)
+                await pipe.execute()
+        except RedisError as exc:
+            logging.warning('Failed to keep a stale response: %s', exc)
+            return
+
+        self.refreshed.set(cache_key, True)
+
+    @staticmethod
+    async def _send_stale(
+        stale_cache: Redis, cache_key: str, send: Send
+    ) -> bool:
+        """Send the copy of the response, if there is one."""
+
+        try:
+            copy = await stale_cache.hgetall(cache_key)
+        except RedisError as exc:
+            logging.warning('Failed to read a stale response: %s', exc)
+            copy = None
+
+        if not copy:
+            metrics.STALE_RESPONSES.labels('missing').inc()
+            return False
+
+        metrics.STALE_RESPONSES.labels('sent').inc()
+        age = max(0, int(time.time()) - int(copy[b'stored_at']))
+        body = copy[b'body']
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', copy[b'content-type']),
+                (b'content-length', str(len(body)).encode()),
+                (b'cache-control', b'no-cache'),
+                (b'age', str(age).encode()),
+                (b'warning', STALE_WARNING),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+        return True
@@ -0,0 +1,12 @@
+from typing import Any, NamedTuple
+
+
+class Page(NamedTuple):
+    """A page of objects with the cursor to the next page.
+
+    The total is a lower bound when total_is_estimate is set.
+    """
+    total: int
+    results: list[Any]
+    cursor: str | None = None
+    total_is_estimate: bool = False
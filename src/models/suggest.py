@@ -0,0 +1,16 @@
+from models.mixins import UUIDMixin, ORJSONMixin
+
+
+class Suggestion(ORJSONMixin, UUIDMixin):
+    """A model to retrieve a suggested film or person.
+
+    """
+    label: str
+
+
+class Suggestions(ORJSONMixin):
+    """A model to retrieve films and persons suggested for a prefix.
+
+    """
+    films: list[Suggestion]
+    persons: list[Suggestion]
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import time
+from functools import lru_cache
+
+import jwt
+from fastapi import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import settings
+from core.metrics import TOKEN_VERIFICATIONS, add_span
+from db.redis import get_auth_redis
+from utils.ttl_cache import TTLCache
+
+
+class InvalidToken(Exception):
+    """The token is malformed, expired, revoked or not an access token."""
+
+
+class TokenVerifier:
+    """
+    Verify access tokens of the auth service without calling it.
+
+    The signature and exp are checked with the auth service key, and
+    the decoded claims are kept by a digest of the token until the
+    token expires, so a client sending the same token again costs a
+    dict lookup. Revocations, written by the auth service to
+    denylist:{jti} (see auth/db/token_store.py), are checked with one
+    EXISTS at most every AUTH_REVOCATION_CHECK_INTERVAL per token.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        if not settings.AUTH_SECRET_KEY:
+            raise RuntimeError('SECRET_KEY of the auth service is not set')
+
+        self.redis = redis
+        self._claims = TTLCache(
+            maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+            ttl=settings.AUTH_REVOCATION_CHECK_INTERVAL
+        )
+        self._revocations = TTLCache(
+            maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+            ttl=settings.AUTH_REVOCATION_CHECK_INTERVAL
+        )
+
+    @staticmethod
+    def _decode(token: str) -> dict:
+        try:
+            claims = jwt.decode(
+                token,
+                settings.AUTH_SECRET_KEY,
+                algorithms=settings.AUTH_JWT_ALGORITHMS,
+                options={'require': ['exp', 'sub', 'jti']},
+            )
+        except jwt.PyJWTError as exc:
+            raise InvalidToken(str(exc)) from exc
+
+        if claims.get('type', 'access') != 'access':
+            raise InvalidToken('Only access tokens are allowed')
+
+        return claims
+
+    async def _is_revoked(self, claims: dict) -> bool:
+        revoked = self._revocations.get(claims['jti'])
+
+        if revoked is not None:
+            return revoked
+
+        start = time.perf_counter()
+        try:
+            revoked = bool(
+                await self.redis.exists(f'denylist:{claims["jti"]}')
+            )
+        except RedisError as exc:
+            # Signature and expiry are checked, access tokens are short
+            # lived, so the request is let through rather than failed
+            logging.warning('Token revocation is not checked: %s', exc)
+            return False
+        finally:
+            add_span('auth', time.perf_counter() - start)
+
+        # A revoked token stays revoked until it expires
+        self._revocations.set(
+            claims['jti'],
+            revoked,
+            ttl=claims['exp'] - time.time() if revoked else None,
+        )
+
+        return revoked
+
+    async def verify(self, token: str) -> dict:
+        """
+        Return the claims of the access token.
+
+        :raise InvalidToken: The token must not be accepted.
+        """
+
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        claims = self._claims.get(key)
+
+        if claims is None:
+            try:
+                claims = self._decode(token)
+            except InvalidToken:
+                TOKEN_VERIFICATIONS.labels('invalid').inc()
+                raise
+            self._claims.set(key, claims, ttl=claims['exp'] - time.time())
+            TOKEN_VERIFICATIONS.labels('decoded').inc()
+        else:
+            TOKEN_VERIFICATIONS.labels('cached').inc()
+
+        if await self._is_revoked(claims):
+            TOKEN_VERIFICATIONS.labels('revoked').inc()
+            raise InvalidToken('Token has been revoked')
+
+        return claims
+
+
+@lru_cache()
+def get_token_verifier(
+        redis: Redis = Depends(get_auth_redis),
+) -> TokenVerifier:
+    return TokenVerifier(redis)
@@ -1,19 +1,39 @@
 import json
+import time
 from functools import lru_cache
+from typing import AsyncIterator
 from uuid import UUID
 
+import anyio
+import orjson
+
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
 
 from core.config import settings
-from db.elastic import AsyncSearchAbstract, elastic, get_elastic
-from db.redis import AsyncCacheAbstract, get_redis, redis
+from core.metrics import instrument
+from db.elastic import NOT_COUNTED, AsyncSearchAbstract, get_elastic
+from db.redis import AsyncCacheAbstract, get_redis
 from models.models import FilmFull, FilmShort
+from models.page import Page
 from redis.asyncio import Redis
+from utils.cursor import encode_cursor, paginate
 
 
 FILM_CACHE_EXPIRE_IN_SECONDS = settings.REDIS_CACHE_EXPIRES_IN_SECONDS
 INDEX_NAME = settings.ES_MOVIE_INDEX
+# The index can be recreated with another mapping while the API runs
+MAPPING_EXPIRE_IN_SECONDS = 60
+
+# The id tiebreaker makes the order total, as search_after requires
+FILMS_SORT = [
+    {"imdb_rating": {"order": "desc"}},
+    {"id": {"order": "asc"}},
+]
+FILMS_SEARCH_SORT = [{"_score": {"order": "desc"}}, *FILMS_SORT]
+# List pages render only brief film information
+FILMS_SOURCE = list(FilmShort.__fields__)
+FILMS_EXPORT_SOURCE = list(FilmFull.__fields__)
 
 
 class ElasticService(AsyncSearchAbstract):
@@ -22,6 +42,29 @@ class ElasticService(AsyncSearchAbstract):
     def __init__(self, elastic: AsyncElasticsearch, index_name: str):
         self.elastic = elastic
         self.index_name = index_name
+        self._mapped_fields: set[str] = set()
+        self._mapping_expires_at = 0.0
+
+    async def _has_field(self, field: str) -> bool:
+        """
+        Check whether the film index mapping has a top-level field,
+        reading the mapping again every MAPPING_EXPIRE_IN_SECONDS.
+        """
+
+        if time.monotonic() >= self._mapping_expires_at:
+            response = await self.elastic.indices.get_mapping(
+                index=self.index_name
+            )
+            self._mapped_fields = {
+                name
+                for index in response.values()
+                for name in index['mappings'].get('properties', {})
+            }
+            self._mapping_expires_at = (
+                time.monotonic() + MAPPING_EXPIRE_IN_SECONDS
+            )
+
+        return field in self._mapped_fields
 
     async def _get_single_object(self, film_id: str) -> FilmFull | None:
         """Retrieve a film instance from Elasticsearch DB."""
@@ -32,30 +75,99 @@ class ElasticService(AsyncSearchAbstract):
             return None
         return FilmFull(**doc['_source'])
 
-    async def _get_list_of_objects(
+    async def _get_many_objects(
+        self,
+        film_ids: list[str]
+    ) -> dict[str, FilmFull]:
+        """Retrieve film instances from Elasticsearch DB with one mget."""
+
+        response = await self.elastic.mget(
+            index=self.index_name, ids=film_ids
+        )
+
+        return {
+            doc['_id']: FilmFull(**doc['_source'])
+            for doc in response['docs'] if doc.get('found')
+        }
+
+    async def _iter_all_objects(
         self,
-        search_query: dict
-    ) -> tuple[int, list[FilmShort]]:
+        source: list[str],
+        batch_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Walk the whole index in batches of film documents.
+
+        A point in time keeps the view of the index consistent for the
+        walk and search_after pages through it, so every batch costs
+        the same however deep the walk is.
+        """
+
+        pit = await self.elastic.open_point_in_time(
+            index=self.index_name,
+            keep_alive=settings.EXPORT_PIT_KEEP_ALIVE
+        )
+        pit_id = pit['id']
+
+        try:
+            search_after = None
+
+            while True:
+                search_query = {
+                    "pit": {
+                        "id": pit_id,
+                        "keep_alive": settings.EXPORT_PIT_KEEP_ALIVE
+                    },
+                    "sort": [{"_shard_doc": "asc"}],
+                    "_source": source,
+                    "size": batch_size,
+                    "track_total_hits": False
+                }
+                if search_after:
+                    search_query['search_after'] = search_after
+
+                result = await self.elastic.search(body=search_query)
+                hits = result['hits']['hits']
+
+                if not hits:
+                    return
+
+                yield [hit['_source'] for hit in hits]
+
+                pit_id = result.get('pit_id', pit_id)
+                search_after = hits[-1]['sort']
+        finally:
+            # Shielded, the walk is cancelled when the client disconnects
+            with anyio.CancelScope(shield=True):
+                await self.elastic.close_point_in_time(id=pit_id)
+
+    async def _get_list_of_objects(self, search_query: dict) -> Page:
         """Return a list of movies from Elasticsearch DB with a paginator."""
 
         result = await self.elastic.search(
             index=self.index_name,
             body=search_query
         )
-        total = result['hits']['total']['value']
-        hits = result['hits']['hits']
+        # Hits are not counted at all when track_total_hits is false
+        total = result['hits'].get('total', NOT_COUNTED)
+        hits = result['hits']['hits'][:search_query['size']]
 
         if not hits:
-            return total, []
+            return Page(total['value'], [])
 
-        try:
-            films = [hits[i]['_source'] for i in range(search_query['size'])]
-        except IndexError:
-            films = [hit['_source'] for hit in hits]
+        cursor = None
+        if len(hits) == search_query['size']:
+            cursor = encode_cursor(hits[-1]['sort'])
 
-        return total, [FilmShort(**film) for film in films]
+        return Page(
+            total['value'],
+            [FilmShort(**hit['_source']) for hit in hits],
+            cursor,
+            total['relation'] == 'gte'
+        )
 
 
+@instrument('redis')
 class RedisService(AsyncCacheAbstract):
     """Class to represent cache service with Redis."""
 
@@ -73,26 +185,79 @@ class RedisService(AsyncCacheAbstract):
 
         return FilmFull.parse_raw(data)
 
+    async def _get_many_objects(
+        self,
+        film_ids: list[str]
+    ) -> dict[str, FilmFull]:
+        """Retrieve film instances from Redis cache with one MGET."""
+
+        data = await self.redis.mget(
+            [f'film:{film_id}' for film_id in film_ids]
+        )
+
+        return {
+            film_id: FilmFull.parse_raw(item)
+            for film_id, item in zip(film_ids, data) if item
+        }
+
+    @staticmethod
+    def _list_cache_key(
+        page: int,
+        size: int,
+        query: str = None,
+        genre: UUID = None,
+        cursor: str = None
+    ) -> str:
+        """Return a cache key for a page of films."""
+
+        if cursor:
+            return f'films:after:{cursor}:{size}:{query}:{genre}'
+
+        return f'films:{page}:{size}:{query}:{genre}'
+
     async def _get_list_of_objects(
         self,
         page: int,
         size: int,
         query: str = None,
-        genre: UUID = None
-    ) -> tuple[int, list[FilmShort]]:
+        genre: UUID = None,
+        cursor: str = None
+    ) -> Page:
         """Retrieve films from Redis cache. """
 
-        cache_key = f'films:{page}:{size}:{query}:{genre}'
+        cache_key = self._list_cache_key(page, size, query, genre, cursor)
         data = await self.redis.get(cache_key)
 
         if not data:
-            return 0, None
+            return Page(0, None)
 
         films_data = json.loads(data)
         films = [FilmShort.parse_raw(film) for film in films_data['films']]
         total = films_data['total']
 
-        return total, films
+        return Page(
+            total,
+            films,
+            films_data.get('cursor'),
+            films_data.get('total_is_estimate', False)
+        )
+
+    async def _get_total(
+        self,
+        query: str = None,
+        genre: UUID = None
+    ) -> tuple[int, bool] | None:
+        """Retrieve the number of films matching the filter from cache."""
+
+        cache_key = f'films:total:{query}:{genre}'
+        data = await self.redis.get(cache_key)
+
+        if not data:
+            return None
+
+        total = json.loads(data)
+
+        return total['value'], total['is_estimate']
 
     async def _put_single_object(self, film: FilmFull):
         """Save a film instance to Redis cache."""
@@ -105,21 +270,35 @@ class RedisService(AsyncCacheAbstract):
             FILM_CACHE_EXPIRE_IN_SECONDS
         )
 
+    async def _put_many_objects(self, films: list[FilmFull]) -> None:
+        """Save film instances to Redis cache in one round trip."""
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for film in films:
+                pipe.set(
+                    f'film:{str(film.id)}',
+                    film.json(),
+                    FILM_CACHE_EXPIRE_IN_SECONDS
+                )
+            await pipe.execute()
+
     async def _put_list_of_objects(
         self,
         page: int,
         size: int,
-        total: int,
-        films: list[FilmShort],
+        films_page: Page,
         query: str = None,
-        genre: UUID = None
+        genre: UUID = None,
+        cursor: str = None
     ) -> None:
         """Save films to Redis cache."""
 
-        cache_key = f'films:{page}:{size}:{query}:{genre}'
+        cache_key = self._list_cache_key(page, size, query, genre, cursor)
         data = {
-            'total': total,
-            'films': [film.json() for film in films]
+            'total': films_page.total,
+            'films': [film.json() for film in films_page.results],
+            'cursor': films_page.cursor,
+            'total_is_estimate': films_page.total_is_estimate
         }
         json_str = json.dumps(data)
 
@@ -127,9 +306,21 @@ class RedisService(AsyncCacheAbstract):
             cache_key, json_str, FILM_CACHE_EXPIRE_IN_SECONDS
         )
 
+    async def _put_total(
+        self,
+        total: int,
+        is_estimate: bool,
+        query: str = None,
+        genre: UUID = None
+    ) -> None:
+        """Save the number of films matching the filter to cache."""
 
-cache_service = RedisService(redis)
-search_service = ElasticService(elastic, INDEX_NAME)
+        cache_key = f'films:total:{query}:{genre}'
+        json_str = json.dumps({'value': total, 'is_estimate': is_estimate})
+
+        await self.redis.set(
+            cache_key, json_str, FILM_CACHE_EXPIRE_IN_SECONDS
+        )
 
 
 class FilmService:
@@ -145,128 +336,220 @@ class FilmService:
         self.es_service = elastic_search
         self.index_name = index_name
 
-    async def get_films(
+    async def _search(
         self,
-        page: int,
-        size: int,
-        genre: UUID
-    ) -> tuple[int, list[FilmShort]]:
+        search_query: dict,
+        query: str = None,
+        genre: UUID = None
+    ) -> Page:
         """
-        Retrieve films instances to list films
-        in accordance with filtration conditions.
+        Search films, counting hits only if the total number
+        of films matching the filter is not cached yet.
         """
 
-        total, films = await cache_service._get_list_of_objects(
-            page, size, genre
+        cached_total = await self.redis_service._get_total(query, genre)
+        search_query['track_total_hits'] = (
+            False if cached_total else settings.ELASTIC_TRACK_TOTAL_HITS
         )
+        films_page = await self.es_service._get_list_of_objects(search_query)
 
-        if not films:
-            start_index = (page - 1) * size
+        if cached_total:
+            total, is_estimate = cached_total
+            return films_page._replace(
+                total=total, total_is_estimate=is_estimate
+            )
 
-            if not genre:
-                search_query = {
-                    "query": {"match_all": {}},
-                    "sort": [{"imdb_rating": {"order": "desc"}}],
-                    "from": start_index,
-                    "size": size
+        if films_page.results:
+            await self.redis_service._put_total(
+                films_page.total, films_page.total_is_estimate, query, genre
+            )
+
+        return films_page
+
+    async def _genre_query(self, genre: UUID | None) -> dict:
+        """
+        Return a query for films of the genre. The flat genre_ids
+        keyword is filtered in filter context, which ES caches, and
+        the nested genres query is kept for indices without the field.
+        """
+
+        if not genre:
+            return {"match_all": {}}
+
+        if await self.es_service._has_field('genre_ids'):
+            return {
+                "bool": {
+                    "filter": [
+                        {"term": {"genre_ids": genre}}
+                    ]
                 }
-            else:
-                search_query = {
-                    "query": {
-                        "nested": {
-                            "path": "genres",
-                            "query": {
-                                "bool": {
-                                    "filter": [
-                                        {
-                                            "term": {"genres.id": genre}
-                                        }
-                                    ]
-                                }
-                            }
-                        }
-                    },
-                    "sort": [{"imdb_rating": {"order": "desc"}}],
-                    "from": start_index,
-                    "size": size
+            }
+
+        return {
+            "nested": {
+                "path": "genres",
+                "query": {
+                    "bool": {
+                        "filter": [
+                            {"term": {"genres.id": genre}}
+                        ]
+                    }
                 }
+            }
+        }
 
-            total, films = await search_service._get_list_of_objects(
-                search_query
-            )
+    async def get_films(
+        self,
+        page: int,
+        size: int,
+        genre: UUID,
+        search_after: list | None = None,
+        use_cache: bool = True
+    ) -> Page:
+        """
+        Retrieve films instances to list films
+        in accordance with filtration conditions.
 
-            if not films:
-                return 0, None
+        Pages are addressed by number with from/size or, when
+        search_after is given, by the sort values of the previous page.
+        Without use_cache the page is searched and cached again.
+        """
 
-            await cache_service._put_list_of_objects(
-                page, size, total, films, genre
+        cursor = encode_cursor(search_after) if search_after else None
+        films_page = Page(0, None)
+        if use_cache:
+            films_page = await self.redis_service._get_list_of_objects(
+                page, size, genre, cursor=cursor
             )
 
-            return total, films
+        if not films_page.results:
+            search_query = {
+                "query": await self._genre_query(genre),
+                "sort": FILMS_SORT,
+                "_source": FILMS_SOURCE,
+                "size": size
+            }
+
+            paginate(search_query, page, size, search_after)
+            films_page = await self._search(search_query, genre=genre)
+
+            if not films_page.results:
+                return Page(0, None)
 
-        return total, films
+            await self.redis_service._put_list_of_objects(
+                page, size, films_page, genre, cursor=cursor
+            )
+
+        return films_page
 
     async def search_films(
         self,
         page: int,
         size: int,
-        query: str
-    ) -> tuple[int, list[FilmShort]]:
+        query: str,
+        search_after: list | None = None
+    ) -> Page:
         """
         Retrieve films instances to list films
         in accordance with search conditions.
         """
 
-        total, films = await cache_service._get_list_of_objects(
-            page, size, query
+        cursor = encode_cursor(search_after) if search_after else None
+        films_page = await self.redis_service._get_list_of_objects(
+            page, size, query, cursor=cursor
         )
 
-        if not films:
-            start_index = (page - 1) * size
+        if not films_page.results:
             search_query = {
                 "query": {"match": {"title": query}},
-                "sort": [
-                    {"_score": {"order": "desc"}},
-                    {"imdb_rating": {"order": "desc"}},
-                ],
-                "from": start_index,
+                "sort": FILMS_SEARCH_SORT,
+                "_source": FILMS_SOURCE,
                 "size": size
             }
 
-            total, films = await search_service._get_list_of_objects(
-                search_query
-            )
+            paginate(search_query, page, size, search_after)
+            films_page = await self._search(search_query, query=query)
 
-            if not films:
-                return 0, None
+            if not films_page.results:
+                return Page(0, None)
 
-            await cache_service._put_list_of_objects(
-                page, size, total, films, query
+            await self.redis_service._put_list_of_objects(
+                page, size, films_page, query, cursor=cursor
             )
 
-            return total, films
-
-        return total, films
+        return films_page
 
     async def get_by_id(self, film_id: str) -> FilmFull | None:
         """Return a film instance in accordance with ID given."""
 
-        film = await cache_service._get_single_object(film_id)
+        film = await self.redis_service._get_single_object(film_id)
 
         if not film:
-            film = await search_service._get_single_object(film_id)
+            film = await self.es_service._get_single_object(film_id)
 
             if not film:
                 return None
 
-            await cache_service._put_single_object(film)
+            await self.redis_service._put_single_object(film)
 
         return film
 
+    async def export_films(self) -> AsyncIterator[bytes]:
+        """
+        Yield all films as NDJSON, one chunk per batch of documents.
+
+        Only one batch is held in memory, the next batch is fetched
+        when the previous chunk has been sent.
+        """
+
+        batches = self.es_service._iter_all_objects(
+            FILMS_EXPORT_SOURCE, settings.EXPORT_BATCH_SIZE
+        )
+
+        try:
+            async for films in batches:
+                yield b''.join(
+                    orjson.dumps(film) + b'\n' for film in films
+                )
+        finally:
+            await batches.aclose()
+
+    async def get_by_ids(
+        self,
+        film_ids: list[str],
+        use_cache: bool = True
+    ) -> list[FilmFull | None]:
+        """
+        Return film instances in the order of the IDs given,
+        None for films that do not exist. Without use_cache all of
+        them are fetched and cached again.
+        """
+
+        films = {}
+        if use_cache:
+            films = await self.redis_service._get_many_objects(film_ids)
+        missing_ids = [
+            film_id for film_id in film_ids if film_id not in films
+        ]
+
+        if missing_ids:
+            found = await self.es_service._get_many_objects(missing_ids)
+
+            if found:
+                await self.redis_service._put_many_objects(
+                    list(found.values())
+                )
+
+            films.update(found)
+
+        return [films.get(film_id) for film_id in film_ids]
+
 
 @lru_cache()
 def get_film_service(
-        redis: RedisService = Depends(get_redis),
-        elastic: ElasticService = Depends(get_elastic),
+        redis: Redis = Depends(get_redis),
+        elastic: AsyncElasticsearch = Depends(get_elastic),
 ) -> FilmService:
-    return FilmService(redis, elastic, INDEX_NAME)
+    return FilmService(
+        RedisService(redis), ElasticService(elastic, INDEX_NAME), INDEX_NAME
+    )
@@ -1,18 +1,19 @@
 import json
-import logging
 from functools import lru_cache
 
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
 
 from core.config import settings
-from db.elastic import AsyncSearchAbstract, elastic, get_elastic
-from db.redis import AsyncCacheAbstract, get_redis, redis
+from core.metrics import instrument
+from db.elastic import AsyncSearchAbstract, get_elastic
+from db.redis import AsyncCacheAbstract, get_redis
 from models.genre import Genre
 from redis.asyncio import Redis
 
 GENRE_CACHE_EXPIRE_IN_SECONDS = settings.REDIS_CACHE_EXPIRES_IN_SECONDS
 INDEX_NAME = settings.ES_GENRE_INDEX
+GENRES_SOURCE = list(Genre.__fields__)
 
 
 class ElasticService(AsyncSearchAbstract):
@@ -32,6 +33,21 @@ class ElasticService(AsyncSearchAbstract):
 
         return Genre(**doc['_source'])
 
+    async def _get_many_objects(
+        self,
+        genre_ids: list[str]
+    ) -> dict[str, Genre]:
+        """Request to ElasticSearch to get data of several genres."""
+
+        response = await self.elastic.mget(
+            index=self.index_name, ids=genre_ids
+        )
+
+        return {
+            doc['_id']: Genre(**doc['_source'])
+            for doc in response['docs'] if doc.get('found')
+        }
+
     async def _get_list_of_objects(
         self,
         search_query: dict
@@ -59,6 +75,7 @@ class ElasticService(AsyncSearchAbstract):
         return total, [Genre(**genre) for genre in genres]
 
 
+@instrument('redis')
 class RedisService(AsyncCacheAbstract):
     """Class to represent cache service with Redis."""
 
@@ -76,6 +93,21 @@ class RedisService(AsyncCacheAbstract):
 
         return Genre.parse_raw(data)
 
+    async def _get_many_objects(
+        self,
+        genre_ids: list[str]
+    ) -> dict[str, Genre]:
+        """Request to Redis to get data of several genres with one MGET."""
+
+        data = await self.redis.mget(
+            [f'genre:{genre_id}' for genre_id in genre_ids]
+        )
+
+        return {
+            genre_id: Genre.parse_raw(item)
+            for genre_id, item in zip(genre_ids, data) if item
+        }
+
     async def _get_list_of_objects(
         self,
         page: int,
@@ -106,6 +138,18 @@ class RedisService(AsyncCacheAbstract):
             GENRE_CACHE_EXPIRE_IN_SECONDS,
         )
 
+    async def _put_many_objects(self, genres: list[Genre]) -> None:
+        """Put data of several genres into the Redis cache at once."""
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for genre in genres:
+                pipe.set(
+                    f'genre:{str(genre.id)}',
+                    genre.json(),
+                    GENRE_CACHE_EXPIRE_IN_SECONDS
+                )
+            await pipe.execute()
+
     async def _put_list_of_objects(
         self,
         page: int,
@@ -127,10 +171,6 @@ class RedisService(AsyncCacheAbstract):
         )
 
 
-cache_service = RedisService(redis)
-search_service = ElasticService(elastic, INDEX_NAME)
-
-
 class GenreService:
     """Class to represent genres logic."""
 
@@ -147,48 +187,73 @@ class GenreService:
     async def get_by_id(self, genre_id: str) -> Genre | None:
         """Returns data about the genre by its id."""
 
-        genre = await cache_service._get_single_object(genre_id)
+        genre = await self.redis._get_single_object(genre_id)
 
         if not genre:
-            genre = await search_service._get_single_object(genre_id)
+            genre = await self.elastic._get_single_object(genre_id)
 
             if not genre:
                 return None
 
-            await cache_service._put_single_object(genre)
+            await self.redis._put_single_object(genre)
 
         return genre
 
+    async def get_by_ids(self, genre_ids: list[str]) -> list[Genre | None]:
+        """
+        Returns data about the genres in the order of the ids given,
+        None for genres that do not exist.
+        """
+
+        genres = await self.redis._get_many_objects(genre_ids)
+        missing_ids = [
+            genre_id for genre_id in genre_ids if genre_id not in genres
+        ]
+
+        if missing_ids:
+            found = await self.elastic._get_many_objects(missing_ids)
+
+            if found:
+                await self.redis._put_many_objects(list(found.values()))
+
+            genres.update(found)
+
+        return [genres.get(genre_id) for genre_id in genre_ids]
+
     async def get_genre_list(
         self,
         page: int,
-        page_size: int
+        page_size: int,
+        use_cache: bool = True
     ) -> tuple[int, list[Genre]]:
-        """Returns a list of genre data."""
+        """
+        Returns a list of genre data. Without use_cache the list is
+        searched and cached again.
+        """
 
-        total, genre_data = await cache_service._get_list_of_objects(
-            page, page_size
-        )
+        total, genre_data = 0, None
+        if use_cache:
+            total, genre_data = await self.redis._get_list_of_objects(
+                page, page_size
+            )
 
         if not genre_data:
             start_index = (page - 1) * page_size
             query = {
                 "query": {"match_all": {}},
+                "_source": GENRES_SOURCE,
                 "from": start_index,
                 "size": page_size
             }
 
-            try:
-                total, genre_data = await search_service._get_list_of_objects(
-                    query
-                )
-            except Exception as exc:
-                logging.exception('An error occured: %s', exc)
+            total, genre_data = await self.elastic._get_list_of_objects(
+                query
+            )
 
             if not genre_data:
                 return 0, None
 
-            await cache_service._put_list_of_objects(
+            await self.redis._put_list_of_objects(
                 page, page_size, total, genre_data
             )
 
@@ -202,4 +267,6 @@ def get_genre_service(
     elastic: AsyncElasticsearch = Depends(get_elastic),
     redis: Redis = Depends(get_redis)
 ) -> GenreService:
-    return GenreService(elastic, redis, INDEX_NAME)
+    return GenreService(
+        ElasticService(elastic, INDEX_NAME), RedisService(redis), INDEX_NAME
+    )
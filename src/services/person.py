@@ -1,21 +1,31 @@
 import json
-import logging
 from functools import lru_cache
 
 from elasticsearch import AsyncElasticsearch, NotFoundError
 from fastapi import Depends
 
 from core.config import settings
-from db.elastic import AsyncSearchAbstract, elastic, get_elastic
-from db.redis import AsyncCacheAbstract, get_redis, redis
+from core.metrics import instrument
+from db.elastic import NOT_COUNTED, AsyncSearchAbstract, get_elastic
+from db.redis import AsyncCacheAbstract, get_redis
 from models.film import FilmPersonRoles, PersonShortFilmInfo
+from models.page import Page
 from models.person import PersonFull
 from redis.asyncio import Redis
-from utils.search_films import get_films, get_roles
+from utils.cursor import encode_cursor, paginate
+from utils.search_films import get_films, get_films_many, get_roles
 
 PERSON_CACHE_EXPIRE_IN_SECONDS = settings.REDIS_CACHE_EXPIRES_IN_SECONDS
 INDEX_NAME = settings.ES_PERSON_INDEX
 
+# The id tiebreaker makes the order total, as search_after requires
+PERSONS_SORT = [
+    {"_score": {"order": "desc"}},
+    {"id": {"order": "asc"}},
+]
+# Films of each person are looked up by name, nothing else is needed
+PERSONS_SOURCE = ['id', 'full_name']
+
 
 class ElasticService(AsyncSearchAbstract):
     """Class to represent search engine with ElasticSearch."""
@@ -28,7 +38,7 @@ class ElasticService(AsyncSearchAbstract):
         """Request to ElasticSearch to get person data."""
 
         try:
-            doc = await self.elastic.get(index=INDEX_NAME, id=person_id)
+            doc = await self.elastic.get(index=self.index_name, id=person_id)
         except NotFoundError:
             return None
 
@@ -47,26 +57,77 @@ class ElasticService(AsyncSearchAbstract):
             ]
         )
 
+    async def _get_many_objects(
+        self,
+        person_ids: list[str]
+    ) -> dict[str, PersonFull]:
+        """
+        Request to ElasticSearch to get data of several persons,
+        with one mget for the persons and one msearch for their films.
+        """
+
+        response = await self.elastic.mget(
+            index=self.index_name, ids=person_ids, source=PERSONS_SOURCE
+        )
+        persons = [
+            doc['_source'] for doc in response['docs'] if doc.get('found')
+        ]
+        films_of_persons = await get_films_many(
+            self.elastic, [person['full_name'] for person in persons]
+        )
+        data = {}
+
+        for person, (_, films) in zip(persons, films_of_persons):
+            films_roles = await get_roles(films, person['full_name'])
+            data[person['id']] = PersonFull(
+                id=person['id'],
+                full_name=person['full_name'],
+                films=[
+                    FilmPersonRoles(
+                        id=film.id,
+                        roles=film.roles,
+                    ) for film in films_roles
+                ]
+            )
+
+        return data
+
     async def _get_list_of_objects(
         self,
-        query: str,
+        query: dict,
+        page: int,
         page_size: int,
-        from_page: int
-    ) -> tuple[int, list[PersonFull]]:
+        search_after: list | None = None,
+        track_total_hits: int | bool = True
+    ) -> Page:
         """
         Request to ElasticSearch to get a list of persons found
         in accordance with the query.
         """
 
+        search_query = paginate(
+            {
+                "query": query,
+                "sort": PERSONS_SORT,
+                "_source": PERSONS_SOURCE,
+                "size": page_size,
+                "track_total_hits": track_total_hits
+            },
+            page, page_size, search_after
+        )
         response = await self.elastic.search(
-            index=self.index_name, query=query, from_=from_page,
-            size=page_size
+            index=self.index_name, body=search_query
         )
-        total = response['hits']['total']['value']
+        # Hits are not counted at all when track_total_hits is false
+        total = response['hits'].get('total', NOT_COUNTED)
         results = response['hits']['hits']
 
         if not results:
-            return total, []
+            return Page(total['value'], [])
+
+        cursor = None
+        if len(results) == page_size:
+            cursor = encode_cursor(results[-1]['sort'])
 
         data = []
 
@@ -87,9 +148,34 @@ class ElasticService(AsyncSearchAbstract):
                 )
             )
 
-        return total, data
+        return Page(
+            total['value'], data, cursor, total['relation'] == 'gte'
+        )
+
+    async def _get_person_films(
+        self,
+        person_id: str
+    ) -> tuple[int, list[PersonShortFilmInfo]]:
+        """Request to ElasticSearch to get films of the person."""
+
+        try:
+            doc = await self.elastic.get(index=self.index_name, id=person_id)
+        except NotFoundError:
+            return 0, []
+
+        person = doc['_source']
+        total, films = await get_films(self.elastic, person['full_name'])
+
+        return total, [
+            PersonShortFilmInfo(
+                id=film['id'],
+                title=film['title'],
+                imdb_rating=film['imdb_rating'],
+            ) for film in films
+        ]
 
 
+@instrument('redis')
 class RedisService(AsyncCacheAbstract):
     """Class to represent cache service with Redis."""
 
@@ -107,19 +193,49 @@ class RedisService(AsyncCacheAbstract):
 
         return PersonFull.parse_raw(data)
 
+    async def _get_many_objects(
+        self,
+        person_ids: list[str]
+    ) -> dict[str, PersonFull]:
+        """Request to Redis to get data of several persons with one MGET."""
+
+        data = await self.redis.mget(
+            [f'person:{person_id}' for person_id in person_ids]
+        )
+
+        return {
+            person_id: PersonFull.parse_raw(item)
+            for person_id, item in zip(person_ids, data) if item
+        }
+
+    @staticmethod
+    def _list_cache_key(
+        page: int,
+        size: int,
+        query: str = None,
+        cursor: str = None
+    ) -> str:
+        """Return a cache key for a page of persons."""
+
+        if cursor:
+            return f'persons:after:{cursor}:{size}:{query}'
+
+        return f'persons:{page}:{size}:{query}'
+
     async def _get_list_of_objects(
         self,
         page: int,
         size: int,
-        query: str = None
-    ) -> tuple[int, list[PersonFull]]:
+        query: str = None,
+        cursor: str = None
+    ) -> Page:
         """Get person list data from Redis cache."""
 
-        cache_key = f'persons:{page}:{size}:{query}'
+        cache_key = self._list_cache_key(page, size, query, cursor)
         data = await self.redis.get(cache_key)
 
         if not data:
-            return 0, []
+            return Page(0, [])
 
         persons_data = json.loads(data)
         persons = [
@@ -127,7 +243,25 @@ class RedisService(AsyncCacheAbstract):
         ]
         total = persons_data['total']
 
-        return total, persons
+        return Page(
+            total,
+            persons,
+            persons_data.get('cursor'),
+            persons_data.get('total_is_estimate', False)
+        )
+
+    async def _get_total(self, query: str = None) -> tuple[int, bool] | None:
+        """Get the number of persons matching the query from cache."""
+
+        cache_key = f'persons:total:{query}'
+        data = await self.redis.get(cache_key)
+
+        if not data:
+            return None
+
+        total = json.loads(data)
+
+        return total['value'], total['is_estimate']
 
     async def _put_single_object(self, person: PersonFull) -> None:
         """Put person data into the Redis cache."""
@@ -140,20 +274,34 @@ class RedisService(AsyncCacheAbstract):
             PERSON_CACHE_EXPIRE_IN_SECONDS,
         )
 
+    async def _put_many_objects(self, persons: list[PersonFull]) -> None:
+        """Put data of several persons into the Redis cache at once."""
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for person in persons:
+                pipe.set(
+                    f'person:{str(person.id)}',
+                    person.json(),
+                    PERSON_CACHE_EXPIRE_IN_SECONDS
+                )
+            await pipe.execute()
+
     async def _put_list_of_objects(
         self,
         page: int,
         size: int,
-        total: int,
-        persons: list[PersonFull],
+        persons_page: Page,
         query: str = None,
+        cursor: str = None
     ) -> None:
         """Put person list data into Redis cache."""
 
-        cache_key = f'persons:{page}:{size}:{query}'
+        cache_key = self._list_cache_key(page, size, query, cursor)
         data = {
-            'total': total,
-            'persons': [person.json() for person in persons]
+            'total': persons_page.total,
+            'persons': [person.json() for person in persons_page.results],
+            'cursor': persons_page.cursor,
+            'total_is_estimate': persons_page.total_is_estimate
         }
         json_str = json.dumps(data)
 
@@ -163,6 +311,23 @@ class RedisService(AsyncCacheAbstract):
             PERSON_CACHE_EXPIRE_IN_SECONDS
         )
 
+    async def _put_total(
+        self,
+        total: int,
+        is_estimate: bool,
+        query: str = None
+    ) -> None:
+        """Put the number of persons matching the query into cache."""
+
+        cache_key = f'persons:total:{query}'
+        json_str = json.dumps({'value': total, 'is_estimate': is_estimate})
+
+        await self.redis.set(
+            cache_key,
+            json_str,
+            PERSON_CACHE_EXPIRE_IN_SECONDS
+        )
+
     async def _person_films_from_cache(
         self,
         person_id: str
@@ -206,17 +371,13 @@ class RedisService(AsyncCacheAbstract):
         )
 
 
-search_service = ElasticService(elastic, INDEX_NAME)
-cache_service = RedisService(redis)
-
-
 class PersonService:
     """Class to represent persons logic."""
 
     def __init__(
         self,
-        elastic: AsyncElasticsearch,
-        redis: Redis,
+        elastic: AsyncSearchAbstract,
+        redis: AsyncCacheAbstract,
         index_name: str
     ) -> None:
         self.elastic = elastic
@@ -226,31 +387,57 @@ class PersonService:
     async def get_by_id(self, person_id: str) -> PersonFull | None:
         """Returns data about the person by his id."""
 
-        person = await cache_service._get_single_object(person_id)
+        person = await self.redis._get_single_object(person_id)
 
         if not person:
-            person = await search_service._get_single_object(person_id)
+            person = await self.elastic._get_single_object(person_id)
 
             if not person:
                 return None
 
-            await cache_service._put_single_object(person)
+            await self.redis._put_single_object(person)
 
         return person
 
+    async def get_by_ids(
+        self,
+        person_ids: list[str]
+    ) -> list[PersonFull | None]:
+        """
+        Returns data about the persons in the order of the ids given,
+        None for persons that do not exist.
+        """
+
+        persons = await self.redis._get_many_objects(person_ids)
+        missing_ids = [
+            person_id for person_id in person_ids if person_id not in persons
+        ]
+
+        if missing_ids:
+            found = await self.elastic._get_many_objects(missing_ids)
+
+            if found:
+                await self.redis._put_many_objects(list(found.values()))
+
+            persons.update(found)
+
+        return [persons.get(person_id) for person_id in person_ids]
+
     async def get_person_list(
         self,
         page: int,
         page_size: int,
-        search_query: str | None
-    ) -> tuple[int, list[PersonFull]]:
+        search_query: str | None,
+        search_after: list | None = None
+    ) -> Page:
         """Returns a list of person data with filtering and sorting."""
 
-        total, data = await cache_service._get_list_of_objects(
-            page, page_size, search_query
+        cursor = encode_cursor(search_after) if search_after else None
+        persons_page = await self.redis._get_list_of_objects(
+            page, page_size, search_query, cursor
         )
 
-        if not data:
+        if not persons_page.results:
             if search_query:
                 query = {
                     "match_phrase_prefix": {"full_name": search_query}
@@ -258,22 +445,41 @@ class PersonService:
             else:
                 query = {"match_all": {}}
 
-            from_page = (page - 1) * page_size
+            # Hits are counted only once per query, later pages
+            # take the total from cache
+            cached_total = await self.redis._get_total(search_query)
 
-            try:
-                total, data = await search_service._get_list_of_objects(
-                    query=query, page_size=page_size, from_page=from_page
+            persons_page = await self.elastic._get_list_of_objects(
+                query=query, page=page, page_size=page_size,
+                search_after=search_after,
+                track_total_hits=(
+                    False if cached_total
+                    else settings.ELASTIC_TRACK_TOTAL_HITS
                 )
-            except Exception as exc:
-                logging.exception('An error occured: %s', exc)
-
-            await cache_service._put_list_of_objects(
-                page, page_size, total, data, search_query
             )
 
-            return total, data
+            if cached_total:
+                total, is_estimate = cached_total
+                persons_page = persons_page._replace(
+                    total=total, total_is_estimate=is_estimate
+                )
+
+            # Empty pages are not cached, they are read as a miss anyway
+            if not persons_page.results:
+                return persons_page
+
+            if not cached_total:
+                await self.redis._put_total(
+                    persons_page.total,
+                    persons_page.total_is_estimate,
+                    search_query
+                )
+
+            await self.redis._put_list_of_objects(
+                page, page_size, persons_page, search_query, cursor
+            )
 
-        return total, data
+        return persons_page
 
     async def get_person_films_list(
         self,
@@ -281,29 +487,19 @@ class PersonService:
     ) -> tuple[int, list[PersonShortFilmInfo]]:
         """Data about films in which the person took part."""
 
-        total, films_data = await cache_service._person_films_from_cache(
+        total, films_data = await self.redis._person_films_from_cache(
             person_id
         )
 
         if not films_data:
-            try:
-                doc = await self.elastic.get(index=INDEX_NAME, id=person_id)
-            except NotFoundError:
-                return 0, []
-
-            person = doc['_source']
-            total, films = await get_films(self.elastic, person['full_name'])
-            films_data = []
+            total, films_data = await self.elastic._get_person_films(
+                person_id
+            )
 
-            for film in films:
-                obj = PersonShortFilmInfo(
-                    id=film['id'],
-                    title=film['title'],
-                    imdb_rating=film['imdb_rating'],
-                )
-                films_data.append(obj)
+            if not films_data:
+                return 0, []
 
-            await cache_service._put_person_films_to_cache(
+            await self.redis._put_person_films_to_cache(
                 person_id, total, films_data
             )
 
@@ -315,4 +511,6 @@ def get_person_service(
     elastic: AsyncElasticsearch = Depends(get_elastic),
     redis: Redis = Depends(get_redis)
 ) -> PersonService:
-    return PersonService(elastic, redis, INDEX_NAME)
+    return PersonService(
+        ElasticService(elastic, INDEX_NAME), RedisService(redis), INDEX_NAME
+    )
@@ -0,0 +1,132 @@
+import json
+import logging
+from functools import lru_cache
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import Depends
+
+from core.config import settings
+from db.elastic import get_elastic
+from db.redis import get_redis
+from models.suggest import Suggestion, Suggestions
+from redis.asyncio import Redis
+
+SUGGEST_CACHE_EXPIRE_IN_SECONDS = settings.SUGGEST_CACHE_EXPIRES_IN_SECONDS
+
+# Suggested fields of each index and the field used as the label
+SUGGEST_FIELDS = {
+    'films': (settings.ES_MOVIE_INDEX, 'title_suggest', 'title'),
+    'persons': (settings.ES_PERSON_INDEX, 'full_name_suggest', 'full_name'),
+}
+
+
+class SuggestService:
+    """Class to represent type-ahead suggestions logic."""
+
+    def __init__(self, redis: Redis, elastic: AsyncElasticsearch) -> None:
+        self.redis = redis
+        self.elastic = elastic
+
+    async def _suggestions_from_cache(
+        self,
+        prefix: str,
+        size: int
+    ) -> Suggestions | None:
+        """Get suggestions for the prefix from Redis cache."""
+
+        data = await self.redis.get(f'suggest:{size}:{prefix}')
+
+        if not data:
+            return None
+
+        return Suggestions.parse_raw(data)
+
+    async def _put_suggestions_to_cache(
+        self,
+        prefix: str,
+        size: int,
+        suggestions: Suggestions
+    ) -> None:
+        """Put suggestions for the prefix into Redis cache."""
+
+        await self.redis.set(
+            f'suggest:{size}:{prefix}',
+            suggestions.json(),
+            SUGGEST_CACHE_EXPIRE_IN_SECONDS
+        )
+
+    async def _suggest(
+        self,
+        prefix: str,
+        size: int
+    ) -> tuple[Suggestions, bool]:
+        """
+        Request completion suggestions for films and persons
+        from ElasticSearch with one msearch.
+        Return the suggestions and whether every index answered.
+        """
+
+        searches = []
+        for index, field, label in SUGGEST_FIELDS.values():
+            searches.append({"index": index})
+            searches.append({
+                "_source": ["id", label],
+                "suggest": {
+                    "suggestions": {
+                        "prefix": prefix,
+                        "completion": {
+                            "field": field,
+                            "size": size,
+                            "skip_duplicates": True
+                        }
+                    }
+                }
+            })
+
+        response = await self.elastic.msearch(searches=searches)
+        suggestions = {}
+        complete = True
+
+        for (name, (_, _, label)), result in zip(
+            SUGGEST_FIELDS.items(), response['responses']
+        ):
+            # Indices without the suggester field answer with an error
+            if 'error' in result:
+                logging.warning(
+                    'No %s suggestions: %s', name, json.dumps(result['error'])
+                )
+                suggestions[name] = []
+                complete = False
+                continue
+
+            options = result['suggest']['suggestions'][0]['options']
+            suggestions[name] = [
+                Suggestion(
+                    id=option['_source']['id'],
+                    label=option['_source'][label]
+                ) for option in options
+            ]
+
+        return Suggestions(**suggestions), complete
+
+    async def get_suggestions(self, prefix: str, size: int) -> Suggestions:
+        """Return films and persons suggested for the typed prefix."""
+
+        prefix = ' '.join(prefix.lower().split())
+        suggestions = await self._suggestions_from_cache(prefix, size)
+
+        if not suggestions:
+            suggestions, complete = await self._suggest(prefix, size)
+            # Not cached if an index failed, e.g. while it is reindexed
+            if complete:
+                await self._put_suggestions_to_cache(prefix, size, suggestions)
+
+        return suggestions
+
+
+@lru_cache()
+def get_suggest_service(
+        redis: Redis = Depends(get_redis),
+        elastic: AsyncElasticsearch = Depends(get_elastic),
+) -> SuggestService:
+    return SuggestService(redis, elastic)
@@ -0,0 +1,242 @@
+"""Warm-up of the services cache with the most requested pages.
+
+After a deploy or a Redis flush every first request of a page would
+search Elasticsearch. The warm-up searches the pages requested most
+ahead of them: the first pages of the film list, of every genre and
+the genre list, and the film details requested most lately.
+
+A warm-up runs when a worker starts and whenever the ETL announces
+loaded data on WARMUP_CHANNEL, at most once per WARMUP_INTERVAL for
+all the workers. Data announced during the interval is warmed up once
+it ends, unless a warm-up of another worker started after the data was
+announced. It searches the pages again even if they are cached, so they
+carry the data just loaded and stay cached for another TTL.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from typing import Awaitable
+
+from elasticsearch import AsyncElasticsearch
+from fastapi import Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core import metrics
+from core.config import settings
+from services.film import FilmService, get_film_service
+from services.genre import GenreService, get_genre_service
+
+WARMUP_LOCK_KEY = 'warmup:lock'
+# Genres requested to list the first pages of each of them
+GENRES_SIZE = 100
+
+
+def hot_films_key(day: date) -> str:
+    return f'hot:films:{day:%Y%m%d}'
+
+
+async def count_film_request(film_id: str, request: Request) -> None:
+    """
+    Count a sample of film detail requests by day, in the HTTP layer
+    Redis, to tell the films requested most.
+    """
+
+    if random.random() >= settings.HOT_KEYS_SAMPLE_RATE:
+        return
+
+    key = hot_films_key(date.today())
+    redis = request.state.response_cache
+
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zincrby(key, 1, film_id)
+            pipe.expire(key, int(timedelta(days=2).total_seconds()))
+            await pipe.execute()
+    except RedisError as exc:
+        logging.warning('Failed to count a film request: %s', exc)
+
+
+async def get_hot_films(redis: Redis, count: int) -> list[str]:
+    """Return ids of the films requested most today and yesterday."""
+
+    today = date.today()
+    key = 'hot:films'
+
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zunionstore(
+            key, [hot_films_key(today), hot_films_key(today - timedelta(1))]
+        )
+        pipe.zrevrange(key, 0, count - 1)
+        pipe.delete(key)
+        _, film_ids, _ = await pipe.execute()
+
+    return [film_id.decode() for film_id in film_ids]
+
+
+class CacheWarmer:
+    """Searches the most requested pages and caches them again."""
+
+    def __init__(
+        self,
+        film_service: FilmService,
+        genre_service: GenreService,
+        response_cache: Redis
+    ) -> None:
+        self.film_service = film_service
+        self.genre_service = genre_service
+        self.response_cache = response_cache
+        self._semaphore = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+
+    async def _warm(self, page: str, fetch: Awaitable) -> None:
+        """Run one search, a failed one is logged and skipped."""
+
+        async with self._semaphore:
+            try:
+                await fetch
+            except Exception as exc:
+                logging.warning('Failed to warm up %s: %s', page, exc)
+                metrics.WARMUP_PAGES.labels('failed').inc()
+            else:
+                metrics.WARMUP_PAGES.labels('warmed').inc()
+
+    def _film_pages(self, genre: str | None = None) -> list[Awaitable]:
+        pages = (
+            settings.WARMUP_GENRE_PAGES if genre else
+            settings.WARMUP_FILM_PAGES
+        )
+
+        return [
+            self._warm(
+                f'films page {page} of genre {genre}',
+                self.film_service.get_films(
+                    page, settings.WARMUP_FILMS_PAGE_SIZE, genre,
+                    use_cache=False
+                )
+            )
+            for page in range(1, pages + 1)
+        ]
+
+    async def _hot_films(self) -> list[Awaitable]:
+        try:
+            film_ids = await get_hot_films(
+                self.response_cache, settings.WARMUP_HOT_FILMS
+            )
+        except RedisError as exc:
+            logging.warning('Failed to read the hot films: %s', exc)
+            return []
+
+        batch = settings.WARMUP_FILMS_BATCH_SIZE
+
+        return [
+            self._warm(
+                f'{len(film_ids[i:i + batch])} hot films',
+                self.film_service.get_by_ids(
+                    film_ids[i:i + batch], use_cache=False
+                )
+            )
+            for i in range(0, len(film_ids), batch)
+        ]
+
+    async def warm(self) -> None:
+        """Warm the pages up, WARMUP_CONCURRENCY searches at a time."""
+
+        start = time.perf_counter()
+        try:
+            _, genres = await self.genre_service.get_genre_list(
+                1, GENRES_SIZE
+            )
+        except Exception as exc:
+            logging.warning('Failed to list genres to warm up: %s', exc)
+            genres = None
+
+        await asyncio.gather(
+            self._warm(
+                'genre list',
+                self.genre_service.get_genre_list(
+                    1, settings.WARMUP_GENRES_PAGE_SIZE, use_cache=False
+                )
+            ),
+            *self._film_pages(),
+            *(
+                page
+                for genre in genres or []
+                for page in self._film_pages(str(genre.id))
+            ),
+            *await self._hot_films(),
+        )
+
+        logging.info(
+            'Cache warmed up in %.1f s', time.perf_counter() - start
+        )
+
+    async def acquire(self) -> bool:
+        """
+        Take the turn of the workers to warm up, the turn is not given
+        back, so that they warm up once per WARMUP_INTERVAL. The turn
+        holds the time the warm-up started.
+        """
+
+        return bool(await self.response_cache.set(
+            WARMUP_LOCK_KEY, time.time(), ex=settings.WARMUP_INTERVAL, nx=True
+        ))
+
+    async def started_since(self, since: float) -> bool:
+        """Check whether the warm-up of the current turn started since."""
+
+        started = await self.response_cache.get(WARMUP_LOCK_KEY)
+
+        return started is not None and float(started) >= since
+
+
+def load_time(message: dict) -> float:
+    """Return the time of the load the ETL announced, as it sent it."""
+
+    try:
+        return float(message['data'])
+    except ValueError:
+        return time.time()
+
+
+async def run_warmups(
+    redis: Redis, response_cache: Redis, elastic: AsyncElasticsearch
+) -> None:
+    """
+    Warm up on start, then whenever the ETL loads data, for as long
+    as the worker runs.
+    """
+
+    warmer = CacheWarmer(
+        get_film_service(redis, elastic),
+        get_genre_service(elastic, redis),
+        response_cache,
+    )
+
+    # Time of the last load not warmed up yet, on start any warm-up of
+    # the current turn will do
+    loaded_at: float | None = 0.0
+
+    async with response_cache.pubsub(ignore_subscribe_messages=True) as sub:
+        while True:
+            try:
+                if not sub.subscribed:
+                    await sub.subscribe(settings.WARMUP_CHANNEL)
+                if loaded_at is not None:
+                    if await warmer.acquire():
+                        loaded_at = None
+                        await warmer.warm()
+                    elif await warmer.started_since(loaded_at):
+                        loaded_at = None
+                # Polled, a blocking read would hit the socket timeout.
+                # While the turn is taken, the load waits for the next
+                message = await sub.get_message(timeout=1.0)
+                if message is not None:
+                    loaded_at = load_time(message)
+            except RedisError as exc:
+                logging.warning('Cache warm-up paused: %s', exc)
+                await asyncio.sleep(settings.WARMUP_INTERVAL)
+                if loaded_at is None:
+                    loaded_at = 0.0
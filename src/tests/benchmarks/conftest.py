@@ -0,0 +1,46 @@
+"""
+Benchmarks of the API internals, run from the src directory:
+
+    pytest tests/benchmarks --benchmark-autosave
+    pytest tests/benchmarks --benchmark-compare \
+        --benchmark-compare-fail=median:15%
+
+Baselines are stored in src/tests/benchmarks/.benchmarks.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+# Settings the API modules need on import, the environment
+# and .env take precedence
+for name, value in {
+    'PROJECT_NAME': 'movies',
+    'REDIS_HOST': 'localhost',
+    'REDIS_PORT': '6379',
+    'ELASTIC_SCHEME': 'http',
+    'ELASTIC_HOST': 'localhost',
+    'ELASTIC_PORT': '9200',
+    'ES_MOVIE_INDEX': 'movies',
+    'ES_GENRE_INDEX': 'genres',
+    'ES_PERSON_INDEX': 'persons',
+    'SECRET_KEY': 'benchmark-secret',
+}.items():
+    os.environ.setdefault(name, value)
+
+BENCHMARK_STORAGE = os.path.join(os.path.dirname(__file__), '.benchmarks')
+
+
+def pytest_configure(config):
+    """Keep baselines next to the benchmarks."""
+
+    if config.getoption('benchmark_storage', None) == 'file://./.benchmarks':
+        config.option.benchmark_storage = f'file://{BENCHMARK_STORAGE}'
+
+
+@pytest.fixture
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -0,0 +1,129 @@
+import itertools
+import time
+import uuid
+
+import jwt
+import pytest
+
+from core.config import settings
+from services.auth import InvalidToken, TokenVerifier
+
+
+class DenylistRedis:
+    """The denylist of the auth Redis database, kept in memory."""
+
+    def __init__(self) -> None:
+        self.keys = set()
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.keys)
+
+
+def make_token(roles: list[str] | None = None, expires_in: int = 900) -> str:
+    """Return an access token as the auth service issues it."""
+
+    now = int(time.time())
+    claims = {
+        'iat': now,
+        'nbf': now,
+        'jti': str(uuid.uuid4()),
+        'exp': now + expires_in,
+        'sub': str(uuid.uuid4()),
+        'type': 'access',
+        'fresh': False,
+        'sid': str(uuid.uuid4()),
+    }
+    if roles is not None:
+        claims['roles'] = roles
+
+    return jwt.encode(
+        claims, settings.AUTH_SECRET_KEY, settings.AUTH_JWT_ALGORITHMS[0]
+    )
+
+
+@pytest.fixture
+def redis() -> DenylistRedis:
+    return DenylistRedis()
+
+
+@pytest.fixture
+def verifier(redis: DenylistRedis) -> TokenVerifier:
+    return TokenVerifier(redis)
+
+
+# Verifications per round, so that the event loop overhead of
+# a round does not hide the time of one verification
+BATCH = 1000
+
+
+def verify_batch(event_loop, verifier: TokenVerifier, tokens) -> dict:
+    async def verify_all():
+        for token in itertools.islice(tokens, BATCH):
+            claims = await verifier.verify(token)
+        return claims
+
+    return event_loop.run_until_complete(verify_all())
+
+
+def test_verify_cached_token(benchmark, event_loop, verifier) -> None:
+    """A client sending the same token, the hot path of gated pages."""
+
+    token = make_token(['subscriber'])
+
+    claims = benchmark(
+        verify_batch, event_loop, verifier, itertools.repeat(token)
+    )
+
+    assert claims['roles'] == ['subscriber']
+
+
+@pytest.mark.parametrize('clients', [100, 10000])
+def test_verify_new_tokens(
+    benchmark, event_loop, verifier, clients: int
+) -> None:
+    """Clients taking turns, every token is decoded once per round."""
+
+    tokens = itertools.cycle([make_token() for _ in range(clients)])
+
+    def verify_uncached():
+        # Forget previous rounds, every token is decoded
+        verifier._claims._data.clear()
+        verifier._revocations._data.clear()
+        return verify_batch(event_loop, verifier, tokens)
+
+    assert benchmark(verify_uncached)['type'] == 'access'
+
+
+def test_decode_without_cache(benchmark) -> None:
+    """Reference of verifying the signature on every request."""
+
+    token = make_token()
+
+    def decode_batch():
+        for _ in range(BATCH):
+            claims = jwt.decode(
+                token, settings.AUTH_SECRET_KEY,
+                algorithms=settings.AUTH_JWT_ALGORITHMS,
+            )
+        return claims
+
+    claims = benchmark(decode_batch)
+
+    assert claims['type'] == 'access'
+
+
+def test_revoked_token_is_rejected(event_loop, verifier, redis) -> None:
+    token = make_token()
+    claims = event_loop.run_until_complete(verifier.verify(token))
+    redis.keys.add(f'denylist:{claims["jti"]}')
+    verifier._revocations.pop(claims['jti'])
+
+    with pytest.raises(InvalidToken):
+        event_loop.run_until_complete(verifier.verify(token))
+
+
+def test_expired_token_is_rejected(event_loop, verifier) -> None:
+    with pytest.raises(InvalidToken):
+        event_loop.run_until_complete(
+            verifier.verify(make_token(expires_in=-1))
+        )
@@ -8,10 +8,14 @@ from tests.functional.utils import models
 def make_get_request(session_client: aiohttp.ClientSession) -> callable:
     """Send get request to api endpoint and return the response."""
 
-    async def inner(url: str, params: dict = {}) -> models.HTTPResponse:
+    async def inner(
+        url: str, params: dict = {}, headers: dict = {}
+    ) -> models.HTTPResponse:
         """Function logic."""
 
-        async with session_client.get(url=url, params=params) as response:
+        async with session_client.get(
+            url=url, params=params, headers=headers
+        ) as response:
             if response.content_type == 'application/json':
                 body = await response.json()
             else:
@@ -19,7 +23,30 @@ def make_get_request(session_client: aiohttp.ClientSession) -> callable:
             status = response.status
 
             return models.HTTPResponse(
-                body=body, status=status
+                body=body,
+                status=status,
+                headers={
+                    name.lower(): value
+                    for name, value in response.headers.items()
+                }
             )
 
     return inner
+
+
+@pytest.fixture
+def make_post_request(session_client: aiohttp.ClientSession) -> callable:
+    """Send post request with a JSON body and return the response."""
+
+    async def inner(url: str, data: dict) -> models.HTTPResponse:
+        """Function logic."""
+
+        async with session_client.post(url=url, json=data) as response:
+            if response.content_type == 'application/json':
+                body = await response.json()
+            else:
+                body = await response.text()
+
+            return models.HTTPResponse(body=body, status=response.status)
+
+    return inner
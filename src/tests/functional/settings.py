@@ -6,6 +6,7 @@ class TestSettings(BaseSettings):
     redis_host: str = Field('localhost')
     redis_port: str = Field(6379)
     service_url: str = Field('http://localhost:8000/api/v1/')
+    nginx_url: str = Field('http://localhost:80/api/v1/')
     es_movie_index: str = 'movies'
     es_person_index: str = 'persons'
     es_genre_index: str = 'genres'
@@ -0,0 +1,50 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_film_batch_response(
+    es_write_data: callable,
+    make_post_request: callable
+) -> None:
+    """
+    Sends a request to the film batch API endpoint with existing
+    and missing ids and validates the order of the results.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    missing_id = '111a11a1-1111-111a-111a-11aa1111a1aa'
+    film_ids = [es_data[2]['id'], missing_id, es_data[0]['id']]
+
+    url = test_settings.service_url + 'films/batch'
+    response = await make_post_request(url, {'ids': film_ids})
+    body, status = response.body, response.status
+
+    assert status == HTTPStatus.OK
+    assert [film['id'] for film in body['results']] == [
+        es_data[2]['id'], es_data[0]['id']
+    ]
+    assert body['not_found'] == [missing_id]
+
+
+async def test_film_batch_invalid_request(make_post_request: callable):
+    """
+    Sends a request to the film batch API endpoint with no ids
+    and validates the given response.
+    """
+
+    url = test_settings.service_url + 'films/batch'
+    response = await make_post_request(url, {'ids': []})
+
+    assert response.status == HTTPStatus.BAD_REQUEST
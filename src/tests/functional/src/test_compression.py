@@ -0,0 +1,44 @@
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.mark.parametrize(
+    'accept_encoding, expected_encoding',
+    [
+        ('gzip', 'gzip'),
+        ('br, gzip', 'br'),
+        ('identity', None),
+    ]
+)
+async def test_film_list_compression(
+    es_write_data: callable,
+    make_get_request: callable,
+    accept_encoding: str,
+    expected_encoding: str | None
+) -> None:
+    """
+    Sends a request for a large film list page with the encodings
+    given and validates the encoding of the response.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    url = test_settings.service_url + 'films/'
+    response = await make_get_request(
+        url,
+        {'page_size': 50},
+        headers={'Accept-Encoding': accept_encoding}
+    )
+
+    assert len(response.body['results']) == 50
+    assert response.headers.get('content-encoding') == expected_encoding
+    assert 'Accept-Encoding' in response.headers['vary']
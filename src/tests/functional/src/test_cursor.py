@@ -0,0 +1,142 @@
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+import redis.asyncio as redis
+from elasticsearch import AsyncElasticsearch
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+# index.max_result_window of the tests, pages past it are only reached
+# by following the next links
+RESULT_WINDOW = 20
+PAGE_SIZE = 10
+
+
+async def follow_next(
+    make_get_request: callable, url: str, params: dict
+) -> list[dict]:
+    """Request the page and the following ones, return their results."""
+
+    results = []
+
+    while True:
+        response = await make_get_request(url, params)
+        assert response.status == HTTPStatus.OK
+
+        results.extend(response.body['results'])
+        if response.body['next'] is None:
+            return results
+
+        params = dict(parse_qsl(urlsplit(response.body['next']).query))
+
+
+async def walk_past_window(
+    es_client: AsyncElasticsearch,
+    make_get_request: callable,
+    index: str,
+    url: str,
+    params: dict
+) -> list[dict]:
+    """
+    Lower the result window of the index, check that a page past it
+    cannot be requested by number, then page through all results.
+    """
+
+    await es_client.indices.put_settings(
+        index=index, settings={'max_result_window': RESULT_WINDOW}
+    )
+    try:
+        response = await make_get_request(url, {
+            **params,
+            'page_number': RESULT_WINDOW // PAGE_SIZE + 1,
+            'page_size': PAGE_SIZE
+        })
+        assert response.status != HTTPStatus.OK
+
+        return await follow_next(
+            make_get_request, url, {**params, 'page_size': PAGE_SIZE}
+        )
+    finally:
+        await es_client.indices.put_settings(
+            index=index, settings={'max_result_window': None}
+        )
+
+
+@pytest.mark.parametrize('path, params', [
+    ('films/', {}),
+    ('films/', {'genre': '120a21cf-9097-479e-904a-13dd7198c1dd'}),
+    ('films/search', {'query': parametrize.FILM_QUERY_EXIST}),
+])
+async def test_films_cursor_past_window(
+    es_client: AsyncElasticsearch,
+    es_write_data: callable,
+    make_get_request: callable,
+    redis_client: redis.Redis,
+    path: str,
+    params: dict
+) -> None:
+    """
+    Follows the next links of the film lists past the from+size window
+    and validates that every film is listed once.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    results = await walk_past_window(
+        es_client,
+        make_get_request,
+        test_settings.es_movie_index,
+        test_settings.service_url + path,
+        params
+    )
+    film_ids = [film['id'] for film in results]
+
+    assert len(film_ids) == len(set(film_ids))
+    assert set(film_ids) == {film['id'] for film in es_data}
+
+
+async def test_persons_cursor_past_window(
+    es_client: AsyncElasticsearch,
+    es_write_data: callable,
+    make_get_request: callable,
+    redis_client: redis.Redis
+) -> None:
+    """
+    Follows the next links of the person search past the from+size
+    window and validates that every person is listed once.
+    """
+
+    es_data = await es_queries.make_test_es_persons_data(
+        existing_single_query=parametrize.PERSON_SINGLE_QUERY_EXIST,
+        existing_multiple_query=parametrize.PERSON_MULTIPLE_QUERY_EXIST
+    )
+    # More persons than the window holds
+    es_data += await es_queries.make_test_es_persons_data(
+        existing_single_query=parametrize.PERSON_SINGLE_QUERY_EXIST,
+        existing_multiple_query=parametrize.PERSON_MULTIPLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_person_index)
+
+    results = await walk_past_window(
+        es_client,
+        make_get_request,
+        test_settings.es_person_index,
+        test_settings.service_url + 'persons/search',
+        {'query': parametrize.PERSON_MULTIPLE_QUERY_EXIST}
+    )
+    person_ids = [person['id'] for person in results]
+
+    assert len(person_ids) == len(set(person_ids))
+    assert set(person_ids) == {
+        person['id'] for person in es_data
+        if person['full_name'] == parametrize.PERSON_MULTIPLE_QUERY_EXIST
+    }
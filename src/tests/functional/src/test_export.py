@@ -0,0 +1,40 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_film_export(
+    es_write_data: callable,
+    make_get_request: callable
+) -> None:
+    """
+    Sends a request to the film export API endpoint, validates that
+    every film is streamed once and that a repeated export is limited.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    url = test_settings.service_url + 'films/export'
+    headers = {'X-Real-IP': '10.0.0.36'}
+    response = await make_get_request(url, headers=headers)
+    films = [json.loads(line) for line in response.body.splitlines()]
+
+    assert response.status == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert {film['id'] for film in films} == {film['id'] for film in es_data}
+
+    response = await make_get_request(url, headers=headers)
+
+    assert response.status == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['retry-after']) > 0
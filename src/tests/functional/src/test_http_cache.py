@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_film_detail_conditional_get(
+    es_write_data: callable,
+    make_get_request: callable
+) -> None:
+    """
+    Sends a request to the film detail API endpoint, then repeats it
+    with the ETag given and validates the 304 response.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    url = test_settings.service_url + f'films/{es_data[0]["id"]}'
+    response = await make_get_request(url)
+    etag = response.headers['etag']
+
+    assert response.status == HTTPStatus.OK
+    assert response.headers['cache-control'].startswith('public, max-age=')
+
+    response = await make_get_request(url, headers={'If-None-Match': etag})
+
+    assert response.status == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert response.body == ''
+
+
+async def test_not_found_is_not_cacheable(make_get_request: callable):
+    """
+    Sends a request for a missing film and validates that the response
+    carries no caching headers.
+    """
+
+    film_id = '111a11a1-1111-111a-111a-11aa1111a1aa'
+    url = test_settings.service_url + f'films/{film_id}'
+    response = await make_get_request(url)
+
+    assert response.status == HTTPStatus.NOT_FOUND
+    assert 'etag' not in response.headers
+    assert 'cache-control' not in response.headers
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+from urllib.parse import urljoin
+
+import pytest
+import redis.asyncio as redis
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_server_timing_header(
+    es_write_data: callable,
+    make_get_request: callable,
+    redis_client: redis.Redis
+) -> None:
+    """
+    Sends a request to the film detail API endpoint and validates
+    the Server-Timing header of the response. Redis is flushed, so
+    the film is searched in Elasticsearch.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    url = test_settings.service_url + f'films/{es_data[0]["id"]}'
+    response = await make_get_request(url)
+    server_timing = response.headers['server-timing']
+
+    assert response.status == HTTPStatus.OK
+    for span in ('redis;dur=', 'es;dur=', 'total;dur='):
+        assert span in server_timing
+
+
+async def test_prometheus_metrics(make_get_request: callable) -> None:
+    """
+    Sends a request to the genre list API endpoint, then validates
+    that the metrics endpoint reports it by route.
+    """
+
+    await make_get_request(test_settings.service_url + 'genres/')
+
+    url = urljoin(test_settings.service_url, '/metrics')
+    response = await make_get_request(url)
+
+    assert response.status == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'route="/api/v1/genres/"' in response.body
+    assert 'api_cache_lookups_total' in response.body
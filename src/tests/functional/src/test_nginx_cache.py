@@ -0,0 +1,47 @@
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.mark.parametrize(
+    'first_query, second_query',
+    [
+        (
+            {'page_number': 1, 'page_size': 20},
+            {'page_size': 20, 'page_number': 1}
+        ),
+        (
+            {},
+            {'page_number': 1, 'page_size': 20}
+        ),
+    ]
+)
+async def test_film_list_micro_cache(
+    es_write_data: callable,
+    make_get_request: callable,
+    first_query: dict,
+    second_query: dict
+) -> None:
+    """
+    Sends two requests for the same film list page through nginx with
+    query parameters in another order or left to defaults, and checks
+    that the second one is served from the nginx cache.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    url = test_settings.nginx_url + 'films/'
+    first = await make_get_request(url, first_query)
+    second = await make_get_request(url, second_query)
+
+    assert 'x-cache-status' in first.headers
+    assert second.headers['x-cache-status'] == 'HIT'
+    assert second.body == first.body
@@ -0,0 +1,36 @@
+import uuid
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+
+
+pytestmark = pytest.mark.asyncio
+
+SEARCH_LIMIT = 50
+
+
+async def test_search_rate_limit(make_get_request: callable) -> None:
+    """
+    Sends more search requests from one client address than its limit
+    and validates the 429 response, while another address is served.
+    """
+
+    url = test_settings.service_url + 'films/search'
+    headers = {'X-Real-IP': f'test-{uuid.uuid4()}'}
+
+    statuses = [
+        (await make_get_request(url, {'query': 'star'}, headers)).status
+        for _ in range(SEARCH_LIMIT)
+    ]
+    response = await make_get_request(url, {'query': 'star'}, headers)
+
+    assert HTTPStatus.TOO_MANY_REQUESTS not in statuses
+    assert response.status == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['retry-after']) > 0
+
+    headers = {'X-Real-IP': f'test-{uuid.uuid4()}'}
+    response = await make_get_request(url, {'query': 'star'}, headers)
+
+    assert response.status != HTTPStatus.TOO_MANY_REQUESTS
@@ -1,4 +1,5 @@
 import json
+from http import HTTPStatus
 
 import pytest
 import redis.asyncio as redis
@@ -93,6 +94,41 @@ async def test_persons_search_response(
         assert body['prev'] is not None
 
 
+async def test_persons_search_past_the_end(
+    es_write_data: callable,
+    make_get_request: callable,
+    redis_client: redis.Redis
+) -> None:
+    """
+    Sends a request to the person API endpoint with a search query,
+    so its total is cached, then requests a page past the last one
+    and validates the empty page with the cached total.
+    """
+
+    es_data = await es_queries.make_test_es_persons_data(
+        existing_single_query=parametrize.PERSON_SINGLE_QUERY_EXIST,
+        existing_multiple_query=parametrize.PERSON_MULTIPLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_person_index)
+
+    url = test_settings.service_url + 'persons/search'
+    query_data = {
+        'query': parametrize.PERSON_MULTIPLE_QUERY_EXIST,
+        'page_number': 1,
+        'page_size': 10
+    }
+    await make_get_request(url, query_data)
+
+    response = await make_get_request(url, {**query_data, 'page_number': 5})
+    body, status = response.body, response.status
+
+    assert status == HTTPStatus.OK
+    assert body['total'] == 20
+    assert body['total_is_estimate'] is False
+    assert body['results'] == []
+    assert body['next'] is None
+
+
 async def test_films_search_redis_cache(
     redis_client: redis.Redis,
     make_get_request: callable,
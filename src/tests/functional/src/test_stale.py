@@ -0,0 +1,63 @@
+import uuid
+from http import HTTPStatus
+
+import pytest
+import redis.asyncio as redis
+from elasticsearch import AsyncElasticsearch
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, indices, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_stale_response_on_error(
+    es_client: AsyncElasticsearch,
+    es_create_indices: callable,
+    es_write_data: callable,
+    make_get_request: callable,
+    redis_client: redis.Redis
+) -> None:
+    """
+    Sends a request to the film list API endpoint, then repeats it
+    with the movie index deleted and validates that the last good
+    response is sent, while a page never sent fails as it is.
+    """
+
+    es_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_data, test_settings.es_movie_index)
+
+    # Query parameters of their own, so the pages were never kept
+    url = test_settings.service_url + 'films/'
+    params = {'page_size': 10, 'test': str(uuid.uuid4())}
+    missing_params = {'page_size': 10, 'test': str(uuid.uuid4())}
+
+    response = await make_get_request(url, params)
+    assert response.status == HTTPStatus.OK
+    assert 'warning' not in response.headers
+
+    # The services cache would answer without Elasticsearch
+    await redis_client.flushdb()
+    await es_client.indices.delete(index=test_settings.es_movie_index)
+
+    try:
+        stale = await make_get_request(url, params)
+        missing = await make_get_request(url, missing_params)
+    finally:
+        await es_create_indices(
+            test_settings.es_movie_index,
+            indices.index_to_schema[test_settings.es_movie_index]
+        )
+
+    assert stale.status == HTTPStatus.OK
+    assert stale.body == response.body
+    assert stale.headers['warning'].startswith('110')
+    assert int(stale.headers['age']) >= 0
+    assert stale.headers['cache-control'] == 'no-cache'
+
+    assert missing.status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert 'warning' not in missing.headers
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+from tests.functional.utils import es_queries, parametrize
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.mark.parametrize(
+    'query, expected_answer',
+    [
+        (
+            {'query': 'the st'},
+            {'films': [parametrize.FILM_QUERY_EXIST], 'persons': []}
+        ),
+        (
+            {'query': 'Sin'},
+            {'films': [], 'persons': [parametrize.PERSON_SINGLE_QUERY_EXIST]}
+        ),
+        (
+            {'query': 'Not-Exist'},
+            {'films': [], 'persons': []}
+        ),
+    ]
+)
+async def test_suggest_response(
+    es_write_data: callable,
+    make_get_request: callable,
+    query: dict,
+    expected_answer: dict
+) -> None:
+    """
+    Sends a request to the suggest API endpoint with a prefix
+    and validates the suggested labels.
+    """
+
+    es_film_data = await es_queries.make_test_es_movie_data(
+        existing_film_query=parametrize.FILM_QUERY_EXIST,
+        existing_person_query=parametrize.PERSON_SINGLE_QUERY_EXIST
+    )
+    await es_write_data(es_film_data, test_settings.es_movie_index)
+    es_person_data = await es_queries.make_test_es_persons_data(
+        existing_single_query=parametrize.PERSON_SINGLE_QUERY_EXIST,
+        existing_multiple_query=parametrize.PERSON_MULTIPLE_QUERY_EXIST
+    )
+    await es_write_data(es_person_data, test_settings.es_person_index)
+
+    url = test_settings.service_url + 'suggest/'
+    response = await make_get_request(url, query)
+    body, status = response.body, response.status
+
+    assert status == HTTPStatus.OK
+    # Films of the same title are suggested once
+    assert [film['label'] for film in body['films']] == (
+        expected_answer['films']
+    )
+    assert [person['label'] for person in body['persons']] == (
+        expected_answer['persons']
+    )
+
+
+async def test_suggest_invalid_request(make_get_request: callable):
+    """
+    Sends a request to the suggest API endpoint with an empty prefix
+    and validates the given response.
+    """
+
+    url = test_settings.service_url + 'suggest/'
+    response = await make_get_request(url, {'query': ''})
+
+    assert response.status == HTTPStatus.BAD_REQUEST
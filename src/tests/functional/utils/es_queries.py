@@ -22,7 +22,9 @@ async def make_test_es_movie_data(
                 'description': 'Exciting and unusual experience.',
             }
         ],
+        'genre_ids': ['120a21cf-9097-479e-904a-13dd7198c1dd'],
         'title': existing_film_query,
+        'title_suggest': {'input': [existing_film_query], 'weight': 85},
         'description': 'New World',
         'directors': [
             {
@@ -63,9 +65,11 @@ async def make_test_es_persons_data(
     return [{
         'id': str(uuid.uuid4()),
         'full_name': existing_multiple_query,
+        'full_name_suggest': {'input': [existing_multiple_query]},
     } for _ in range(20)] + [{
         'id': '32b50c6b-4907-292f-b652-6ef2ee8b43f8',
         'full_name': existing_single_query,
+        'full_name_suggest': {'input': [existing_single_query]},
     }]
 
 
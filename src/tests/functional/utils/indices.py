@@ -68,6 +68,9 @@ MOVIES_INDEX_SETTINGS = {
                     }
                 }
             },
+            'genre_ids': {
+                'type': 'keyword'
+            },
             'title': {
                 'type': 'text',
                 'analyzer': 'ru_en',
@@ -77,6 +80,9 @@ MOVIES_INDEX_SETTINGS = {
                     }
                 }
             },
+            'title_suggest': {
+                'type': 'completion'
+            },
             'description': {
                 'type': 'text',
                 'analyzer': 'ru_en'
@@ -165,6 +171,9 @@ PERSONS_INDEX_SETTINGS = {
             'full_name': {
                 'type': 'text',
                 'analyzer': 'ru_en'
+            },
+            'full_name_suggest': {
+                'type': 'completion'
             }
         }
     }
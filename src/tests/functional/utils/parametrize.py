@@ -83,6 +83,27 @@ films_by_genre_invalid_parameters = [
             'genre': 1234567890
         },
         HTTPStatus.BAD_REQUEST
+    ),
+    (
+        # [{"a": 1}], not a scalar sort value
+        {
+            'cursor': 'W3siYSI6MX1d'
+        },
+        HTTPStatus.BAD_REQUEST
+    ),
+    (
+        # [8.5], a value short of the film list sort
+        {
+            'cursor': 'WzguNV0'
+        },
+        HTTPStatus.BAD_REQUEST
+    ),
+    (
+        # [8.5, "id", 1], a value over the film list sort
+        {
+            'cursor': 'WzguNSwiaWQiLDFd'
+        },
+        HTTPStatus.BAD_REQUEST
     )
 ]
 
@@ -0,0 +1,254 @@
+"""Synthetic catalogue for load tests.
+
+Every document is generated from the seed and its number alone, so
+the locustfile can address films and persons by number without reading
+the indices, and any run with the same settings loads the same data.
+
+Run from the src directory:
+    python -m tests.load.dataset --films 1000000 --persons 200000
+"""
+
+import argparse
+import json
+import logging
+import random
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+from elasticsearch import Elasticsearch, helpers
+
+from tests.functional.utils.backoff import backoff
+from tests.functional.utils.indices import index_to_schema
+from tests.load.settings import load_settings
+
+logger = logging.getLogger(__name__)
+
+GENRE_FIXTURES = (
+    Path(__file__).parent.parent / 'functional/testdata/genre_fixtures.txt'
+)
+
+WORDS = [
+    'star', 'night', 'river', 'shadow', 'empire', 'garden', 'winter',
+    'storm', 'city', 'dream', 'road', 'stone', 'island', 'fire', 'silent',
+    'last', 'golden', 'secret', 'lost', 'wild', 'north', 'ocean', 'moon',
+    'house', 'war', 'love', 'blood', 'glass', 'iron', 'summer', 'heart',
+    'king', 'queen', 'ghost', 'machine', 'mountain', 'dark', 'light',
+    'hunter', 'circle', 'edge', 'planet', 'signal', 'harbor', 'forest',
+    'echo', 'mirror', 'crown', 'paper', 'thunder',
+]
+FIRST_NAMES = [
+    'John', 'Mary', 'James', 'Anna', 'Robert', 'Linda', 'Michael', 'Sarah',
+    'David', 'Emma', 'Peter', 'Olga', 'Ivan', 'Maria', 'George', 'Helen',
+    'Thomas', 'Nina', 'Daniel', 'Alice', 'Mark', 'Irina', 'Paul', 'Laura',
+    'Steven', 'Julia', 'Andrew', 'Kate', 'Brian', 'Elena',
+]
+LAST_NAMES = [
+    'Smith', 'Brown', 'Ivanov', 'Taylor', 'Wilson', 'Petrov', 'Moore',
+    'Clark', 'Lewis', 'Walker', 'Hall', 'Young', 'King', 'Wright', 'Green',
+    'Baker', 'Adams', 'Nelson', 'Hill', 'Campbell', 'Mitchell', 'Roberts',
+    'Carter', 'Phillips', 'Evans', 'Turner', 'Torres', 'Parker', 'Collins',
+    'Edwards', 'Stewart', 'Morris', 'Murphy', 'Cook', 'Rogers', 'Morgan',
+    'Cooper', 'Peterson', 'Bailey', 'Reed',
+]
+
+NAMESPACE = uuid.UUID('6f1f3c1e-2b8a-4a41-9a3e-6d3b1c1f0a55')
+
+
+def film_id(number: int) -> str:
+    return str(uuid.uuid5(NAMESPACE, f'film:{number}'))
+
+
+def person_id(number: int) -> str:
+    return str(uuid.uuid5(NAMESPACE, f'person:{number}'))
+
+
+def person_name(number: int) -> str:
+    """
+    Return a unique name of the person. Middle initials keep names
+    of large datasets apart once first and last names run out.
+    """
+
+    first = FIRST_NAMES[number % len(FIRST_NAMES)]
+    number //= len(FIRST_NAMES)
+    last = LAST_NAMES[number % len(LAST_NAMES)]
+    number //= len(LAST_NAMES)
+
+    initials = ''
+    while number:
+        number -= 1
+        initials += chr(ord('A') + number % 26) + '. '
+        number //= 26
+
+    return f'{first} {initials}{last}'
+
+
+def load_genres() -> list[dict]:
+    """Return genres of the functional tests fixtures."""
+
+    with open(GENRE_FIXTURES) as fixtures:
+        return [
+            json.loads(line) for line in fixtures
+            if line.strip() and '"index"' not in line
+        ]
+
+
+def suggest_input(text: str, weight: int = 1) -> dict:
+    """Return a completion field value, as the ETL builds it."""
+
+    words = text.split()
+
+    return {
+        'input': [' '.join(words[i:]) for i in range(len(words))],
+        'weight': weight,
+    }
+
+
+def make_film(number: int, persons: int, genres: list[dict]) -> dict:
+    """Return the film document of the number."""
+
+    rng = random.Random(f'{load_settings.seed}:film:{number}')
+    title = ' '.join(rng.sample(WORDS, rng.randint(1, 4))).title()
+    imdb_rating = round(rng.uniform(1, 10), 1)
+    film_genres = rng.sample(genres, rng.randint(1, 3))
+    crew = {
+        role: [
+            {'id': person_id(person), 'name': person_name(person)}
+            for person in {rng.randrange(persons) for _ in range(size)}
+        ]
+        for role, size in (
+            ('actors', rng.randint(1, 6)),
+            ('writers', rng.randint(0, 2)),
+            ('directors', 1),
+        )
+    }
+
+    return {
+        'id': film_id(number),
+        'title': title,
+        'title_suggest': suggest_input(title, round(imdb_rating * 10)),
+        'imdb_rating': imdb_rating,
+        'description': ' '.join(rng.choices(WORDS, k=30)).capitalize(),
+        'genres': film_genres,
+        'genre_ids': [genre['id'] for genre in film_genres],
+        'actors_names': [actor['name'] for actor in crew['actors']],
+        'writers_names': [writer['name'] for writer in crew['writers']],
+        **crew,
+    }
+
+
+def make_person(number: int) -> dict:
+    """Return the person document of the number."""
+
+    full_name = person_name(number)
+
+    return {
+        'id': person_id(number),
+        'full_name': full_name,
+        'full_name_suggest': suggest_input(full_name),
+    }
+
+
+def generate_actions(films: int, persons: int) -> Iterator[dict]:
+    """Yield bulk actions of the whole dataset."""
+
+    genres = load_genres()
+
+    for genre in genres:
+        yield {
+            '_index': load_settings.es_genre_index,
+            '_id': genre['id'],
+            **genre,
+        }
+
+    for number in range(persons):
+        yield {
+            '_index': load_settings.es_person_index,
+            '_id': person_id(number),
+            **make_person(number),
+        }
+
+    for number in range(films):
+        yield {
+            '_index': load_settings.es_movie_index,
+            '_id': film_id(number),
+            **make_film(number, persons, genres),
+        }
+
+
+@backoff(ConnectionError)
+def wait_for_elastic(client: Elasticsearch) -> None:
+    if not client.ping():
+        raise ConnectionError('No connection to Elasticsearch.')
+
+
+def create_indices(client: Elasticsearch, recreate: bool) -> list[str]:
+    """Create the indices with the schemas of the functional tests."""
+
+    indices = [
+        load_settings.es_movie_index,
+        load_settings.es_genre_index,
+        load_settings.es_person_index,
+    ]
+
+    for index, schema in zip(indices, ('movies', 'genres', 'persons')):
+        if recreate and client.indices.exists(index=index):
+            client.indices.delete(index=index)
+        if not client.indices.exists(index=index):
+            client.indices.create(
+                index=index,
+                settings=index_to_schema[schema]['settings'],
+                mappings=index_to_schema[schema]['mappings'],
+            )
+
+    return indices
+
+
+def load_dataset(films: int, persons: int, recreate: bool = True) -> None:
+    """Write the dataset into Elasticsearch."""
+
+    client = Elasticsearch(hosts=load_settings.es_host, request_timeout=300)
+    wait_for_elastic(client)
+    indices = create_indices(client, recreate)
+    # Refreshing while loading only slows the bulk requests down
+    client.indices.put_settings(
+        index=indices, settings={'refresh_interval': '-1'}
+    )
+
+    loaded = 0
+    try:
+        for success, info in helpers.parallel_bulk(
+            client,
+            generate_actions(films, persons),
+            chunk_size=load_settings.bulk_chunk_size,
+            thread_count=load_settings.bulk_threads,
+        ):
+            if not success:
+                logger.error('Failed to load a document: %s', info)
+                continue
+            loaded += 1
+            if loaded % 100_000 == 0:
+                logger.info('Loaded %s documents', loaded)
+    finally:
+        client.indices.put_settings(
+            index=indices, settings={'refresh_interval': '1s'}
+        )
+        client.indices.refresh(index=indices)
+        client.close()
+
+    logger.info('Loaded %s documents in total', loaded)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--films', type=int, default=load_settings.films)
+    parser.add_argument('--persons', type=int, default=load_settings.persons)
+    parser.add_argument(
+        '--keep', action='store_true',
+        help='add documents to the existing indices'
+    )
+    args = parser.parse_args()
+
+    load_dataset(args.films, args.persons, recreate=not args.keep)
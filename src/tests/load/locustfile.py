@@ -0,0 +1,187 @@
+"""Load test of the API with a weighted mix of catalogue pages.
+
+Load the dataset with tests.load.dataset first, then run from the src
+directory:
+    PYTHONPATH=. locust -f tests/load/locustfile.py --headless \
+        -u 200 -r 20 -t 5m --host http://localhost:8000
+"""
+
+import json
+import logging
+import random
+
+from locust import HttpUser, between, events
+
+from tests.load import dataset
+from tests.load.settings import load_settings
+
+PROFILES = {
+    # Visitors browsing the catalogue
+    'browse': {
+        'film_detail': 35,
+        'film_list': 20,
+        'genre_filter': 15,
+        'film_search': 10,
+        'person_detail': 10,
+        'person_films': 5,
+        'person_search': 5,
+    },
+    # Visitors looking for something in particular
+    'search': {
+        'film_search': 40,
+        'person_search': 20,
+        'suggest': 20,
+        'film_detail': 15,
+        'person_detail': 5,
+    },
+    # Only pages Redis and nginx can serve from cache
+    'cached': {
+        'film_detail': 60,
+        'film_list': 30,
+        'genre_list': 10,
+    },
+}
+
+GENRE_IDS = [genre['id'] for genre in dataset.load_genres()]
+
+
+def popular(size: int) -> int:
+    """Return a number below size, low numbers being the most popular."""
+
+    return int(size * random.random() ** load_settings.popularity_skew)
+
+
+def search_query() -> str:
+    return ' '.join(random.sample(dataset.WORDS, random.randint(1, 2)))
+
+
+def film_detail(user: HttpUser) -> None:
+    film_id = dataset.film_id(popular(load_settings.films))
+    user.client.get(f'/api/v1/films/{film_id}', name='/films/{film_id}')
+
+
+def film_list(user: HttpUser) -> None:
+    user.client.get(
+        '/api/v1/films/',
+        params={'page_number': popular(10) + 1},
+        name='/films/',
+    )
+
+
+def genre_filter(user: HttpUser) -> None:
+    user.client.get(
+        '/api/v1/films/',
+        params={
+            'genre': random.choice(GENRE_IDS),
+            'page_number': popular(5) + 1,
+        },
+        name='/films/?genre',
+    )
+
+
+def genre_list(user: HttpUser) -> None:
+    user.client.get('/api/v1/genres/', name='/genres/')
+
+
+def film_search(user: HttpUser) -> None:
+    user.client.get(
+        '/api/v1/films/search',
+        params={'query': search_query()},
+        name='/films/search',
+    )
+
+
+def suggest(user: HttpUser) -> None:
+    word = random.choice(dataset.WORDS)
+    user.client.get(
+        '/api/v1/suggest/',
+        params={'query': word[:random.randint(2, len(word))]},
+        name='/suggest/',
+    )
+
+
+def person_detail(user: HttpUser) -> None:
+    person_id = dataset.person_id(popular(load_settings.persons))
+    user.client.get(
+        f'/api/v1/persons/{person_id}', name='/persons/{person_id}'
+    )
+
+
+def person_films(user: HttpUser) -> None:
+    person_id = dataset.person_id(popular(load_settings.persons))
+    user.client.get(
+        f'/api/v1/persons/{person_id}/film',
+        name='/persons/{person_id}/film',
+    )
+
+
+def person_search(user: HttpUser) -> None:
+    number = popular(load_settings.persons)
+    user.client.get(
+        '/api/v1/persons/search',
+        params={'query': dataset.person_name(number).split()[-1]},
+        name='/persons/search',
+    )
+
+
+TASKS = {
+    task.__name__: task for task in (
+        film_detail, film_list, genre_filter, genre_list, film_search,
+        suggest, person_detail, person_films, person_search,
+    )
+}
+
+
+def task_weights() -> dict:
+    """Return the tasks of the configured profile with their weights."""
+
+    weights = load_settings.weights or PROFILES[load_settings.profile]
+    unknown = set(weights) - set(TASKS)
+    if unknown:
+        raise ValueError(f'Unknown load test tasks: {", ".join(unknown)}')
+
+    return {TASKS[name]: weight for name, weight in weights.items() if weight}
+
+
+class ApiUser(HttpUser):
+    host = load_settings.service_url
+    wait_time = between(load_settings.wait_min, load_settings.wait_max)
+    tasks = task_weights()
+
+
+@events.quitting.add_listener
+def report(environment, **kwargs) -> None:
+    """
+    Log p50/p95/p99 latency and throughput of every page, write them
+    to report_path and fail the run if the p95 exceeds max_p95_ms.
+    """
+
+    stats = environment.stats
+    entries = sorted(stats.entries.values(), key=lambda entry: entry.name)
+    summary = {}
+
+    for entry in [*entries, stats.total]:
+        summary[entry.name] = {
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'rps': round(entry.total_rps, 2),
+            'p50': entry.get_response_time_percentile(0.5),
+            'p95': entry.get_response_time_percentile(0.95),
+            'p99': entry.get_response_time_percentile(0.99),
+        }
+        logging.info(
+            '%-30s %8s req %6s fail %8.2f rps  '
+            'p50 %6s ms  p95 %6s ms  p99 %6s ms',
+            entry.name, *summary[entry.name].values()
+        )
+
+    if load_settings.report_path:
+        with open(load_settings.report_path, 'w') as report_file:
+            json.dump(summary, report_file, indent=2)
+
+    p95 = summary[stats.total.name]['p95']
+    if load_settings.max_p95_ms and p95 > load_settings.max_p95_ms:
+        logging.error(
+            'p95 of %s ms exceeds %s ms', p95, load_settings.max_p95_ms
+        )
+        environment.process_exit_code = 1
@@ -0,0 +1,37 @@
+from pydantic import BaseSettings, Field
+
+
+class LoadSettings(BaseSettings):
+    es_host: str = Field('http://localhost:9200')
+    service_url: str = Field('http://localhost:8000')
+    es_movie_index: str = 'movies'
+    es_person_index: str = 'persons'
+    es_genre_index: str = 'genres'
+
+    # Synthetic dataset, the same seed and sizes give the same documents
+    seed: int = 42
+    films: int = 100_000
+    persons: int = 20_000
+    bulk_chunk_size: int = 2000
+    bulk_threads: int = 4
+
+    # Traffic mix, a profile of PROFILES or weights per task,
+    # e.g. LOAD_WEIGHTS='{"film_detail": 5, "film_search": 1}'
+    profile: str = 'browse'
+    weights: dict[str, int] = {}
+    # 1 picks films and persons uniformly, higher values make
+    # low-numbered ones more popular, as with a real catalogue
+    popularity_skew: float = 3.0
+    wait_min: float = 0.5
+    wait_max: float = 2.0
+
+    # Percentiles of the run are written to this file, the run fails
+    # if the p95 of all requests exceeds max_p95_ms
+    report_path: str | None = None
+    max_p95_ms: int | None = None
+
+    class Config:
+        env_prefix = 'LOAD_'
+
+
+load_settings = LoadSettings()
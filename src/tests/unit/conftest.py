@@ -0,0 +1,23 @@
+"""Unit tests of the API internals, run from the src directory with
+the repository root importable, as core.config needs:
+
+    PYTHONPATH=.. pytest tests/unit
+"""
+
+import os
+
+# Settings the API modules need on import, the environment
+# and .env take precedence
+for name, value in {
+    'PROJECT_NAME': 'movies',
+    'REDIS_HOST': 'localhost',
+    'REDIS_PORT': '6379',
+    'ELASTIC_SCHEME': 'http',
+    'ELASTIC_HOST': 'localhost',
+    'ELASTIC_PORT': '9200',
+    'ES_MOVIE_INDEX': 'movies',
+    'ES_GENRE_INDEX': 'genres',
+    'ES_PERSON_INDEX': 'persons',
+    'SECRET_KEY': 'unit-test-secret',
+}.items():
+    os.environ.setdefault(name, value)
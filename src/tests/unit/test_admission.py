@@ -0,0 +1,150 @@
+from contextlib import ExitStack
+
+import pytest
+
+from utils import admission
+from utils.admission import AIMDLimiter, Overloaded
+
+LATENCY_TARGET = 0.5
+
+
+class Clock:
+    """time.monotonic of the limiter, moved by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(admission.time, 'monotonic', clock)
+
+    return clock
+
+
+def make_limiter(initial: int = 10, minimum: int = 2, maximum: int = 20):
+    return AIMDLimiter(
+        'elasticsearch',
+        initial=initial,
+        minimum=minimum,
+        maximum=maximum,
+        latency_target=LATENCY_TARGET,
+        backoff=0.5,
+    )
+
+
+def call(limiter: AIMDLimiter, clock: Clock, duration: float = 0.0):
+    """Make a call to the dependency taking duration seconds."""
+
+    with limiter.admit():
+        clock.now += duration
+
+
+def test_rejects_calls_over_the_limit(clock: Clock) -> None:
+    """
+    Holds every slot of the limit and validates that one more call
+    is refused, and admitted again once a slot is freed.
+    """
+
+    limiter = make_limiter(initial=2)
+
+    with limiter.admit(), limiter.admit():
+        with pytest.raises(Overloaded) as exc_info:
+            with limiter.admit():
+                pass
+
+        assert exc_info.value.dependency == 'elasticsearch'
+        assert limiter.stats() == {'limit': 2, 'in_flight': 2}
+
+    call(limiter, clock)
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_slow_calls_back_off_once_per_latency_target(clock: Clock) -> None:
+    """
+    Makes a wave of slow calls and validates that the limit is scaled
+    down once, then again only after latency_target has passed.
+    """
+
+    limiter = make_limiter(initial=16)
+
+    with ExitStack() as calls:
+        for _ in range(3):
+            calls.enter_context(limiter.admit())
+        clock.now += LATENCY_TARGET * 2
+
+    assert limiter.limit == 8
+
+    clock.now += LATENCY_TARGET
+    call(limiter, clock, LATENCY_TARGET * 2)
+
+    assert limiter.limit == 4
+
+
+def test_congestion_errors_back_off(clock: Clock) -> None:
+    """
+    Fails calls with a congestion error and with another one, and
+    validates that only the congestion error scales the limit down.
+    """
+
+    limiter = make_limiter(initial=16)
+
+    with pytest.raises(ValueError):
+        with limiter.admit(congestion=(TimeoutError,)):
+            raise ValueError
+
+    assert limiter.limit == 16
+
+    with pytest.raises(TimeoutError):
+        with limiter.admit(congestion=(TimeoutError,)):
+            raise TimeoutError
+
+    assert limiter.limit == 8
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_grows_only_when_half_used(clock: Clock) -> None:
+    """
+    Completes calls in time, alone and with half of the limit in use,
+    and validates that only the latter grow the limit, by one over
+    the limit per call.
+    """
+
+    limiter = make_limiter(initial=4)
+
+    call(limiter, clock)
+    assert limiter.limit == 4
+
+    with limiter.admit():
+        call(limiter, clock)
+
+    assert limiter.limit == pytest.approx(4.25)
+
+
+@pytest.mark.parametrize('congested, expected_limit', [(True, 2), (False, 5)])
+def test_limit_stays_within_bounds(
+    clock: Clock,
+    congested: bool,
+    expected_limit: int
+) -> None:
+    """
+    Keeps backing off or growing the limit and validates that it stops
+    at the minimum or at the maximum.
+    """
+
+    limiter = make_limiter(initial=4, minimum=2, maximum=5)
+
+    for _ in range(50):
+        if congested:
+            clock.now += LATENCY_TARGET
+            call(limiter, clock, LATENCY_TARGET * 2)
+        else:
+            with limiter.admit(), limiter.admit():
+                call(limiter, clock)
+
+    assert limiter.limit == expected_limit
+    assert limiter.stats()['limit'] == expected_limit
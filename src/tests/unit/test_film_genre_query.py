@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from services import film
+from services.film import ElasticService, FilmService
+
+GENRE = '120a21cf-9097-479e-904a-13dd7198c1dd'
+
+GENRE_IDS_QUERY = {
+    "bool": {
+        "filter": [
+            {"term": {"genre_ids": GENRE}}
+        ]
+    }
+}
+NESTED_QUERY = {
+    "nested": {
+        "path": "genres",
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"genres.id": GENRE}}
+                ]
+            }
+        }
+    }
+}
+
+
+class Indices:
+    """Index API of Elasticsearch with the film index mapping."""
+
+    def __init__(self, fields: list[str]) -> None:
+        self.fields = fields
+        self.reads = 0
+
+    async def get_mapping(self, index: str) -> dict:
+        self.reads += 1
+
+        return {
+            index: {
+                'mappings': {
+                    'properties': {field: {} for field in self.fields}
+                }
+            }
+        }
+
+
+class Elastic:
+    def __init__(self, fields: list[str]) -> None:
+        self.indices = Indices(fields)
+
+
+class Clock:
+    """time.monotonic of the film service, moved by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(film.time, 'monotonic', clock)
+
+    return clock
+
+
+def make_service(elastic: Elastic) -> FilmService:
+    return FilmService(None, ElasticService(elastic, 'movies'), 'movies')
+
+
+@pytest.mark.parametrize('fields, expected_query', [
+    (['id', 'genres', 'genre_ids'], GENRE_IDS_QUERY),
+    (['id', 'genres'], NESTED_QUERY),
+])
+def test_genre_query(clock: Clock, fields: list[str], expected_query) -> None:
+    """
+    Makes the genre query for indices with and without the flat
+    genre_ids field and validates the filter or the nested fallback.
+    """
+
+    service = make_service(Elastic(fields))
+
+    assert asyncio.run(service._genre_query(GENRE)) == expected_query
+    assert asyncio.run(service._genre_query(None)) == {"match_all": {}}
+
+
+def test_mapping_read_again_when_expired(clock: Clock) -> None:
+    """
+    Makes genre queries while a legacy index is recreated with the
+    genre_ids field and validates that the mapping is read once per
+    MAPPING_EXPIRE_IN_SECONDS and the new field then used.
+    """
+
+    elastic = Elastic(['id', 'genres'])
+    service = make_service(elastic)
+
+    assert asyncio.run(service._genre_query(GENRE)) == NESTED_QUERY
+
+    elastic.indices.fields.append('genre_ids')
+    clock.now += film.MAPPING_EXPIRE_IN_SECONDS - 1
+
+    assert asyncio.run(service._genre_query(GENRE)) == NESTED_QUERY
+    assert elastic.indices.reads == 1
+
+    clock.now += 1
+
+    assert asyncio.run(service._genre_query(GENRE)) == GENRE_IDS_QUERY
+    assert elastic.indices.reads == 2
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from models.models import FilmShort
+from models.page import Page
+from services.film import FILMS_SOURCE, ElasticService, FilmService
+
+FILM = {
+    'id': '3a0b8d33-5f6e-4b3c-9d6b-1f1b9f8f2a01',
+    'imdb_rating': 8.5,
+    'title': 'The Star',
+    'description': 'A long description of the film.' * 20,
+    'genres': [
+        {'id': '120a21cf-9097-479e-904a-13dd7198c1dd', 'name': 'Action'}
+    ],
+    'actors_names': ['Ann', 'Bob'],
+    'actors': [{'id': 'a1', 'name': 'Ann'}, {'id': 'a2', 'name': 'Bob'}],
+}
+
+
+class Elastic:
+    """Search API of Elasticsearch filtering the _source of the film."""
+
+    def __init__(self) -> None:
+        self.bodies = []
+
+    async def search(self, index: str, body: dict) -> dict:
+        self.bodies.append(body)
+        source = {
+            field: value for field, value in FILM.items()
+            if field in body['_source']
+        }
+
+        return {
+            'hits': {
+                'total': {'value': 1, 'relation': 'eq'},
+                'hits': [{'_source': source, 'sort': [8.5, FILM['id']]}],
+            }
+        }
+
+
+class Cache:
+    """RedisService of the films with nothing cached."""
+
+    async def _get_list_of_objects(self, *args, **kwargs) -> Page:
+        return Page(0, None)
+
+    async def _put_list_of_objects(self, *args, **kwargs) -> None:
+        pass
+
+    async def _get_total(self, *args) -> None:
+        return None
+
+    async def _put_total(self, *args) -> None:
+        pass
+
+
+@pytest.mark.parametrize('method, argument', [
+    ('get_films', None),
+    ('search_films', 'star'),
+])
+def test_list_fetches_rendered_fields(method: str, argument) -> None:
+    """
+    Lists and searches films and validates that only the fields of
+    brief film information are fetched, and are enough to render them.
+    """
+
+    elastic = Elastic()
+    service = FilmService(Cache(), ElasticService(elastic, 'movies'), 'movies')
+
+    films_page = asyncio.run(getattr(service, method)(1, 10, argument))
+
+    assert elastic.bodies[0]['_source'] == FILMS_SOURCE
+    assert films_page.results == [
+        FilmShort(id=FILM['id'], title=FILM['title'], imdb_rating=8.5)
+    ]
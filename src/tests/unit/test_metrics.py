@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from core.metrics import CACHE_LOOKUPS, instrument
+from models.page import Page
+
+
+@instrument('redis')
+class Cache:
+    """A cache service answering every read with the result given."""
+
+    def __init__(self, result) -> None:
+        self.result = result
+
+    async def _get_total(self):
+        return self.result
+
+    async def _get_list_of_objects(self):
+        return self.result
+
+
+def lookups(operation: str, result: str) -> float:
+    return CACHE_LOOKUPS.labels(operation, result)._value.get()
+
+
+@pytest.mark.parametrize('operation, result, expected', [
+    ('get_total', (50, False), 'hit'),
+    ('get_total', (1000, True), 'hit'),
+    ('get_total', None, 'miss'),
+    ('get_list_of_objects', (10, []), 'hit'),
+    ('get_list_of_objects', (0, None), 'miss'),
+    ('get_list_of_objects', Page(50, ['film']), 'hit'),
+    ('get_list_of_objects', Page(0, None), 'miss'),
+])
+def test_cache_lookups(operation: str, result, expected: str) -> None:
+    """
+    Reads the cache with results of hits and misses and validates
+    the lookup counted.
+    """
+
+    before = lookups(operation, expected)
+
+    asyncio.run(getattr(Cache(result), f'_{operation}')())
+
+    assert lookups(operation, expected) == before + 1
@@ -0,0 +1,110 @@
+import asyncio
+from http import HTTPStatus
+from ipaddress import ip_network
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from utils import rate_limit
+
+
+class Redis:
+    """Export keys of the clients, each read taking a turn of the loop."""
+
+    def __init__(self) -> None:
+        self.keys = set()
+
+    async def set(self, key: str, value, ex: int, nx: bool) -> bool:
+        await asyncio.sleep(0)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+
+        return True
+
+    async def ttl(self, key: str) -> int:
+        return 30
+
+
+def make_request(host: str, real_ip: str | None = None) -> Request:
+    headers = [(b'x-real-ip', real_ip.encode())] if real_ip else []
+
+    return Request(
+        {'type': 'http', 'client': (host, 5000), 'headers': headers}
+    )
+
+
+@pytest.mark.parametrize('peer, real_ip, expected', [
+    ('203.0.113.7', '198.51.100.1', '203.0.113.7'),
+    ('10.0.0.5', '198.51.100.1', '198.51.100.1'),
+    ('10.0.0.5', None, '10.0.0.5'),
+    ('testclient', '198.51.100.1', 'testclient'),
+])
+def test_client_address(monkeypatch, peer, real_ip, expected) -> None:
+    """
+    Sends X-Real-IP from a client and from a trusted proxy and validates
+    that the header is taken only from the proxy.
+    """
+
+    monkeypatch.setattr(
+        rate_limit, 'trusted_proxies', [ip_network('10.0.0.0/8')]
+    )
+
+    assert rate_limit.get_client_address(
+        make_request(peer, real_ip)
+    ) == expected
+
+
+def test_export_streams_taken_without_waiting(monkeypatch) -> None:
+    """
+    Starts two exports of different clients at once with one stream
+    per worker and validates that the second one is refused at once,
+    and that the stream is freed when the first one ends.
+    """
+
+    async def run() -> None:
+        monkeypatch.setattr(rate_limit, 'export_streams', asyncio.Semaphore(1))
+        redis = Redis()
+
+        first = rate_limit.limit_exports(make_request('10.0.0.1'), redis)
+        second = rate_limit.limit_exports(make_request('10.0.0.2'), redis)
+        # A second export waiting for the stream would never be answered
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                first.__anext__(), second.__anext__(), return_exceptions=True
+            ),
+            timeout=1
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], HTTPException)
+        assert results[1].status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert rate_limit.export_streams.locked()
+
+        await first.aclose()
+        assert not rate_limit.export_streams.locked()
+
+    asyncio.run(run())
+
+
+def test_export_stream_freed_when_client_limited(monkeypatch) -> None:
+    """
+    Starts an export of a client that has just made one and validates
+    the 429 with its Retry-After and that the stream is not kept.
+    """
+
+    async def run() -> None:
+        monkeypatch.setattr(rate_limit, 'export_streams', asyncio.Semaphore(1))
+        redis = Redis()
+        redis.keys.add('export:10.0.0.1')
+
+        export = rate_limit.limit_exports(make_request('10.0.0.1'), redis)
+        with pytest.raises(HTTPException) as exc_info:
+            await export.__anext__()
+
+        assert exc_info.value.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert exc_info.value.headers == {'Retry-After': '30'}
+        assert not rate_limit.export_streams.locked()
+
+    asyncio.run(run())
@@ -0,0 +1,159 @@
+import asyncio
+import time
+import uuid
+from datetime import date
+from uuid import UUID
+
+import fakeredis.aioredis
+
+from api.v1 import films, genres
+from core.config import settings
+from services import warmup
+from services.film import get_film_service
+from services.genre import get_genre_service
+
+GENRES = [
+    {'id': str(uuid.uuid4()), 'name': name, 'description': None}
+    for name in ('Action', 'Drama')
+]
+FILMS = [
+    {
+        'id': str(uuid.uuid4()),
+        'title': f'Film {number}',
+        'imdb_rating': 9.0 - number / 100,
+        'description': None,
+        'genres': GENRES[:1],
+    }
+    for number in range(100)
+]
+
+
+class Indices:
+    async def get_mapping(self, index: str) -> dict:
+        return {index: {'mappings': {'properties': {'genre_ids': {}}}}}
+
+
+class Elastic:
+    """Elasticsearch with the genres and films, counting the requests."""
+
+    def __init__(self) -> None:
+        self.indices = Indices()
+        self.requests = 0
+
+    async def search(self, index: str, body: dict) -> dict:
+        self.requests += 1
+        docs = GENRES if index == settings.ES_GENRE_INDEX else FILMS
+        start = body.get('from', 0)
+
+        return {
+            'hits': {
+                'total': {'value': len(docs), 'relation': 'eq'},
+                'hits': [
+                    {'_source': doc, 'sort': [doc.get('imdb_rating')]}
+                    for doc in docs[start:start + body['size']]
+                ],
+            }
+        }
+
+    async def mget(self, index: str, ids: list[str]) -> dict:
+        self.requests += 1
+        docs = {film['id']: film for film in FILMS}
+
+        return {
+            'docs': [
+                {'_id': id, 'found': id in docs, '_source': docs.get(id)}
+                for id in ids
+            ]
+        }
+
+    async def get(self, index: str, id: str) -> dict:
+        self.requests += 1
+
+        return {'_id': id, '_source': next(
+            film for film in FILMS if film['id'] == id
+        )}
+
+
+def test_warmed_pages_served_from_cache() -> None:
+    """
+    Warms the cache up, then requests the warmed pages with the default
+    parameters of the routes and validates that none of them searches
+    Elasticsearch, so the warmed keys are the keys the routes read.
+    """
+
+    server = fakeredis.FakeServer()
+    redis = fakeredis.aioredis.FakeRedis(server=server, db=0)
+    response_cache = fakeredis.aioredis.FakeRedis(server=server, db=1)
+    elastic = Elastic()
+    film_service = get_film_service(redis, elastic)
+    genre_service = get_genre_service(elastic, redis)
+    hot_film = FILMS[-1]['id']
+
+    async def run() -> None:
+        await response_cache.zincrby(
+            warmup.hot_films_key(date.today()), 1, hot_film
+        )
+        await warmup.CacheWarmer(
+            film_service, genre_service, response_cache
+        ).warm()
+        warmed_requests = elastic.requests
+
+        await genres.genre_list(genre_service)
+        for page in range(1, settings.WARMUP_FILM_PAGES + 1):
+            await films.filmlist(
+                page_number=page, search_after=None,
+                film_service=film_service
+            )
+        for genre in GENRES:
+            await films.filmlist(
+                genre=UUID(genre['id']), search_after=None,
+                film_service=film_service
+            )
+        await films.film_details(hot_film, film_service)
+
+        assert elastic.requests == warmed_requests
+
+    asyncio.run(run())
+
+
+def test_load_during_held_turn_warmed(monkeypatch) -> None:
+    """
+    Announces a load while another worker holds the warm-up turn it took
+    before, and validates that the load is warmed up once the turn ends.
+    """
+
+    server = fakeredis.FakeServer()
+    redis = fakeredis.aioredis.FakeRedis(server=server, db=0)
+    response_cache = fakeredis.aioredis.FakeRedis(server=server, db=1)
+    warmed = asyncio.Event()
+
+    async def warm(self) -> None:
+        warmed.set()
+
+    monkeypatch.setattr(warmup.CacheWarmer, 'warm', warm)
+
+    async def run() -> None:
+        await response_cache.set(
+            warmup.WARMUP_LOCK_KEY, time.time() - 1,
+            ex=settings.WARMUP_INTERVAL
+        )
+        task = asyncio.create_task(
+            warmup.run_warmups(redis, response_cache, Elastic())
+        )
+        try:
+            while not (await response_cache.pubsub_numsub(
+                settings.WARMUP_CHANNEL
+            ))[0][1]:
+                await asyncio.sleep(0.01)
+
+            await response_cache.publish(settings.WARMUP_CHANNEL, time.time())
+            await asyncio.sleep(1.5)
+            assert not warmed.is_set()
+
+            # The turn of the other worker expires
+            await response_cache.delete(warmup.WARMUP_LOCK_KEY)
+            await asyncio.wait_for(warmed.wait(), timeout=3)
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
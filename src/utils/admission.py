@@ -0,0 +1,91 @@
+"""Adaptive limit of concurrent requests to a dependency."""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Overloaded(Exception):
+    """The dependency is at its concurrency limit, the call is refused."""
+
+    def __init__(self, dependency: str) -> None:
+        super().__init__(f'{dependency} is overloaded')
+        self.dependency = dependency
+
+
+class AIMDLimiter:
+    """Limit of calls in flight, found by additive increase and
+    multiplicative decrease.
+
+    A call slower than latency_target, or failing with a congestion
+    error, scales the limit down by backoff, at most once per
+    latency_target so a wave of slow calls counts once. Calls completing
+    in time while the limit is half used or more grow it by about one
+    per limit calls. Calls over the limit are refused at once with
+    Overloaded: queueing them behind a saturated dependency would only
+    grow the latency of every request.
+
+    The limiter is local to the worker process and meant to be used
+    from the event loop only.
+    """
+
+    def __init__(
+        self,
+        dependency: str,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float
+    ) -> None:
+        self.dependency = dependency
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._decreased_at = 0.0
+
+    def _on_success(self) -> None:
+        if self.in_flight * 2 >= self.limit:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _on_congestion(self) -> None:
+        now = time.monotonic()
+
+        if now - self._decreased_at >= self.latency_target:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+            self._decreased_at = now
+
+    @contextmanager
+    def admit(self, congestion: tuple[type[Exception], ...] = ()) -> Iterator:
+        """
+        Hold a slot of the limit for the call made in the block.
+
+        :param congestion: Exceptions of the call meaning the dependency
+            is overloaded, others leave the limit as it is.
+        :raise Overloaded: All slots are taken.
+        """
+
+        if self.in_flight >= int(self.limit):
+            raise Overloaded(self.dependency)
+
+        self.in_flight += 1
+        start = time.monotonic()
+
+        try:
+            yield
+        except congestion:
+            self._on_congestion()
+            raise
+        else:
+            if time.monotonic() - start > self.latency_target:
+                self._on_congestion()
+            else:
+                self._on_success()
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {'limit': int(self.limit), 'in_flight': self.in_flight}
@@ -0,0 +1,51 @@
+"""Access control of endpoints with tokens of the auth service."""
+
+from http import HTTPStatus
+from typing import Callable
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from services.auth import InvalidToken, TokenVerifier, get_token_verifier
+from utils.constants import NOT_AUTHENTICATED, NOT_ENOUGH_RIGHTS
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def require_auth(*roles: str) -> Callable:
+    """Return a dependency letting through requests with an access token.
+
+    If roles are given, the roles claim of the token must have one
+    of them. The dependency returns the claims of the token:
+
+        @router.get('/', dependencies=[Depends(require_auth('subscriber'))])
+    """
+
+    async def verify_token(
+        credentials: HTTPAuthorizationCredentials | None = Depends(bearer),
+        verifier: TokenVerifier = Depends(get_token_verifier),
+    ) -> dict:
+        if credentials is None:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED,
+                detail=NOT_AUTHENTICATED,
+                headers={'WWW-Authenticate': 'Bearer'},
+            )
+
+        try:
+            claims = await verifier.verify(credentials.credentials)
+        except InvalidToken as exc:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED,
+                detail=str(exc),
+                headers={'WWW-Authenticate': 'Bearer'},
+            )
+
+        if roles and not set(roles) & set(claims.get('roles', ())):
+            raise HTTPException(
+                status_code=HTTPStatus.FORBIDDEN, detail=NOT_ENOUGH_RIGHTS
+            )
+
+        return claims
+
+    return verify_token
@@ -3,3 +3,20 @@ FILM_NOT_FOUND = 'Film not found'
 PERSON_NOT_FOUND = 'Person not found'
 
 GENRE_NOT_FOUND = 'Genre not found'
+
+INVALID_CURSOR = 'Invalid pagination cursor'
+
+PAGE_TOO_DEEP = (
+    'Page is out of range for page_number, follow the cursor '
+    'from the next link instead'
+)
+
+EXPORT_RATE_LIMITED = 'Export limit exceeded, retry later'
+
+RATE_LIMITED = 'Too many requests, retry later'
+
+NOT_AUTHENTICATED = 'Not authenticated'
+
+NOT_ENOUGH_RIGHTS = 'Not enough rights'
+
+SERVICE_OVERLOADED = 'Service is overloaded, retry later'
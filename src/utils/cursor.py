@@ -0,0 +1,102 @@
+"""Opaque cursors for search_after pagination."""
+
+import base64
+from http import HTTPStatus
+from typing import Annotated, Callable
+
+import orjson
+from fastapi import HTTPException, Query
+
+from core.config import settings
+from utils.constants import INVALID_CURSOR, PAGE_TOO_DEEP
+
+
+def encode_cursor(sort_values: list) -> str:
+    """Pack sort values of the last hit into a URL-safe token."""
+
+    return base64.urlsafe_b64encode(
+        orjson.dumps(sort_values)
+    ).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: list) -> list:
+    """Unpack a token produced by encode_cursor for the sort given.
+
+    Raise ValueError if the token is malformed or does not hold one
+    scalar value per sort field, which Elasticsearch would reject.
+    """
+
+    padding = '=' * (-len(cursor) % 4)
+    sort_values = orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+
+    if not isinstance(sort_values, list) or len(sort_values) != len(sort):
+        raise ValueError('Cursor must hold a value per sort field')
+
+    if not all(
+        isinstance(value, (str, int, float)) or value is None
+        for value in sort_values
+    ):
+        raise ValueError('Cursor must hold scalar sort values')
+
+    return sort_values
+
+
+def paginate(
+    search_query: dict,
+    page: int,
+    size: int,
+    search_after: list | None
+) -> dict:
+    """Point the search query at the requested page.
+
+    A cursor continues after the previous page with search_after,
+    otherwise the page number is translated into a from offset.
+    """
+
+    if search_after:
+        search_query['search_after'] = search_after
+    else:
+        search_query['from'] = (page - 1) * size
+
+    return search_query
+
+
+def get_search_after(sort: list) -> Callable:
+    """Return a dependency reading search_after values of the sort."""
+
+    async def search_after(
+        cursor: Annotated[
+            str | None,
+            Query(description='Cursor from the next link to continue paging')
+        ] = None
+    ) -> list | None:
+        if cursor is None:
+            return None
+
+        try:
+            return decode_cursor(cursor, sort)
+        except ValueError:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail=INVALID_CURSOR
+            )
+
+    return search_after
+
+
+def in_page_window(page_number: int, page_size: int) -> bool:
+    """Check that the page can be fetched with a from offset."""
+
+    return page_number * page_size <= settings.ELASTIC_MAX_RESULT_WINDOW
+
+
+def check_page_window(
+    page_number: int,
+    page_size: int,
+    search_after: list | None
+) -> None:
+    """Reject deep page numbers that are not backed by a cursor."""
+
+    if search_after is None and not in_page_window(page_number, page_size):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail=PAGE_TOO_DEEP
+        )
@@ -0,0 +1,18 @@
+"""HTTP caching headers of read endpoints."""
+
+from typing import Callable
+
+from fastapi import Response
+
+
+def cache_control(max_age: int) -> Callable:
+    """Return a dependency setting Cache-Control of the route response.
+
+    Only successful responses keep the header, error responses
+    are built separately and stay uncacheable.
+    """
+
+    async def set_cache_control(response: Response) -> None:
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+
+    return set_cache_control
@@ -0,0 +1,70 @@
+"""
+Sliding window limits and client addresses, shared by the API and by
+the auth service, which imports them as src.utils.limits. Only the
+standard library is imported here.
+"""
+
+import time
+from ipaddress import IPv4Network, IPv6Network, ip_address
+
+# Sliding window counter: requests of the current fixed window plus
+# those of the previous one weighted by how much of it still overlaps
+# the sliding window. Counts a request and returns {1, remaining} if
+# it is allowed, {0, seconds to wait} otherwise.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local count = previous * (window - elapsed) / window + current
+
+if count >= limit then
+    local retry_after = window - elapsed
+    if current < limit then
+        retry_after = retry_after - (limit - current) * window / previous
+    end
+    return {0, math.max(1, math.ceil(retry_after))}
+end
+
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], window * 2)
+return {1, math.floor(limit - count - 1)}
+"""
+
+
+def window_keys(key: str, window: int) -> tuple[list[str], float]:
+    """
+    Return the counters of the current and previous windows of the key,
+    and the seconds elapsed in the current one.
+    """
+
+    now = time.time()
+    number = int(now // window)
+
+    return [f'{key}:{number}', f'{key}:{number - 1}'], now - number * window
+
+
+def client_address(
+    peer: str | None,
+    real_ip: str | None,
+    trusted_proxies: list[IPv4Network | IPv6Network]
+) -> str:
+    """
+    Return the address of the client connected from peer, as seen by
+    nginx when proxied. X-Real-IP is taken only from trusted_proxies,
+    any client could otherwise send another one with every request to
+    escape the limits of its address.
+    """
+
+    try:
+        trusted = any(
+            ip_address(peer) in network for network in trusted_proxies
+        )
+    except ValueError:
+        trusted = False
+
+    if real_ip and trusted:
+        return real_ip
+
+    return peer or ''
@@ -15,5 +15,6 @@ def get_page_size(
         if next:
             return size_default
         else:
-            return total - size_default * (page - 1)
+            # Pages past the last one are empty
+            return max(0, total - size_default * (page - 1))
     return total
@@ -0,0 +1,133 @@
+"""Limits of expensive endpoints."""
+
+import asyncio
+import math
+import time
+from http import HTTPStatus
+from ipaddress import ip_network
+from typing import AsyncIterator
+
+from fastapi import Depends, HTTPException, Request
+from redis.asyncio import Redis
+
+from core.config import settings
+from db.redis import get_redis
+from utils.constants import EXPORT_RATE_LIMITED
+from utils.limits import SLIDING_WINDOW_SCRIPT, client_address, window_keys
+
+export_streams = asyncio.Semaphore(settings.EXPORT_MAX_STREAMS)
+trusted_proxies = [ip_network(proxy) for proxy in settings.TRUSTED_PROXIES]
+
+
+def get_client_address(request: Request) -> str:
+    """Return the client address, see client_address."""
+
+    return client_address(
+        request.client.host if request.client else None,
+        request.headers.get('x-real-ip'),
+        trusted_proxies
+    )
+
+
+async def limit_exports(
+    request: Request,
+    redis: Redis = Depends(get_redis)
+) -> AsyncIterator[None]:
+    """
+    Allow one export per client in EXPORT_RATE_LIMIT_SECONDS and
+    hold one of the worker's export streams until the response is sent.
+    """
+
+    if export_streams.locked():
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail=EXPORT_RATE_LIMITED,
+            headers={'Retry-After': str(settings.EXPORT_RATE_LIMIT_SECONDS)}
+        )
+
+    # Taken before any await, so no other export can take the last
+    # stream in between: a free stream is acquired without waiting
+    await export_streams.acquire()
+
+    try:
+        cache_key = f'export:{get_client_address(request)}'
+        allowed = await redis.set(
+            cache_key, 1, ex=settings.EXPORT_RATE_LIMIT_SECONDS, nx=True
+        )
+
+        if not allowed:
+            retry_after = await redis.ttl(cache_key)
+            raise HTTPException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail=EXPORT_RATE_LIMITED,
+                headers={'Retry-After': str(max(retry_after, 1))}
+            )
+
+        yield
+    finally:
+        export_streams.release()
+
+
+class SlidingWindow:
+    """Counters of clients requests in Redis, shared by the workers."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+        self._hit = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, key: str, limit: int, window: int) -> tuple[bool, int]:
+        """
+        Count a request of the key.
+
+        :return: Whether the request is allowed, and the requests left
+            if it is or the seconds to wait before retrying if it is not.
+        """
+
+        keys, elapsed = window_keys(key, window)
+        allowed, value = await self._hit(
+            keys=keys, args=[limit, window, elapsed]
+        )
+
+        return bool(allowed), int(value)
+
+
+class TokenBucket:
+    """
+    Requests of one client seen by the worker, refilled at the rate of
+    the limit. A client emptying the bucket of a single worker is over
+    the limit whatever the others saw, so it is refused without asking
+    Redis, as it is while Redis told it to wait.
+    """
+
+    def __init__(self, limit: int, window: int) -> None:
+        self.capacity = limit
+        self.rate = limit / window
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def take(self) -> float:
+        """Take a token, return 0 or the seconds to wait for one."""
+
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+
+        self.tokens -= 1
+
+        return 0.0
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = time.monotonic() + seconds
+
+
+def retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
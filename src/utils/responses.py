@@ -0,0 +1,20 @@
+import time
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+
+from core import metrics
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse recording the time spent rendering the body."""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        elapsed = time.perf_counter() - start
+
+        metrics.SERIALIZATION_LATENCY.observe(elapsed)
+        metrics.add_span('serialize', elapsed)
+
+        return body
@@ -3,11 +3,19 @@ from elasticsearch import AsyncElasticsearch
 from core.config import settings
 from models.film import FilmPersonRoles
 
+ROLES_DATA = {
+    'actors_names': 'actor',
+    'director': 'director',
+    'writers_names': 'writer',
+}
+# Person pages need brief film information and the fields roles come from
+FILMS_SOURCE = ['id', 'title', 'imdb_rating', *ROLES_DATA]
 
-async def get_films(elastic: AsyncElasticsearch, person_name: str) -> list:
-    """Returns the list of movies in which the person participated."""
 
-    query_movies = {
+def person_films_query(person_name: str) -> dict:
+    """Returns a query for the movies the person participated in."""
+
+    return {
         "bool": {
             "should": [
                 {
@@ -29,9 +37,14 @@ async def get_films(elastic: AsyncElasticsearch, person_name: str) -> list:
         }
     }
 
+
+async def get_films(elastic: AsyncElasticsearch, person_name: str) -> list:
+    """Returns the list of movies in which the person participated."""
+
     films = await elastic.search(
         index=settings.ES_MOVIE_INDEX,
-        query=query_movies
+        query=person_films_query(person_name),
+        source=FILMS_SOURCE
     )
 
     try:
@@ -44,15 +57,44 @@ async def get_films(elastic: AsyncElasticsearch, person_name: str) -> list:
     return total, movie_data
 
 
+async def get_films_many(
+    elastic: AsyncElasticsearch,
+    person_names: list[str]
+) -> list[tuple[int, list]]:
+    """
+    Returns the lists of movies of several persons,
+    searched with one msearch request.
+    """
+
+    if not person_names:
+        return []
+
+    searches = []
+    for person_name in person_names:
+        searches.append({"index": settings.ES_MOVIE_INDEX})
+        searches.append({
+            "query": person_films_query(person_name),
+            "_source": FILMS_SOURCE
+        })
+
+    response = await elastic.msearch(searches=searches)
+    results = []
+
+    for films in response['responses']:
+        if 'error' in films:
+            results.append((0, []))
+            continue
+        results.append((
+            films['hits']['total']['value'],
+            [film['_source'] for film in films['hits']['hits']]
+        ))
+
+    return results
+
+
 async def get_roles(films: list, person_name: str) -> list:
     """"""
 
-    ROLES_DATA = {
-        'actors_names': 'actor',
-        'director': 'director',
-        'writers_names': 'writer',
-    }
-
     movie_data = []
 
     for film in films: